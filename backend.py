@@ -0,0 +1,236 @@
+# Durability levels for committed changes (see TaskBackend.flush)
+DURABILITY_FULL = "full"     # on disk, fsynced, before the change returns
+DURABILITY_BATCH = "batch"   # changes close together share one fsync
+DURABILITY_NONE = "none"     # written, but left to the OS to put on disk
+DURABILITY_LEVELS = (DURABILITY_FULL, DURABILITY_BATCH, DURABILITY_NONE)
+
+# What a modify() mutation returns to delete the task it was given
+DELETE = "delete"
+
+# Orders ordered_ids() keeps tasks in; ties always go by ID
+ORDER_PRIORITY = "priority"   # high, medium, low
+ORDER_DUE = "due"             # soonest due date first, tasks without one last
+ORDER_CREATED = "created"     # oldest first, by created_at
+ORDERS = (ORDER_PRIORITY, ORDER_DUE, ORDER_CREATED)
+
+# Rank of each priority in ORDER_PRIORITY; anything else ranks as medium
+PRIORITY_ORDER = {"high": 1, "medium": 2, "low": 3}
+
+
+def mutate_copies(tasks, mutate):
+    """Run a modify() mutation on copies of tasks and sort out the results
+
+    Returns (changed, unchanged, deleted); changed holds the changed
+    copies, the other two the original tasks.
+    """
+    changed, unchanged, deleted = [], [], []
+    for task in tasks:
+        copy = task.copy()
+        outcome = mutate(copy)
+        if outcome == DELETE:
+            deleted.append(task)
+        elif outcome:
+            changed.append(copy)
+        else:
+            unchanged.append(task)
+    return changed, unchanged, deleted
+
+
+class TaskBackend:
+    """The interface the task manager uses to read and change tasks
+
+    Implemented by storage.TaskStore (JSON or binary snapshot plus an
+    append-only log, queried through in-memory indexes) and by
+    sqlite_store.SQLiteStore (a SQLite database queried with SQL).
+    Commands only go through these methods, so either one can sit behind
+    load_tasks()/save_tasks() and get_store().
+
+    Query methods return task IDs, which get_many() turns into tasks.
+    Day arguments (first, last, due_first, due_last) are inclusive date
+    ordinals as returned by date.toordinal().
+    """
+
+    # True when queries are answered without reading every task, so
+    # commands should use them instead of filtering stream()
+    loaded = False
+
+    # Rough cost per task of each way of reading tasks, for the query
+    # planner (see query.QueryPlan), where checking a task against a
+    # filter costs 1: reading its ID from an index, scanning it in
+    # select_ids(), passing it in ordered_ids() and fetching it by ID
+    query_costs = {"id": 0.05, "scan": 0.4, "walk": 0.1, "fetch": 0.2}
+
+    def open(self):
+        """Get the store ready for get(), queries and changes"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Write out committed changes still held back for group commit"""
+        raise NotImplementedError
+
+    def close(self):
+        """Flush, finish pending work and release open files"""
+        raise NotImplementedError
+
+    def files(self):
+        """Paths of the files that make up the store"""
+        raise NotImplementedError
+
+    def load(self):
+        """Read every task and return them as a list"""
+        raise NotImplementedError
+
+    def save(self, tasks, next_id=None):
+        """Replace the whole task list
+
+        next_id, if given, is the lowest ID a new task may get from then on.
+        """
+        raise NotImplementedError
+
+    def stream(self, completed=None):
+        """Yield tasks one at a time, in the order they were added
+
+        If completed is given, only tasks with that status are yielded.
+        """
+        raise NotImplementedError
+
+    def count(self):
+        """Number of tasks"""
+        raise NotImplementedError
+
+    def get(self, task_id):
+        """Get a task by ID, or None if it does not exist"""
+        raise NotImplementedError
+
+    def get_many(self, task_ids):
+        """Get the tasks with the given IDs, in the same order, skipping missing ones"""
+        tasks = (self.get(task_id) for task_id in task_ids)
+        return [task for task in tasks if task is not None]
+
+    def match_ids(self, task_ids):
+        """Get the IDs from a bulk_operations.TaskIdSet that exist, sorted"""
+        raise NotImplementedError
+
+    def add_task(self, fields):
+        """Add a new task from a dict of its fields, under the next free ID, and return it"""
+        raise NotImplementedError
+
+    def update_task(self, task):
+        """Record the new state of a task that was changed in place
+
+        If another process changed the task in the meantime, its change is
+        overwritten; use modify() to change tasks safely.
+        """
+        raise NotImplementedError
+
+    def delete_task(self, task_id):
+        """Delete a task by ID and return it, or None if it does not exist"""
+        raise NotImplementedError
+
+    def commit_batch(self, updated=(), deleted_ids=()):
+        """Record many changed and deleted tasks as one change"""
+        raise NotImplementedError
+
+    def batch(self):
+        """Context manager that groups every change made inside it into one
+
+        The store is held for writing (other processes wait) until the
+        block ends, and the changes are written out together then.
+        """
+        raise NotImplementedError
+
+    def modify(self, task_ids, mutate):
+        """Change tasks by ID without losing concurrent changes to them
+
+        mutate is called with a copy of each task that exists and returns
+        True if it changed it, False if not, or DELETE to delete it. The
+        changes are committed as one batch, but only if no other process
+        changed or deleted any of those tasks since they were read;
+        otherwise the tasks are read again and mutate is called on the new
+        versions, so it may run more than once per task.
+
+        Returns (changed, unchanged, deleted) lists of tasks.
+        """
+        raise NotImplementedError
+
+    def add_listener(self, listener):
+        """Tell a listener about every change to the tasks from now on
+
+        listener.add(task) is called for each added task and each new
+        version of a changed one (after listener.remove(task_id) for the
+        old one), and listener.remove(task_id) for each deleted task,
+        whichever process made the change. listener.clear() is called
+        when the store cannot tell what changed, e.g. after the whole list
+        was replaced. The store only sees other processes' changes in
+        open(), so listeners should call it before relying on what they
+        were told.
+        """
+        raise NotImplementedError
+
+    def remove_listener(self, listener):
+        """Stop telling a listener about changes"""
+        raise NotImplementedError
+
+    def ordered_ids(self, order=ORDER_PRIORITY, completed=None):
+        """Iterate over task IDs in one of ORDERS, kept up to date as tasks change
+
+        If completed is given, only tasks with that status are included.
+        Listings read a page of IDs from here instead of sorting every task.
+        """
+        raise NotImplementedError
+
+    def search(self, query, field="title"):
+        """Get the IDs of tasks whose title (or notes) contain every query word"""
+        raise NotImplementedError
+
+    def category_counts(self):
+        """Map each category to its number of tasks, sorted by category"""
+        raise NotImplementedError
+
+    def tag_counts(self):
+        """Map each tag to its number of tasks, sorted by tag"""
+        raise NotImplementedError
+
+    def ids_in_category(self, category):
+        """Get the IDs of the tasks in a category, sorted"""
+        raise NotImplementedError
+
+    def ids_with_tag(self, tag):
+        """Get the IDs of the tasks with a tag, sorted"""
+        raise NotImplementedError
+
+    def count_in_category(self, category):
+        """Number of tasks in a category"""
+        raise NotImplementedError
+
+    def count_with_tag(self, tag):
+        """Number of tasks with a tag"""
+        raise NotImplementedError
+
+    def due_ids(self, first=None, last=None):
+        """Get the IDs of pending tasks due between two days, soonest first"""
+        raise NotImplementedError
+
+    def count_due(self, first=None, last=None):
+        """Count the pending tasks due between two days"""
+        raise NotImplementedError
+
+    def select_ids(self, completed=None, priority=None, category=None, due_first=None, due_last=None):
+        """Get the IDs of tasks matching every given filter, in no particular order
+
+        Giving due_first or due_last leaves out tasks without a due date.
+        """
+        raise NotImplementedError
+
+    def count_where(self, completed=None, priority=None, category=None, due_first=None, due_last=None):
+        """Count the tasks matching every given filter (see select_ids)"""
+        raise NotImplementedError
+
+    def notes_summary(self):
+        """Summary of notes across all tasks, as returned by get_notes_summary"""
+        raise NotImplementedError
+
+    def completion_rate(self):
+        """Completion rate percentage"""
+        total = self.count()
+        return round((self.count_where(completed=True) / total) * 100, 1) if total else 0
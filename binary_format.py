@@ -0,0 +1,183 @@
+import json
+import math
+import mmap
+import struct
+import sys
+
+from task_model import Task
+
+MAGIC = b"TSKB"
+FORMAT_VERSION = 1
+
+# Flag set in the header when records are sorted by task ID
+SORTED_BY_ID = 1
+
+# magic, format version, schema version, flags, record count,
+# then the heap offset and length of the JSON list of priority names
+_HEADER = struct.Struct("<4sHHIQQI")
+
+# id, completed, priority code, (padding), due ordinal (0 if none),
+# created_at seconds (NaN if none), then heap offset and length of the
+# title, category, tags and "rest" strings
+_RECORD = struct.Struct("<qBBxxid" + "QI" * 4)
+
+# Heap offset standing for a None string
+_NONE = 2 ** 64 - 1
+
+
+def _rest(task):
+    """Collect the fields that have no fixed-width column"""
+    rest = task.optional_fields()
+    if task.extra:
+        rest["extra"] = task.extra
+    # Values the task keeps as text because they did not parse exactly
+    if task.created_seconds is None and task.created_at is not None:
+        rest["created_at"] = task.created_at
+    if task.due_ordinal is None and task.due_date is not None:
+        rest["due_date"] = task.due_date
+    return rest
+
+
+class _HeapWriter:
+    """Builds the string heap, storing repeated strings once"""
+
+    def __init__(self):
+        self.heap = bytearray()
+        self.shared = {}
+
+    def put(self, text, share=False):
+        """Add a string and get its (offset, length)"""
+        if text is None:
+            return _NONE, 0
+        if share and text in self.shared:
+            return self.shared[text]
+
+        data = text.encode("utf-8")
+        ref = (len(self.heap), len(data))
+        self.heap += data
+        if share:
+            self.shared[text] = ref
+        return ref
+
+
+def encode_snapshot(tasks, schema_version):
+    """Encode tasks as a binary snapshot and return its bytes"""
+    heap = _HeapWriter()
+    records = bytearray()
+    priorities = {}
+    flags = SORTED_BY_ID
+    count = 0
+    last_id = None
+
+    for task in tasks:
+        if last_id is not None and task.id <= last_id:
+            flags &= ~SORTED_BY_ID
+        last_id = task.id
+        count += 1
+
+        created = task.created_seconds
+        rest = _rest(task)
+        records += _RECORD.pack(
+            task.id,
+            task.completed,
+            priorities.setdefault(task.priority, len(priorities)),
+            task.due_ordinal or 0,
+            math.nan if created is None else created,
+            *heap.put(task.title),
+            *heap.put(task.category, share=True),
+            *heap.put(json.dumps(list(task.tags)) if task.tags else "", share=True),
+            *heap.put(json.dumps(rest) if rest else "")
+        )
+
+    priority_ref = heap.put(json.dumps(list(priorities)))
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, schema_version, flags, count, *priority_ref)
+    return b"".join((header, records, heap.heap))
+
+
+class BinarySnapshot:
+    """A binary snapshot file, read through mmap
+
+    The file is a header, one fixed-width record per task and a heap of
+    UTF-8 strings the records point into. Nothing is decoded up front:
+    a task is read by its record number. Snapshots are never changed in
+    place; the store writes a new one with encode_snapshot() instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.schema_version, self.flags, self.count, *priority_ref = _HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a binary task snapshot")
+        if version > FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} uses binary format version {version}, newer than this program supports")
+
+        self.heap_offset = _HEADER.size + self.count * _RECORD.size
+        self.priorities = json.loads(self._string(*priority_ref))
+        self._tags = {}
+
+    def close(self):
+        """Unmap and close the file"""
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.read(index)
+
+    def _string(self, offset, length):
+        """Read a string from the heap"""
+        if offset == _NONE:
+            return None
+        start = self.heap_offset + offset
+        return self.map[start:start + length].decode("utf-8")
+
+    def _tag_tuple(self, offset, length):
+        """Read a task's tags; each distinct tag list is decoded only once"""
+        if not length:
+            return ()
+        tags = self._tags.get(offset)
+        if tags is None:
+            tags = self._tags[offset] = tuple(sys.intern(tag) for tag in json.loads(self._string(offset, length)))
+        return tags
+
+    def read(self, index):
+        """Read the task stored in a record"""
+        (task_id, completed, priority, due, created,
+         title_off, title_len, category_off, category_len,
+         tags_off, tags_len, rest_off, rest_len) = _RECORD.unpack_from(self.map, _HEADER.size + index * _RECORD.size)
+
+        task = Task.from_packed(
+            task_id,
+            self._string(title_off, title_len),
+            completed,
+            self.priorities[priority],
+            due or None,
+            None if math.isnan(created) else created,
+            self._string(category_off, category_len),
+            self._tag_tuple(tags_off, tags_len)
+        )
+
+        if rest_len:
+            rest = json.loads(self._string(rest_off, rest_len))
+            task.set_optional_fields(rest)
+            task.extra = rest.get("extra")
+            if "created_at" in rest:
+                task.created_at = rest["created_at"]
+            if "due_date" in rest:
+                task.due_date = rest["due_date"]
+
+        return task
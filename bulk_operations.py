@@ -1,208 +1,318 @@
-from colorama import Fore, Style
-
-def parse_task_ids(input_str):
-    """Parse task IDs from user input (supports ranges and lists)"""
-    task_ids = set()
-    
-    try:
-        # Split by comma
-        parts = input_str.split(',')
-        
-        for part in parts:
-            part = part.strip()
-            
-            # Check for range (e.g., "1-5")
-            if '-' in part:
-                start, end = part.split('-')
-                start = int(start.strip())
-                end = int(end.strip())
-                
-                if start > end:
-                    print(f"{Fore.YELLOW}⚠ Invalid range: {part} (start > end){Style.RESET_ALL}")
-                    continue
-                
-                task_ids.update(range(start, end + 1))
-            else:
-                # Single ID
-                task_ids.add(int(part))
-        
-        return sorted(list(task_ids))
-    except ValueError:
-        print(f"{Fore.RED}✗ Invalid format. Use: 1,2,3 or 1-5 or 1,3-5,7{Style.RESET_ALL}")
-        return None
-
-def bulk_complete_tasks(tasks, task_ids):
-    """Mark multiple tasks as complete"""
-    if not tasks:
-        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
-        return tasks, 0
-    
-    completed_count = 0
-    already_completed = []
-    not_found = []
-    
-    for task_id in task_ids:
-        found = False
-        for task in tasks:
-            if task["id"] == task_id:
-                found = True
-                if task.get("completed", False):
-                    already_completed.append(task_id)
-                else:
-                    task["completed"] = True
-                    completed_count += 1
-                break
-        
-        if not found:
-            not_found.append(task_id)
-    
-    # Display results
-    if completed_count > 0:
-        print(f"{Fore.GREEN}✓ Marked {completed_count} task(s) as complete!{Style.RESET_ALL}")
-    
-    if already_completed:
-        print(f"{Fore.YELLOW}⚠ Already completed: {', '.join(map(str, already_completed))}{Style.RESET_ALL}")
-    
-    if not_found:
-        print(f"{Fore.RED}✗ Not found: {', '.join(map(str, not_found))}{Style.RESET_ALL}")
-    
-    return tasks, completed_count
-
-def bulk_delete_tasks(tasks, task_ids):
-    """Delete multiple tasks"""
-    if not tasks:
-        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
-        return tasks, 0
-    
-    # Sort IDs in descending order to avoid index issues
-    task_ids_sorted = sorted(task_ids, reverse=True)
-    
-    deleted_count = 0
-    deleted_titles = []
-    not_found = []
-    
-    for task_id in task_ids_sorted:
-        found = False
-        for i, task in enumerate(tasks):
-            if task["id"] == task_id:
-                deleted_titles.append(task["title"])
-                tasks.pop(i)
-                deleted_count += 1
-                found = True
-                break
-        
-        if not found:
-            not_found.append(task_id)
-    
-    # Re-assign IDs
-    for i, task in enumerate(tasks):
-        task["id"] = i + 1
-    
-    # Display results
-    if deleted_count > 0:
-        print(f"{Fore.GREEN}✓ Deleted {deleted_count} task(s):{Style.RESET_ALL}")
-        for title in deleted_titles:
-            print(f"  - {title}")
-    
-    if not_found:
-        print(f"{Fore.RED}✗ Not found: {', '.join(map(str, not_found))}{Style.RESET_ALL}")
-    
-    return tasks, deleted_count
-
-def bulk_change_priority(tasks, task_ids, new_priority):
-    """Change priority for multiple tasks"""
-    if not tasks:
-        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
-        return tasks, 0
-    
-    changed_count = 0
-    not_found = []
-    
-    for task_id in task_ids:
-        found = False
-        for task in tasks:
-            if task["id"] == task_id:
-                task["priority"] = new_priority
-                changed_count += 1
-                found = True
-                break
-        
-        if not found:
-            not_found.append(task_id)
-    
-    # Display results
-    if changed_count > 0:
-        print(f"{Fore.GREEN}✓ Changed priority to {new_priority.upper()} for {changed_count} task(s)!{Style.RESET_ALL}")
-    
-    if not_found:
-        print(f"{Fore.RED}✗ Not found: {', '.join(map(str, not_found))}{Style.RESET_ALL}")
-    
-    return tasks, changed_count
-
-def bulk_add_category(tasks, task_ids, category):
-    """Add category to multiple tasks"""
-    if not tasks:
-        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
-        return tasks, 0
-    
-    updated_count = 0
-    not_found = []
-    
-    for task_id in task_ids:
-        found = False
-        for task in tasks:
-            if task["id"] == task_id:
-                task["category"] = category
-                updated_count += 1
-                found = True
-                break
-        
-        if not found:
-            not_found.append(task_id)
-    
-    # Display results
-    if updated_count > 0:
-        print(f"{Fore.GREEN}✓ Added category '{category}' to {updated_count} task(s)!{Style.RESET_ALL}")
-    
-    if not_found:
-        print(f"{Fore.RED}✗ Not found: {', '.join(map(str, not_found))}{Style.RESET_ALL}")
-    
-    return tasks, updated_count
-
-def bulk_add_tag(tasks, task_ids, tag):
-    """Add a tag to multiple tasks"""
-    if not tasks:
-        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
-        return tasks, 0
-    
-    updated_count = 0
-    not_found = []
-    
-    for task_id in task_ids:
-        found = False
-        for task in tasks:
-            if task["id"] == task_id:
-                if "tags" not in task:
-                    task["tags"] = []
-                
-                if tag not in task["tags"]:
-                    if len(task["tags"]) < 5:
-                        task["tags"].append(tag)
-                        updated_count += 1
-                    else:
-                        print(f"{Fore.YELLOW}⚠ Task {task_id} already has 5 tags (max limit){Style.RESET_ALL}")
-                
-                found = True
-                break
-        
-        if not found:
-            not_found.append(task_id)
-    
-    # Display results
-    if updated_count > 0:
-        print(f"{Fore.GREEN}✓ Added tag '{tag}' to {updated_count} task(s)!{Style.RESET_ALL}")
-    
-    if not_found:
-        print(f"{Fore.RED}✗ Not found: {', '.join(map(str, not_found))}{Style.RESET_ALL}")
-    
+from bisect import bisect_right
+from colorama import Fore, Style
+from backend import DELETE
+
+class TaskIdSet:
+    """Set of task IDs stored as sorted, non-overlapping ranges
+    
+    A range like "1-100000000" takes two integers instead of a hundred
+    million set entries. IDs are produced lazily when iterated, and
+    intersection() walks whichever side is smaller, so bulk operations
+    scale with the number of tasks that actually match.
+    """
+    
+    def __init__(self, ranges=()):
+        self.ranges = []
+        for start, end in sorted(ranges):
+            if self.ranges and start <= self.ranges[-1][1] + 1:
+                last_start, last_end = self.ranges[-1]
+                self.ranges[-1] = (last_start, max(last_end, end))
+            else:
+                self.ranges.append((start, end))
+        self._starts = [start for start, _ in self.ranges]
+    
+    @classmethod
+    def from_ids(cls, ids):
+        """Build a set from individual IDs, merging consecutive runs"""
+        ranges = []
+        for task_id in sorted(set(ids)):
+            if ranges and task_id == ranges[-1][1] + 1:
+                ranges[-1][1] = task_id
+            else:
+                ranges.append([task_id, task_id])
+        return cls(tuple(r) for r in ranges)
+    
+    def __iter__(self):
+        for start, end in self.ranges:
+            yield from range(start, end + 1)
+    
+    def __len__(self):
+        return self.width()
+    
+    def width(self):
+        """Number of IDs in the set; unlike len(), not limited to sys.maxsize"""
+        return sum(end - start + 1 for start, end in self.ranges)
+    
+    def __bool__(self):
+        return bool(self.ranges)
+    
+    def __contains__(self, task_id):
+        i = bisect_right(self._starts, task_id) - 1
+        return i >= 0 and task_id <= self.ranges[i][1]
+    
+    def __str__(self):
+        return ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in self.ranges)
+    
+    def intersection(self, ids):
+        """Get the IDs from a collection (e.g. a task index) that are in this set, sorted"""
+        if self.width() <= len(ids):
+            return [task_id for task_id in self if task_id in ids]
+        return sorted(task_id for task_id in ids if task_id in self)
+    
+    def difference(self, ids):
+        """Get a new set without the given IDs"""
+        remove = sorted(set(ids))
+        ranges = []
+        j = 0
+        
+        for start, end in self.ranges:
+            while j < len(remove) and remove[j] < start:
+                j += 1
+            while j < len(remove) and remove[j] <= end:
+                if remove[j] > start:
+                    ranges.append((start, remove[j] - 1))
+                start = remove[j] + 1
+                j += 1
+            if start <= end:
+                ranges.append((start, end))
+        
+        return TaskIdSet(ranges)
+
+def parse_task_ids(input_str):
+    """Parse task IDs from user input (supports ranges and lists)"""
+    ranges = []
+    
+    try:
+        # Split by comma
+        parts = input_str.split(',')
+        
+        for part in parts:
+            part = part.strip()
+            
+            # Check for range (e.g., "1-5")
+            if '-' in part:
+                start, end = part.split('-')
+                start = int(start.strip())
+                end = int(end.strip())
+                
+                if start > end:
+                    print(f"{Fore.YELLOW}⚠ Invalid range: {part} (start > end){Style.RESET_ALL}")
+                    continue
+                
+                ranges.append((start, end))
+            else:
+                # Single ID
+                task_id = int(part)
+                ranges.append((task_id, task_id))
+        
+        return TaskIdSet(ranges)
+    except ValueError:
+        print(f"{Fore.RED}✗ Invalid format. Use: 1,2,3 or 1-5 or 1,3-5,7{Style.RESET_ALL}")
+        return None
+
+def index_tasks(tasks):
+    """Map task IDs to tasks for constant-time lookups"""
+    return {task.id: task for task in tasks}
+
+def complete_mutation():
+    """Mutation that marks a task as complete"""
+    def mutate(task):
+        if task.completed:
+            return False
+        task.completed = True
+        return True
+    return mutate
+
+def priority_mutation(priority):
+    """Mutation that sets a task's priority"""
+    def mutate(task):
+        task.priority = priority
+        return True
+    return mutate
+
+def category_mutation(category):
+    """Mutation that sets a task's category"""
+    def mutate(task):
+        task.category = category
+        return True
+    return mutate
+
+def tag_mutation(tag):
+    """Mutation that adds a tag to a task (max 5 tags)"""
+    def mutate(task):
+        # Tasks at the limit are left unchanged; bulk_add_tag reports them
+        if tag in task.tags or len(task.tags) >= 5:
+            return False
+        
+        task.tags = task.tags + (tag,)
+        return True
+    return mutate
+
+def delete_mutation():
+    """Mutation that deletes a task"""
+    def mutate(task):
+        return DELETE
+    return mutate
+
+def combine_mutations(mutations):
+    """Chain mutations into one, which stops at the first that deletes the task"""
+    def mutate(task):
+        changed = False
+        for mutation in mutations:
+            outcome = mutation(task)
+            if outcome == DELETE:
+                return DELETE
+            changed = outcome or changed
+        return changed
+    return mutate
+
+def apply_bulk(tasks, task_ids, mutations, store=None):
+    """Apply a list of mutations to the selected tasks in a single pass
+    
+    Each mutation takes a task and returns True if it changed it, False if
+    it left it unchanged, or DELETE to remove it. IDs are resolved against
+    one index, deleted tasks are filtered out of the list in one final
+    pass, and the caller saves once, so the cost is O(n + k).
+    
+    If a store is given (see backend.TaskBackend), IDs are resolved by
+    the store and the changes go through its modify(), which reads only
+    the selected tasks and records the changes as one batch (a single log
+    append or transaction) without losing concurrent changes made by
+    other processes. The caller does not need to save at all, and tasks
+    may then be None.
+    """
+    if not isinstance(task_ids, TaskIdSet):
+        task_ids = TaskIdSet.from_ids(task_ids)
+    mutate = combine_mutations(mutations)
+    
+    if store is not None:
+        changed, unchanged, deleted = store.modify(store.match_ids(task_ids), mutate)
+        found = [task.id for task in changed + unchanged + deleted]
+        result = {"changed": changed, "unchanged": unchanged, "deleted": deleted, "not_found": task_ids.difference(found)}
+    else:
+        index = index_tasks(tasks)
+        selected = task_ids.intersection(index)
+        result = {"changed": [], "unchanged": [], "deleted": [], "not_found": task_ids.difference(selected)}
+        
+        for task_id in selected:
+            task = index[task_id]
+            outcome = mutate(task)
+            
+            if outcome == DELETE:
+                result["deleted"].append(task)
+            elif outcome:
+                result["changed"].append(task)
+            else:
+                result["unchanged"].append(task)
+    
+    deleted_ids = {task.id for task in result["deleted"]}
+    if deleted_ids and tasks:
+        tasks[:] = [task for task in tasks if task.id not in deleted_ids]
+    
+    return result
+
+def _has_tasks(tasks, store):
+    """Check whether there is anything for a bulk operation to work on"""
+    return store.count() > 0 if store is not None else bool(tasks)
+
+def _print_not_found(not_found):
+    """Report task IDs that did not match any task"""
+    if not_found:
+        print(f"{Fore.RED}✗ Not found: {not_found}{Style.RESET_ALL}")
+
+def bulk_complete_tasks(tasks, task_ids, store=None):
+    """Mark multiple tasks as complete"""
+    if not _has_tasks(tasks, store):
+        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
+        return tasks, 0
+    
+    result = apply_bulk(tasks, task_ids, [complete_mutation()], store)
+    completed_count = len(result["changed"])
+    already_completed = [task.id for task in result["unchanged"]]
+    
+    # Display results
+    if completed_count > 0:
+        print(f"{Fore.GREEN}✓ Marked {completed_count} task(s) as complete!{Style.RESET_ALL}")
+    
+    if already_completed:
+        print(f"{Fore.YELLOW}⚠ Already completed: {', '.join(map(str, already_completed))}{Style.RESET_ALL}")
+    
+    _print_not_found(result["not_found"])
+    
+    return tasks, completed_count
+
+def bulk_delete_tasks(tasks, task_ids, store=None):
+    """Delete multiple tasks"""
+    if not _has_tasks(tasks, store):
+        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
+        return tasks, 0
+    
+    # Remaining tasks keep their IDs
+    result = apply_bulk(tasks, task_ids, [delete_mutation()], store)
+    deleted_count = len(result["deleted"])
+    
+    # Display results
+    if deleted_count > 0:
+        print(f"{Fore.GREEN}✓ Deleted {deleted_count} task(s):{Style.RESET_ALL}")
+        for task in result["deleted"]:
+            print(f"  - {task.title}")
+    
+    _print_not_found(result["not_found"])
+    
+    return tasks, deleted_count
+
+def bulk_change_priority(tasks, task_ids, new_priority, store=None):
+    """Change priority for multiple tasks"""
+    if not _has_tasks(tasks, store):
+        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
+        return tasks, 0
+    
+    result = apply_bulk(tasks, task_ids, [priority_mutation(new_priority)], store)
+    changed_count = len(result["changed"])
+    
+    # Display results
+    if changed_count > 0:
+        print(f"{Fore.GREEN}✓ Changed priority to {new_priority.upper()} for {changed_count} task(s)!{Style.RESET_ALL}")
+    
+    _print_not_found(result["not_found"])
+    
+    return tasks, changed_count
+
+def bulk_add_category(tasks, task_ids, category, store=None):
+    """Add category to multiple tasks"""
+    if not _has_tasks(tasks, store):
+        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
+        return tasks, 0
+    
+    result = apply_bulk(tasks, task_ids, [category_mutation(category)], store)
+    updated_count = len(result["changed"])
+    
+    # Display results
+    if updated_count > 0:
+        print(f"{Fore.GREEN}✓ Added category '{category}' to {updated_count} task(s)!{Style.RESET_ALL}")
+    
+    _print_not_found(result["not_found"])
+    
+    return tasks, updated_count
+
+def bulk_add_tag(tasks, task_ids, tag, store=None):
+    """Add a tag to multiple tasks"""
+    if not _has_tasks(tasks, store):
+        print(f"{Fore.YELLOW}No tasks available.{Style.RESET_ALL}")
+        return tasks, 0
+    
+    result = apply_bulk(tasks, task_ids, [tag_mutation(tag)], store)
+    updated_count = len(result["changed"])
+    # Reported only now, as modify() may run the mutation more than once
+    full = [task.id for task in result["unchanged"] if tag not in task.tags]
+    
+    # Display results
+    if updated_count > 0:
+        print(f"{Fore.GREEN}✓ Added tag '{tag}' to {updated_count} task(s)!{Style.RESET_ALL}")
+    
+    for task_id in full:
+        print(f"{Fore.YELLOW}⚠ Task {task_id} already has 5 tags (max limit){Style.RESET_ALL}")
+    
+    _print_not_found(result["not_found"])
+    
     return tasks, updated_count
\ No newline at end of file
@@ -0,0 +1,420 @@
+import argparse
+import os
+import re
+import shlex
+import sys
+from datetime import date, datetime, timedelta
+from colorama import Fore, Style
+from bulk_operations import (
+    parse_task_ids,
+    bulk_complete_tasks,
+    bulk_delete_tasks,
+    bulk_change_priority,
+    bulk_add_category,
+    bulk_add_tag
+)
+from backend import ORDERS
+from export_utils import export_to_csv
+from query import CategoryFilter, OverdueFilter, QueryError, StatusFilter, TagFilter, parse_query
+from task_server import PRIORITIES, RequestError, ServerLostError, TaskClient, TaskService, socket_path
+
+# A shell-style word in a batch line, and the pieces it is made of:
+# plain text, "double quoted" (with \" and \\ escapes), 'single quoted'
+# or a backslash-escaped character
+_WORD = re.compile(r"""(?:[^\s"'\\]+|"(?:[^"\\]|\\.)*"|'[^']*'|\\.)+""", re.S)
+_PIECE = re.compile(r"""[^"'\\]+|"((?:[^"\\]|\\.)*)"|'([^']*)'|\\(.)""", re.S)
+_QUOTING = re.compile(r"[\"'\\]")
+_QUOTED_ESCAPE = re.compile(r'\\([\\"])')
+
+
+class CommandError(Exception):
+    """A command that cannot be run as given"""
+
+
+class CommandParser(argparse.ArgumentParser):
+    """ArgumentParser that raises CommandError instead of exiting, so batch mode can go on
+
+    Its subcommand parsers are CommandParsers too. None of them take -h,
+    which would print the help and exit in the middle of a batch.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs["add_help"] = False
+        super().__init__(*args, **kwargs)
+
+    def error(self, message):
+        raise CommandError(message)
+
+    def exit(self, status=0, message=None):
+        raise CommandError(message.strip() if message else f"exited with status {status}")
+
+
+def parse_due_date(text):
+    """Parse a due date given as YYYY-MM-DD, today, tomorrow or +N (days from now)"""
+    lowered = text.lower()
+    if lowered == "today":
+        days = 0
+    elif lowered == "tomorrow":
+        days = 1
+    elif text.startswith("+"):
+        try:
+            days = int(text[1:])
+        except ValueError:
+            raise CommandError(f"invalid due date '{text}': use +N where N is a number of days")
+    else:
+        try:
+            return datetime.strptime(text, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except ValueError:
+            raise CommandError(f"invalid due date '{text}': use YYYY-MM-DD, today, tomorrow or +N")
+    return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def parse_tags(text):
+    """Parse comma-separated tags the way the menu does (lowercase, 15 characters, no repeats, at most 5)"""
+    tags = dict.fromkeys(tag.strip().lower()[:15] for tag in text.split(",") if tag.strip())
+    return list(tags)[:5]
+
+
+def _task_ids(text):
+    """Parse task IDs like 1,3-5; parse_task_ids() has already said what is wrong if not"""
+    task_ids = parse_task_ids(text)
+    if task_ids is None:
+        raise CommandError(f"invalid task IDs '{text}'")
+    return task_ids
+
+
+def _unquote(match):
+    """Replacement for one piece of a word matched by _PIECE"""
+    double, single, escaped = match.groups()
+    if double is not None:
+        return _QUOTED_ESCAPE.sub(r"\1", double)
+    if single is not None:
+        return single
+    if escaped is not None:
+        return escaped
+    return match.group()
+
+
+def split_line(line):
+    """Split a batch line into words like shlex.split(), but several times faster
+
+    Lines it cannot split on its own (such as an unclosed quote) are left
+    to shlex, which raises ValueError for them.
+    """
+    words = []
+    end = 0
+    for match in _WORD.finditer(line):
+        if line[end:match.start()].strip():
+            return shlex.split(line)
+        word = match.group()
+        words.append(_PIECE.sub(_unquote, word) if _QUOTING.search(word) else word)
+        end = match.end()
+    if line[end:].strip():
+        return shlex.split(line)
+    return words
+
+
+def print_tasks(tasks):
+    """Print tasks one per line as tab-separated fields, for scripts to read"""
+    count = 0
+    for task in tasks:
+        print("\t".join((
+            str(task.id),
+            "completed" if task.completed else "pending",
+            task.priority,
+            task.due_date or "-",
+            task.category or "-",
+            ",".join(task.tags) or "-",
+            task.title
+        )))
+        count += 1
+    return count
+
+
+def _print_not_found(not_found):
+    """Report task IDs that did not match any task"""
+    if not_found:
+        print(f"{Fore.RED}✗ Not found: {not_found}{Style.RESET_ALL}")
+
+
+def cmd_add(service, args):
+    """Add a task"""
+    task = service.add_task(
+        title=args.title,
+        priority=args.priority,
+        due_date=parse_due_date(args.due) if args.due else None,
+        category=args.category,
+        tags=parse_tags(args.tags) if args.tags else []
+    )
+    print(f"{Fore.GREEN}✓ Task {task.id} added: {task.title}{Style.RESET_ALL}")
+
+
+def cmd_complete(service, args):
+    """Mark tasks as complete"""
+    result = service.complete_task(_task_ids(args.ids))
+    if result["completed"]:
+        print(f"{Fore.GREEN}✓ Marked {len(result['completed'])} task(s) as complete!{Style.RESET_ALL}")
+    if result["already_completed"]:
+        print(f"{Fore.YELLOW}⚠ Already completed: {', '.join(map(str, result['already_completed']))}{Style.RESET_ALL}")
+    _print_not_found(result["not_found"])
+
+
+def cmd_delete(service, args):
+    """Delete tasks"""
+    result = service.delete_task(_task_ids(args.ids))
+    if result["deleted"]:
+        print(f"{Fore.GREEN}✓ Deleted {len(result['deleted'])} task(s):{Style.RESET_ALL}")
+        for task in result["deleted"]:
+            print(f"  - {task.title}")
+    _print_not_found(result["not_found"])
+
+
+def cmd_edit(service, args):
+    """Change fields of a task; 'none' clears the due date, category or tags"""
+    changes = {}
+    if args.title is not None:
+        changes["title"] = args.title
+    if args.priority is not None:
+        changes["priority"] = args.priority
+    if args.due is not None:
+        changes["due_date"] = None if args.due.lower() == "none" else parse_due_date(args.due)
+    if args.category is not None:
+        changes["category"] = None if args.category.lower() == "none" else args.category
+    if args.tags is not None:
+        changes["tags"] = [] if args.tags.lower() == "none" else parse_tags(args.tags)
+    if not changes:
+        raise CommandError("nothing to change: give --title, --priority, --due, --category or --tags")
+    service.edit_task(args.id, **changes)
+    print(f"{Fore.GREEN}✓ Task {args.id} updated successfully!{Style.RESET_ALL}")
+
+
+def _plan(store, args):
+    """Plan how to find the tasks a list or export command asks for (see query.py)"""
+    today = date.today().toordinal()
+    try:
+        query = parse_query(args.query or "", today)
+    except QueryError as e:
+        raise CommandError(str(e))
+
+    # The filter options are just more query terms
+    if args.completed:
+        query.filters.append(StatusFilter("--completed", True))
+    if args.pending:
+        query.filters.append(StatusFilter("--pending", False))
+    if args.overdue:
+        query.filters.append(OverdueFilter("--overdue", today))
+    if args.category:
+        query.filters.append(CategoryFilter(f"--category {args.category}", (args.category.lower(),)))
+    if args.tag:
+        query.filters.append(TagFilter(f"--tag {args.tag}", (args.tag.lower(),)))
+
+    if args.sort == "added":
+        return query.plan(store)
+    # Sorted orders are kept by the loaded store, not sorted here
+    store.open()
+    return query.plan(store, args.sort)
+
+
+def cmd_list(service, args):
+    """List tasks, in the order they were added or in a sorted order"""
+    plan = _plan(service.store, args)
+    if args.explain:
+        for step in plan.describe():
+            print(step)
+        return
+    print_tasks(plan.run())
+
+
+def cmd_search(service, args):
+    """List tasks whose title (or notes) contain every word of the query"""
+    print_tasks(service.search(" ".join(args.query), "notes" if args.notes else "title"))
+
+
+def cmd_stats(service, args):
+    """Print the task statistics as name, tab, value lines"""
+    for name, value in service.statistics().items():
+        print(f"{name}\t{value}")
+
+
+def cmd_bulk(service, args):
+    """Run a bulk operation on a set of task IDs"""
+    task_ids = _task_ids(args.ids)
+    store = service.store
+    store.open()
+    if args.operation == "complete":
+        bulk_complete_tasks(None, task_ids, store)
+    elif args.operation == "delete":
+        bulk_delete_tasks(None, task_ids, store)
+    elif args.value is None:
+        raise CommandError(f"bulk {args.operation} needs a value")
+    elif args.operation == "priority":
+        if args.value.lower() not in PRIORITIES:
+            raise CommandError(f"invalid priority '{args.value}': use high, medium or low")
+        bulk_change_priority(None, task_ids, args.value.lower(), store)
+    elif args.operation == "category":
+        bulk_add_category(None, task_ids, args.value.lower()[:20], store)
+    else:
+        bulk_add_tag(None, task_ids, args.value.lower()[:15], store)
+
+
+def cmd_export(service, args):
+    """Export tasks to a CSV file"""
+    export_to_csv(_plan(service.store, args).run(), args.output)
+
+
+def _add_filters(parser):
+    """Options shared by list and export to pick tasks"""
+    status = parser.add_mutually_exclusive_group()
+    status.add_argument("--completed", action="store_true", help="only completed tasks")
+    status.add_argument("--pending", action="store_true", help="only pending tasks")
+    status.add_argument("--overdue", action="store_true", help="only pending tasks past their due date")
+    parser.add_argument("-c", "--category", help="only tasks in this category")
+    parser.add_argument("-t", "--tag", help="only tasks with this tag")
+    parser.add_argument("-q", "--query", help="only tasks matching a query, e.g. 'priority:high due<+3 -completed'")
+    parser.add_argument("-s", "--sort", choices=("added",) + ORDERS, default="added",
+                        help="order of the tasks (default: the order they were added)")
+
+
+def add_commands(parser):
+    """Add the scripting subcommands to an ArgumentParser; each one's handler is args.run
+
+    args.served is True for the commands a task server can run.
+    """
+    parser.set_defaults(served=False)
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    add = commands.add_parser("add", help="add a task")
+    add.add_argument("title")
+    add.add_argument("-p", "--priority", choices=PRIORITIES, default="medium")
+    add.add_argument("-d", "--due", help="YYYY-MM-DD, today, tomorrow or +N days")
+    add.add_argument("-c", "--category")
+    add.add_argument("-t", "--tags", help="comma-separated, at most 5")
+    add.set_defaults(run=cmd_add, served=True)
+
+    complete = commands.add_parser("complete", help="mark tasks as complete")
+    complete.add_argument("ids", help="task IDs, e.g. 1,3-5")
+    complete.set_defaults(run=cmd_complete, served=True)
+
+    edit = commands.add_parser("edit", help="change a task's fields")
+    edit.add_argument("id", type=int)
+    edit.add_argument("--title")
+    edit.add_argument("-p", "--priority", choices=PRIORITIES)
+    edit.add_argument("-d", "--due", help="new due date, or none")
+    edit.add_argument("-c", "--category", help="new category, or none")
+    edit.add_argument("-t", "--tags", help="new comma-separated tags, or none")
+    edit.set_defaults(run=cmd_edit, served=True)
+
+    delete = commands.add_parser("delete", help="delete tasks")
+    delete.add_argument("ids", help="task IDs, e.g. 1,3-5")
+    delete.set_defaults(run=cmd_delete, served=True)
+
+    list_parser = commands.add_parser("list", help="list tasks as tab-separated lines")
+    _add_filters(list_parser)
+    list_parser.add_argument("--explain", action="store_true", help="show how the tasks would be found instead of listing them")
+    list_parser.set_defaults(run=cmd_list)
+
+    search = commands.add_parser("search", help="search task titles")
+    search.add_argument("query", nargs="+")
+    search.add_argument("--notes", action="store_true", help="search notes instead of titles")
+    search.set_defaults(run=cmd_search, served=True)
+
+    stats = commands.add_parser("stats", help="print task statistics as tab-separated lines")
+    stats.set_defaults(run=cmd_stats, served=True)
+
+    bulk = commands.add_parser("bulk", help="complete, delete, or set the priority, category or a tag of many tasks")
+    bulk.add_argument("operation", choices=("complete", "delete", "priority", "category", "tag"))
+    bulk.add_argument("ids", help="task IDs, e.g. 1,3-5")
+    bulk.add_argument("value", nargs="?", help="the priority, category or tag")
+    bulk.set_defaults(run=cmd_bulk)
+
+    export = commands.add_parser("export", help="export tasks to CSV")
+    _add_filters(export)
+    export.add_argument("-o", "--output", help="file name (default: tasks_export_<time>.csv)")
+    export.set_defaults(run=cmd_export)
+
+    batch = commands.add_parser("batch", help="run commands from a file, one per line, as a single change")
+    batch.add_argument("file", nargs="?", default="-", help="file to read (default: standard input)")
+    batch.set_defaults(run=cmd_batch)
+    return commands
+
+
+def run_command(store, args):
+    """Run a parsed command; returns 0 on success and 1 if it failed
+
+    If a task server is running for the store (see task_server.py), the
+    commands it offers are sent to it, which saves loading the store
+    here; otherwise they run on the store directly.
+    """
+    client = TaskClient.connect(socket_path(store.path)) if args.served else None
+    try:
+        args.run(client or TaskService(store), args)
+        # A closed output pipe shows up here at the latest, not at exit
+        sys.stdout.flush()
+    except (CommandError, RequestError) as e:
+        print(f"{Fore.RED}✗ {str(e)}{Style.RESET_ALL}")
+        return 1
+    except ServerLostError as e:
+        print(f"{Fore.RED}✗ Lost the task server: {str(e)}{Style.RESET_ALL}")
+        return 1
+    except BrokenPipeError:
+        # Whatever read the output stopped early (e.g. `| head`); point stdout
+        # at devnull so the flush at exit does not fail again
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+        return 1
+    finally:
+        if client is not None:
+            client.close()
+    return 0
+
+
+def run_batch(store, lines):
+    """Run one command per line inside a single store batch; returns the number that failed
+
+    Blank lines and lines starting with # are skipped. A failing command
+    is reported with its line number and the rest still run. Commands
+    always run here, not on a task server, since the batch holds the
+    store for writing.
+    """
+    service = TaskService(store)
+    parser = CommandParser(prog="batch")
+    commands = add_commands(parser).choices
+    failed = 0
+    count = 0
+
+    with store.batch():
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            count += 1
+            try:
+                words = split_line(line)
+                command = commands.get(words[0]) if words[0] != "batch" else None
+                if command is None:
+                    raise CommandError(f"unknown command '{words[0]}'")
+                # Going straight to the command's own parser halves the parsing time
+                args = command.parse_args(words[1:])
+                args.run(service, args)
+            except (CommandError, RequestError, ValueError) as e:
+                print(f"{Fore.RED}✗ Line {number}: {str(e)}{Style.RESET_ALL}")
+                failed += 1
+
+    print(f"{Fore.CYAN}Ran {count} command(s), {failed} failed.{Style.RESET_ALL}")
+    return failed
+
+
+def cmd_batch(service, args):
+    """Run commands from a file or standard input"""
+    if args.file == "-":
+        failed = run_batch(service.store, sys.stdin)
+    else:
+        try:
+            with open(args.file, "r", encoding="utf-8") as f:
+                failed = run_batch(service.store, f)
+        except OSError as e:
+            raise CommandError(f"cannot read '{args.file}': {e.strerror}")
+    if failed:
+        raise CommandError(f"{failed} command(s) failed")
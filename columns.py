@@ -0,0 +1,212 @@
+import base64
+from array import array
+
+from task_model import priority_code
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Priority code marking a row whose task has been removed
+_DELETED = -1
+
+# Deleted rows are only compacted away once there are at least this many
+_COMPACT_MIN_DELETED = 1024
+
+
+class ColumnIndex:
+    """The fields analytics look at, stored as typed columns
+
+    One row per task: completed (int8), priority code (int8), due day
+    ordinal (int32, 0 when unset) and a dictionary-encoded category
+    (int32, -1 when unset), each in a stdlib array. With NumPy installed,
+    select() and count() run as vectorised masks over zero-copy views of
+    the arrays; without it they make a single pass over them.
+
+    Removing a task only marks its row as deleted. The columns are
+    compacted once deleted rows outnumber live ones.
+    """
+
+    def __init__(self, name="columns"):
+        self.name = name
+        self.clear()
+
+    def clear(self):
+        """Remove everything from the index"""
+        self.ids = array("q")
+        self.completed = array("b")
+        self.priority = array("b")
+        self.due = array("i")
+        self.category = array("i")
+        self.categories = []       # category code -> category
+        self.category_codes = {}   # category -> category code
+        self.rows = {}             # task ID -> row, None until needed
+        self.deleted = 0
+
+    def add(self, task):
+        """Append a row for a task"""
+        if self.rows is not None:
+            self.rows[task.id] = len(self.ids)
+
+        self.ids.append(task.id)
+        self.completed.append(task.completed)
+        self.priority.append(task.priority_code)
+        self.due.append(task.due_ordinal or 0)
+        self.category.append(self._category_code(task.category))
+
+    def remove(self, task_id):
+        """Mark a task's row as deleted"""
+        if self.rows is None:
+            self._build_rows()
+
+        row = self.rows.pop(task_id, None)
+        if row is None:
+            return
+
+        self.priority[row] = _DELETED
+        self.deleted += 1
+        if self.deleted >= _COMPACT_MIN_DELETED and self.deleted * 2 > len(self.ids):
+            self._compact()
+
+    def _category_code(self, category):
+        """Get the dictionary code for a category, adding it if new"""
+        if category is None:
+            return -1
+
+        code = self.category_codes.get(category)
+        if code is None:
+            code = self.category_codes[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    def _build_rows(self):
+        """Rebuild the task ID -> row map from the live rows"""
+        self.rows = {
+            task_id: row for row, (task_id, code) in enumerate(zip(self.ids, self.priority))
+            if code != _DELETED
+        }
+
+    def _compact(self):
+        """Drop deleted rows from every column"""
+        live = [row for row, code in enumerate(self.priority) if code != _DELETED]
+        for name in ("ids", "completed", "priority", "due", "category"):
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, [column[row] for row in live]))
+
+        self.deleted = 0
+        self.rows = None
+
+    def total(self):
+        """Number of tasks"""
+        return len(self.ids) - self.deleted
+
+    def select(self, completed=None, priority=None, category=None, due_first=None, due_last=None):
+        """Get the IDs of tasks matching every given filter, in no particular order
+
+        due_first and due_last are inclusive day ordinals; giving either one
+        leaves out tasks without a due date.
+        """
+        filters = self._filters(completed, priority, category, due_first, due_last)
+        if filters is None:
+            return []
+
+        if np is not None:
+            return np.frombuffer(self.ids, dtype=np.int64)[self._mask(*filters)].tolist()
+        return [self.ids[row] for row in self._matching_rows(*filters)]
+
+    def count(self, completed=None, priority=None, category=None, due_first=None, due_last=None):
+        """Count the tasks matching every given filter (see select)"""
+        filters = self._filters(completed, priority, category, due_first, due_last)
+        if filters is None:
+            return 0
+
+        if np is not None:
+            return int(np.count_nonzero(self._mask(*filters)))
+        return sum(1 for _ in self._matching_rows(*filters))
+
+    def completion_rate(self):
+        """Completion rate percentage"""
+        total = self.total()
+        return round((self.count(completed=True) / total) * 100, 1) if total else 0
+
+    def _filters(self, completed, priority, category, due_first, due_last):
+        """Turn select() arguments into column codes, or None if nothing can match"""
+        if not self.ids:
+            return None
+
+        if category is not None:
+            category = self.category_codes.get(category)
+            if category is None:
+                return None
+
+        if due_first is not None or due_last is not None:
+            # Unset due dates are stored as 0, below every real ordinal
+            due_first = max(due_first or 1, 1)
+
+        return (
+            None if completed is None else int(completed),
+            None if priority is None else priority_code(priority),
+            category,
+            due_first,
+            due_last
+        )
+
+    def _mask(self, completed, priority, category, due_first, due_last):
+        """Build a NumPy mask of the live rows matching the filters"""
+        priorities = np.frombuffer(self.priority, dtype=np.int8)
+        mask = priorities != _DELETED
+
+        if completed is not None:
+            mask &= np.frombuffer(self.completed, dtype=np.int8) == completed
+        if priority is not None:
+            mask &= priorities == priority
+        if category is not None:
+            mask &= np.frombuffer(self.category, dtype=np.int32) == category
+        if due_first is not None:
+            mask &= np.frombuffer(self.due, dtype=np.int32) >= due_first
+        if due_last is not None:
+            mask &= np.frombuffer(self.due, dtype=np.int32) <= due_last
+
+        return mask
+
+    def _matching_rows(self, completed, priority, category, due_first, due_last):
+        """Yield the live rows matching the filters, without NumPy"""
+        rows = zip(self.completed, self.priority, self.category, self.due)
+        for row, (row_completed, row_priority, row_category, row_due) in enumerate(rows):
+            if row_priority == _DELETED:
+                continue
+            if completed is not None and row_completed != completed:
+                continue
+            if priority is not None and row_priority != priority:
+                continue
+            if category is not None and row_category != category:
+                continue
+            if due_first is not None and row_due < due_first:
+                continue
+            if due_last is not None and row_due > due_last:
+                continue
+            yield row
+
+    def get_state(self):
+        """Get the index contents in a JSON-serialisable form"""
+        state = {
+            name: base64.b64encode(getattr(self, name).tobytes()).decode("ascii")
+            for name in ("ids", "completed", "priority", "due", "category")
+        }
+        state["categories"] = self.categories
+        state["deleted"] = self.deleted
+        return state
+
+    def set_state(self, state):
+        """Restore the index contents saved by get_state"""
+        self.clear()
+
+        for name in ("ids", "completed", "priority", "due", "category"):
+            getattr(self, name).frombytes(base64.b64decode(state[name]))
+
+        self.categories = state["categories"]
+        self.category_codes = {category: code for code, category in enumerate(self.categories)}
+        self.deleted = state["deleted"]
+        # The row map is only needed once a task is removed
+        self.rows = None
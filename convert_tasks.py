@@ -0,0 +1,43 @@
+import os
+import sqlite3
+import sys
+from colorama import Fore, Style, init
+from storage import FORMAT_FILES, convert_store
+
+USAGE = """Usage: python convert_tasks.py to-json|to-binary|to-sqlite [SOURCE DEST]
+
+Convert the task store between the JSON, binary and SQLite formats.
+DEST defaults to tasks.json, tasks.bin or tasks.db, and SOURCE to
+whichever of the other two exists. The format of each file follows its
+extension (.db is SQLite, .bin is binary, anything else is JSON).
+Set TASKS_FORMAT=binary or TASKS_FORMAT=sqlite to make the task manager
+use tasks.bin or tasks.db."""
+
+COMMANDS = {"to-json": "json", "to-binary": "binary", "to-sqlite": "sqlite"}
+
+def main(argv):
+    """Convert a task store from the command line"""
+    init(autoreset=True)
+
+    if len(argv) not in (1, 3) or argv[0] not in COMMANDS:
+        print(USAGE)
+        return 2
+
+    if len(argv) == 3:
+        source, dest = argv[1], argv[2]
+    else:
+        dest = FORMAT_FILES[COMMANDS[argv[0]]]
+        others = [path for path in FORMAT_FILES.values() if path != dest]
+        source = next((path for path in others if os.path.exists(path)), others[0])
+
+    try:
+        count = convert_store(source, dest)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"{Fore.RED}✗ Error converting tasks: {str(e)}{Style.RESET_ALL}")
+        return 1
+
+    print(f"{Fore.GREEN}✓ Converted {count} task(s) from '{source}' to '{dest}'!{Style.RESET_ALL}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
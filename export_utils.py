@@ -1,74 +1,109 @@
-import csv
-from datetime import datetime
-from colorama import Fore, Style
-
-def export_to_csv(tasks, filename=None):
-    """Export tasks to CSV file"""
-    if not tasks:
-        print(f"{Fore.YELLOW}No tasks to export.{Style.RESET_ALL}")
-        return False
-    
-    # Generate filename if not provided
-    if not filename:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"tasks_export_{timestamp}.csv"
-    
-    # Ensure .csv extension
-    if not filename.endswith('.csv'):
-        filename += '.csv'
-    
-    try:
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['ID', 'Title', 'Priority', 'Status', 'Due Date', 'Category', 'Tags', 'Created At']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            
-            for task in tasks:
-                status = "Completed" if task.get("completed", False) else "Pending"
-                tags = ", ".join(task.get("tags", [])) if task.get("tags") else ""
-                due_date = task.get("due_date", "")
-                category = task.get("category", "")
-                created = task.get("created_at", "")
-                
-                writer.writerow({
-                    'ID': task.get("id", ""),
-                    'Title': task.get("title", ""),
-                    'Priority': task.get("priority", "medium").upper(),
-                    'Status': status,
-                    'Due Date': due_date,
-                    'Category': category,
-                    'Tags': tags,
-                    'Created At': created
-                })
-        
-        print(f"{Fore.GREEN}✓ Tasks exported successfully to '{filename}'!{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}  Total tasks exported: {len(tasks)}{Style.RESET_ALL}")
-        return True
-        
-    except Exception as e:
-        print(f"{Fore.RED}✗ Error exporting tasks: {str(e)}{Style.RESET_ALL}")
-        return False
-
-def export_filtered_to_csv(tasks, filter_type="all"):
-    """Export filtered tasks to CSV"""
-    if not tasks:
-        print(f"{Fore.YELLOW}No tasks to export.{Style.RESET_ALL}")
-        return
-    
-    # Filter tasks based on type
-    if filter_type == "completed":
-        filtered = [t for t in tasks if t.get("completed", False)]
-        filename = f"tasks_completed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    elif filter_type == "pending":
-        filtered = [t for t in tasks if not t.get("completed", False)]
-        filename = f"tasks_pending_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    else:
-        filtered = tasks
-        filename = f"tasks_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    
-    if not filtered:
-        print(f"{Fore.YELLOW}No tasks match the filter criteria.{Style.RESET_ALL}")
-        return
-    
+import csv
+from datetime import datetime
+from itertools import chain, islice
+from colorama import Fore, Style
+
+CSV_HEADER = ('ID', 'Title', 'Priority', 'Status', 'Due Date', 'Category', 'Tags', 'Created At')
+
+# Number of rows handed to csv.writer at a time
+EXPORT_BATCH_SIZE = 1000
+
+# Size of the output file's write buffer
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+def _peek(tasks):
+    """Get an iterator over tasks, or None if there are none
+    
+    Works for lists and one-shot iterators alike without consuming a task.
+    """
+    tasks = iter(tasks)
+    first = next(tasks, None)
+    if first is None:
+        return None
+    return chain((first,), tasks)
+
+def task_row(task):
+    """Get the CSV row for a task as a tuple in CSV_HEADER order"""
+    return (
+        task.id,
+        task.title,
+        task.priority.upper(),
+        "Completed" if task.completed else "Pending",
+        task.due_date,
+        task.category,
+        ", ".join(task.tags),
+        task.created_at
+    )
+
+def write_csv_rows(csvfile, tasks):
+    """Write the header and one row per task, in batches, and return the row count"""
+    writer = csv.writer(csvfile)
+    writer.writerow(CSV_HEADER)
+    
+    rows = map(task_row, tasks)
+    count = 0
+    
+    while True:
+        batch = list(islice(rows, EXPORT_BATCH_SIZE))
+        if not batch:
+            return count
+        writer.writerows(batch)
+        count += len(batch)
+
+def export_to_csv(tasks, filename=None):
+    """Export tasks to CSV file
+    
+    tasks can be any iterable, such as a generator over the task store.
+    Rows are written as they are produced, so memory use does not grow
+    with the number of tasks.
+    """
+    tasks = _peek(tasks)
+    if tasks is None:
+        print(f"{Fore.YELLOW}No tasks to export.{Style.RESET_ALL}")
+        return False
+    
+    # Generate filename if not provided
+    if not filename:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"tasks_export_{timestamp}.csv"
+    
+    # Ensure .csv extension
+    if not filename.endswith('.csv'):
+        filename += '.csv'
+    
+    try:
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as csvfile:
+            count = write_csv_rows(csvfile, tasks)
+        
+        print(f"{Fore.GREEN}✓ Tasks exported successfully to '{filename}'!{Style.RESET_ALL}")
+        print(f"{Fore.CYAN}  Total tasks exported: {count}{Style.RESET_ALL}")
+        return True
+        
+    except Exception as e:
+        print(f"{Fore.RED}✗ Error exporting tasks: {str(e)}{Style.RESET_ALL}")
+        return False
+
+def export_filtered_to_csv(tasks, filter_type="all"):
+    """Export filtered tasks to CSV"""
+    tasks = _peek(tasks)
+    if tasks is None:
+        print(f"{Fore.YELLOW}No tasks to export.{Style.RESET_ALL}")
+        return
+    
+    # Filter tasks lazily based on type
+    if filter_type == "completed":
+        filtered = (t for t in tasks if t.completed)
+        filename = f"tasks_completed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    elif filter_type == "pending":
+        filtered = (t for t in tasks if not t.completed)
+        filename = f"tasks_pending_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    else:
+        filtered = tasks
+        filename = f"tasks_all_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    
+    filtered = _peek(filtered)
+    if filtered is None:
+        print(f"{Fore.YELLOW}No tasks match the filter criteria.{Style.RESET_ALL}")
+        return
+    
     export_to_csv(filtered, filename)
\ No newline at end of file
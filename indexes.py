@@ -0,0 +1,403 @@
+from bisect import bisect_left, insort
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+
+from backend import PRIORITY_ORDER
+
+# Sort key of tasks without a due date in the due order, after every real day
+_NO_DUE = 2 ** 31
+
+
+@lru_cache(maxsize=4096)
+def due_ordinal(due_date):
+    """Parse a YYYY-MM-DD due date into a day ordinal, or None if invalid"""
+    if not due_date:
+        return None
+    try:
+        return datetime.strptime(due_date, "%Y-%m-%d").toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def task_category(task):
+    """Category values a task is filed under (zero or one)"""
+    category = task.category
+    return (category,) if category else ()
+
+
+def task_tags(task):
+    """Tag values a task is filed under"""
+    return task.tags
+
+
+def priority_order_key(task):
+    """Sort key of a task in the priority order"""
+    return PRIORITY_ORDER.get(task.priority, 2)
+
+
+def due_order_key(task):
+    """Sort key of a task in the due date order"""
+    ordinal = task.due_ordinal
+    return _NO_DUE if ordinal is None else ordinal
+
+
+def created_order_key(task):
+    """Sort key of a task in the creation order (ISO timestamps sort as text)"""
+    return task.created_at or ""
+
+
+class FacetIndex:
+    """Secondary index from a field value (category, tag) to task IDs
+
+    The number of tasks per value is just the size of its ID set, so facet
+    counts are always available without scanning the tasks.
+    """
+
+    def __init__(self, name, get_values):
+        self.name = name
+        self.get_values = get_values
+        self.postings = {}     # value -> set of task IDs
+        self.doc_values = {}   # task ID -> values indexed for it, None until needed
+
+    def clear(self):
+        """Remove everything from the index"""
+        self.postings = {}
+        self.doc_values = {}
+
+    def add(self, task):
+        """Index a task's values"""
+        task_id = task.id
+        # A value given twice is filed once, and must be removed once
+        values = tuple(dict.fromkeys(self.get_values(task)))
+        if self.doc_values is not None:
+            self.doc_values[task_id] = values
+
+        for value in values:
+            self.postings.setdefault(value, set()).add(task_id)
+
+    def remove(self, task_id):
+        """Drop a task from the index"""
+        if self.doc_values is None:
+            self._build_doc_values()
+
+        for value in self.doc_values.pop(task_id, ()):
+            ids = self.postings[value]
+            ids.discard(task_id)
+            if not ids:
+                del self.postings[value]
+
+    def values(self):
+        """Get every indexed value, sorted"""
+        return sorted(self.postings)
+
+    def ids(self, value):
+        """Get the IDs of tasks filed under a value"""
+        return self.postings.get(value, set())
+
+    def count(self, value):
+        """Get the number of tasks filed under a value"""
+        return len(self.postings.get(value, ()))
+
+    def counts(self):
+        """Get the number of tasks per value, sorted by value"""
+        return {value: len(self.postings[value]) for value in sorted(self.postings)}
+
+    def get_state(self):
+        """Get the index contents in a JSON-serialisable form"""
+        return {value: sorted(ids) for value, ids in self.postings.items()}
+
+    def set_state(self, state):
+        """Restore the index contents saved by get_state"""
+        self.postings = {value: set(ids) for value, ids in state.items()}
+        # Inverting the postings is only needed once a task is removed
+        self.doc_values = None
+
+    def _build_doc_values(self):
+        """Rebuild the task ID -> values map by inverting the postings"""
+        doc_values = {}
+        for value, ids in self.postings.items():
+            for task_id in ids:
+                doc_values[task_id] = doc_values.get(task_id, ()) + (value,)
+        self.doc_values = doc_values
+
+
+class OrderIndex:
+    """Task IDs kept in one listing order, so listings need no sort
+
+    Tasks sit in buckets by sort key (priority, due day, creation time),
+    with the keys in a sorted list and each bucket's IDs sorted, so
+    walking the buckets gives (key, ID) order. New tasks have the highest
+    ID yet, so adding one is usually an append to its bucket, and a task
+    whose key changes moves between buckets with two bisections.
+
+    Nothing is kept until build() is first called, so orders that are
+    never listed cost nothing on adds and changes.
+    """
+
+    def __init__(self, name, get_key):
+        self.name = name
+        self.get_key = get_key
+        self.clear()
+
+    def clear(self):
+        """Remove everything from the index, until it is built again"""
+        self.keys = None        # sorted bucket keys, None until built
+        self.buckets = {}       # key -> sorted task IDs
+        self.doc_keys = {}      # task ID -> key, None until needed
+
+    @property
+    def built(self):
+        """Whether the index holds the order"""
+        return self.keys is not None
+
+    def build(self, tasks):
+        """Put every task in order, and keep the order from now on"""
+        buckets = {}
+        doc_keys = {}
+        for task in tasks:
+            key = self.get_key(task)
+            buckets.setdefault(key, []).append(task.id)
+            doc_keys[task.id] = key
+
+        for ids in buckets.values():
+            ids.sort()
+        self.keys = sorted(buckets)
+        self.buckets = buckets
+        self.doc_keys = doc_keys
+
+    def add(self, task):
+        """Put a task in its place"""
+        if self.keys is None:
+            return
+        if self.doc_keys is None:
+            self._build_doc_keys()
+
+        key = self.get_key(task)
+        task_id = task.id
+        ids = self.buckets.get(key)
+        if ids is None:
+            self.buckets[key] = [task_id]
+            insort(self.keys, key)
+        elif task_id > ids[-1]:
+            ids.append(task_id)
+        else:
+            insort(ids, task_id)
+        self.doc_keys[task_id] = key
+
+    def remove(self, task_id):
+        """Take a task out of the order"""
+        if self.keys is None:
+            return
+        if self.doc_keys is None:
+            self._build_doc_keys()
+
+        key = self.doc_keys.pop(task_id, None)
+        if key is None:
+            return
+
+        ids = self.buckets[key]
+        del ids[bisect_left(ids, task_id)]
+        if not ids:
+            del self.buckets[key]
+            del self.keys[bisect_left(self.keys, key)]
+
+    def ids(self):
+        """Iterate over the task IDs in order; the index must not change meanwhile"""
+        return chain.from_iterable(self.buckets[key] for key in self.keys)
+
+    def get_state(self):
+        """Get the index contents in a JSON-serialisable form, or None if not built"""
+        if self.keys is None:
+            return None
+        return [[key, self.buckets[key]] for key in self.keys]
+
+    def set_state(self, state):
+        """Restore the index contents saved by get_state"""
+        if state is None:
+            self.clear()
+            return
+
+        self.keys = [key for key, _ in state]
+        self.buckets = {key: ids for key, ids in state}
+        # Inverting the buckets is only needed once a task changes
+        self.doc_keys = None
+
+    def _build_doc_keys(self):
+        """Rebuild the task ID -> key map from the buckets"""
+        self.doc_keys = {task_id: key for key, ids in self.buckets.items() for task_id in ids}
+
+
+class DueDateIndex:
+    """Pending tasks with a due date, sorted by due day
+
+    Due dates are stored on each Task as day ordinals already, and are
+    kept in a sorted list of (ordinal, task ID) pairs. Overdue, due-today
+    and due-soon lookups are then bisections over that list instead of a
+    scan that parses every task's date. Completed tasks are not indexed,
+    since none of those lookups include them.
+    """
+
+    def __init__(self, name="due"):
+        self.name = name
+        self.entries = []        # sorted (ordinal, task ID) pairs
+        self.doc_ordinals = {}   # task ID -> ordinal indexed for it
+
+    def clear(self):
+        """Remove everything from the index"""
+        self.entries = []
+        self.doc_ordinals = {}
+
+    def add(self, task):
+        """Index a task's due date if it is pending and has one"""
+        if task.completed:
+            return
+
+        ordinal = task.due_ordinal
+        if ordinal is None:
+            return
+
+        insort(self.entries, (ordinal, task.id))
+        self.doc_ordinals[task.id] = ordinal
+
+    def remove(self, task_id):
+        """Drop a task from the index"""
+        ordinal = self.doc_ordinals.pop(task_id, None)
+        if ordinal is not None:
+            del self.entries[bisect_left(self.entries, (ordinal, task_id))]
+
+    def _bounds(self, first, last):
+        """Get the slice of entries due between two ordinals (inclusive)"""
+        lo = 0 if first is None else bisect_left(self.entries, (first,))
+        hi = len(self.entries) if last is None else bisect_left(self.entries, (last + 1,))
+        return lo, max(lo, hi)
+
+    def ids_between(self, first=None, last=None):
+        """Get the IDs of tasks due between two ordinals, earliest first"""
+        lo, hi = self._bounds(first, last)
+        return [task_id for _, task_id in self.entries[lo:hi]]
+
+    def count_between(self, first=None, last=None):
+        """Count the tasks due between two ordinals"""
+        lo, hi = self._bounds(first, last)
+        return hi - lo
+
+    def overdue(self, today):
+        """Get the IDs of tasks due before today"""
+        return self.ids_between(last=today - 1)
+
+    def due_on(self, day):
+        """Get the IDs of tasks due on a given day"""
+        return self.ids_between(day, day)
+
+    def due_soon(self, today, days=3):
+        """Get the IDs of tasks due within the next few days, excluding today"""
+        return self.ids_between(today + 1, today + days)
+
+    def get_state(self):
+        """Get the index contents in a JSON-serialisable form"""
+        return self.entries
+
+    def set_state(self, state):
+        """Restore the index contents saved by get_state"""
+        self.entries = [(ordinal, task_id) for ordinal, task_id in state]
+        self.doc_ordinals = {task_id: ordinal for ordinal, task_id in self.entries}
+
+
+class StatsIndex:
+    """Running task counts for the statistics dashboard
+
+    Keeps the number of tasks per (completed, priority) pair and the note
+    totals, adjusted on every add and remove, so the dashboard never has to
+    walk the task list.
+    """
+
+    def __init__(self, name="stats"):
+        self.name = name
+        self.counts = {}        # (completed, priority) -> number of tasks
+        self.total_notes = 0
+        self.tasks_with_notes = 0
+        self.docs = {}          # task ID -> (completed, priority, note count)
+
+    def clear(self):
+        """Remove everything from the index"""
+        self.counts = {}
+        self.total_notes = 0
+        self.tasks_with_notes = 0
+        self.docs = {}
+
+    def add(self, task):
+        """Count a task"""
+        doc = (task.completed, task.priority, len(task.notes))
+        self.docs[task.id] = doc
+        self._adjust(doc, 1)
+
+    def remove(self, task_id):
+        """Stop counting a task"""
+        doc = self.docs.pop(task_id, None)
+        if doc is not None:
+            self._adjust(doc, -1)
+
+    def _adjust(self, doc, delta):
+        """Add or subtract one task's contribution to the counts"""
+        completed, priority, note_count = doc
+        key = (completed, priority)
+        self.counts[key] = self.counts.get(key, 0) + delta
+        if not self.counts[key]:
+            del self.counts[key]
+
+        if note_count:
+            self.total_notes += delta * note_count
+            self.tasks_with_notes += delta
+
+    def total(self):
+        """Number of tasks"""
+        return len(self.docs)
+
+    def completed(self):
+        """Number of completed tasks"""
+        return sum(count for (completed, _), count in self.counts.items() if completed)
+
+    def pending(self, priority=None):
+        """Number of pending tasks, optionally only those of one priority"""
+        return sum(
+            count for (completed, task_priority), count in self.counts.items()
+            if not completed and (priority is None or task_priority == priority)
+        )
+
+    def count(self, completed=None, priority=None):
+        """Number of tasks with the given status and priority (None matches any)"""
+        return sum(
+            count for (task_completed, task_priority), count in self.counts.items()
+            if (completed is None or task_completed == bool(completed))
+            and (priority is None or task_priority == priority)
+        )
+
+    def completion_rate(self):
+        """Completion rate percentage"""
+        total = self.total()
+        return round((self.completed() / total) * 100, 1) if total else 0
+
+    def notes_summary(self):
+        """Summary of notes across all tasks, as returned by get_notes_summary"""
+        return {
+            "total_notes": self.total_notes,
+            "tasks_with_notes": self.tasks_with_notes,
+            "average_notes": round(self.total_notes / self.tasks_with_notes, 1) if self.tasks_with_notes > 0 else 0
+        }
+
+    def get_state(self):
+        """Get the index contents in a JSON-serialisable form"""
+        return {
+            "counts": [[completed, priority, count] for (completed, priority), count in self.counts.items()],
+            "total_notes": self.total_notes,
+            "tasks_with_notes": self.tasks_with_notes,
+            "docs": [[task_id, *doc] for task_id, doc in self.docs.items()]
+        }
+
+    def set_state(self, state):
+        """Restore the index contents saved by get_state"""
+        self.counts = {(completed, priority): count for completed, priority, count in state["counts"]}
+        self.total_notes = state["total_notes"]
+        self.tasks_with_notes = state["tasks_with_notes"]
+        self.docs = {task_id: (completed, priority, note_count) for task_id, completed, priority, note_count in state["docs"]}
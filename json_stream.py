@@ -0,0 +1,121 @@
+import json
+import re
+
+# Number of characters read from the file at a time
+CHUNK_SIZE = 64 * 1024
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"[-+0-9.eE]*")
+
+
+class _Reader:
+    """A text file read in chunks, with a cursor into the current buffer"""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Read another chunk, dropping what has already been consumed"""
+        if self.eof:
+            return False
+
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and get the next character, or "" at the end"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        """Consume the next non-whitespace character, which must be char"""
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of the current chunk")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value may just be cut off by the end of the buffer
+                if self.fill():
+                    continue
+                raise
+
+            # A number running up to the end of the buffer may continue in the
+            # next chunk; "-1." or "2e" would have decoded as just its start
+            if _NUMBER.match(self.buffer, self.pos).end() == len(self.buffer) and self.fill():
+                continue
+
+            self.pos = end
+            return value
+
+
+def _iter_array(reader):
+    """Yield the items of the array starting at the reader's cursor"""
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+
+    while True:
+        yield reader.value()
+
+        char = reader.peek()
+        reader.pos += 1
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError(f"Expected ',' or ']' in array, found {char!r}")
+
+
+def iter_json_array(f, key=None, chunk_size=CHUNK_SIZE):
+    """Yield the items of a JSON array in a file one at a time
+
+    The array is either the whole document or, if the document is an
+    object, its member called key. Only one item and one chunk of the file
+    are held in memory at a time. If the object has no such member,
+    nothing is yielded.
+    """
+    reader = _Reader(f, chunk_size)
+
+    if reader.peek() == "[":
+        yield from _iter_array(reader)
+        return
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(":")
+
+        if name == key and reader.peek() == "[":
+            yield from _iter_array(reader)
+            return
+
+        reader.value()
+
+        char = reader.peek()
+        reader.pos += 1
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError(f"Expected ',' or '}}' in object, found {char!r}")
@@ -0,0 +1,35 @@
+import heapq
+
+# Pages are found with heaps of page size (plus offset) instead of sorting
+# every task, so a page of k out of n tasks costs O(n log k). A cursor is
+# the sort key of the first or last task on the current page; the next
+# and previous pages are the tasks just after or before it, so paging on
+# costs the same however far in it is. Keys must be unique per task (end
+# them with the task ID) for cursors to land exactly.
+
+
+def _keyed(tasks, key):
+    """Pair each task with its key, and its position to break ties"""
+    return ((key(task), i, task) for i, task in enumerate(tasks))
+
+
+def first_page(tasks, page_size, key):
+    """Get the first page_size tasks in order of key"""
+    return [task for _, _, task in heapq.nsmallest(page_size, _keyed(tasks, key))]
+
+
+def next_page(tasks, page_size, key, after):
+    """Get the page_size tasks that come right after the cursor key"""
+    keyed = (item for item in _keyed(tasks, key) if item[0] > after)
+    return [task for _, _, task in heapq.nsmallest(page_size, keyed)]
+
+
+def previous_page(tasks, page_size, key, before):
+    """Get the page_size tasks that come right before the cursor key, in order"""
+    keyed = (item for item in _keyed(tasks, key) if item[0] < before)
+    return [task for _, _, task in reversed(heapq.nlargest(page_size, keyed))]
+
+
+def page_at(tasks, offset, page_size, key):
+    """Get the page_size tasks starting at position offset (0-based) in order of key"""
+    return [task for _, _, task in heapq.nsmallest(offset + page_size, _keyed(tasks, key))[offset:]]
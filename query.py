@@ -0,0 +1,647 @@
+import re
+from datetime import date
+from operator import attrgetter
+
+from backend import ORDER_PRIORITY, ORDER_DUE, ORDER_CREATED
+from indexes import priority_order_key, due_order_key, created_order_key
+from search_index import tokenize, task_notes_text
+
+# One query term: an optional "-" to negate it, an optional field and
+# operator, and a plain or "double quoted" value
+_TERM = re.compile(r'(-)?(?:([a-z]+)(:|<=|>=|<|>|=))?("(?:[^"\\]|\\.)*"|[^\s"]+)', re.I)
+_QUOTED_ESCAPE = re.compile(r'\\([\\"])')
+
+# Field names and their short forms
+_FIELDS = {
+    "priority": "priority", "p": "priority",
+    "category": "category", "c": "category",
+    "tag": "tag", "t": "tag",
+    "due": "due", "d": "due",
+    "title": "title",
+    "note": "notes", "notes": "notes"
+}
+
+# Words that filter by status when not quoted
+_STATUS_WORDS = {"completed": True, "done": True, "pending": False}
+
+# Cost of sorting a task into order, in the units of the stores'
+# query_costs (checking a task against a filter costs 1)
+_SORT_COST = 1
+
+# Share of tasks a text term is assumed to match; the text indexes keep
+# no counts to estimate it from
+_TEXT_SELECTIVITY = 0.01
+
+# Sort key of each order; ties go by ID, as in ordered_ids()
+_ORDER_KEYS = {
+    ORDER_PRIORITY: priority_order_key,
+    ORDER_DUE: due_order_key,
+    ORDER_CREATED: created_order_key
+}
+
+
+class QueryError(Exception):
+    """A query that cannot be parsed"""
+
+
+def order_key(order):
+    """Sort key of tasks in one of the ORDERS, or by ID if order is None"""
+    if order is None:
+        return attrgetter("id")
+    key = _ORDER_KEYS[order]
+    return lambda task: (key(task), task.id)
+
+
+def parse_day(text, today):
+    """Parse a day given as YYYY-MM-DD, today, tomorrow, yesterday or +N/-N days into an ordinal"""
+    lowered = text.lower()
+    if lowered in ("today", "tomorrow", "yesterday"):
+        return today + {"today": 0, "tomorrow": 1, "yesterday": -1}[lowered]
+    if lowered[:1] in ("+", "-") and lowered[1:].isdigit():
+        return today + int(lowered)
+    try:
+        return date.fromisoformat(text).toordinal()
+    except ValueError:
+        raise QueryError(f"invalid date '{text}': use YYYY-MM-DD, today, tomorrow, yesterday or +N")
+
+
+def _due_fraction(store):
+    """Ratio of all tasks to pending ones, to scale pending-only due counts to every task"""
+    pending = store.count_where(completed=False)
+    return store.count() / pending if pending else 1
+
+
+class Filter:
+    """One condition of a query; a task matches a query if it matches every filter
+
+    Besides checking a task, a filter tells the planner what it knows
+    about how to find its tasks: how many it expects to match, the
+    select_ids() arguments it amounts to, and whether an index gives its
+    task IDs directly.
+    """
+
+    def __init__(self, term):
+        self.term = term
+
+    def __str__(self):
+        return self.term
+
+    def matches(self, task):
+        """Whether a task meets the condition"""
+        raise NotImplementedError
+
+    def estimate(self, store):
+        """Expected number of matching tasks"""
+        raise NotImplementedError
+
+    def columns(self):
+        """select_ids() arguments that match exactly these tasks, or None"""
+        return None
+
+    def indexed(self, pending):
+        """Whether index_ids() can be used; pending tells if the query only matches pending tasks"""
+        return False
+
+    def index_ids(self, store):
+        """Get the IDs of the matching tasks from an index"""
+        raise NotImplementedError
+
+
+class Not(Filter):
+    """Tasks that do not match another filter; only ever checked task by task"""
+
+    def __init__(self, term, inner):
+        super().__init__(term)
+        self.inner = inner
+
+    def matches(self, task):
+        return not self.inner.matches(task)
+
+    def estimate(self, store):
+        return max(store.count() - self.inner.estimate(store), 0)
+
+
+class StatusFilter(Filter):
+    """Completed (or pending) tasks"""
+
+    def __init__(self, term, completed):
+        super().__init__(term)
+        self.completed = completed
+
+    def matches(self, task):
+        return task.completed == self.completed
+
+    def estimate(self, store):
+        return store.count_where(completed=self.completed)
+
+    def columns(self):
+        return {"completed": self.completed}
+
+
+class OverdueFilter(Filter):
+    """Pending tasks due before today"""
+
+    def __init__(self, term, today):
+        super().__init__(term)
+        self.today = today
+
+    def matches(self, task):
+        return not task.completed and task.due_ordinal is not None and task.due_ordinal < self.today
+
+    def estimate(self, store):
+        return store.count_due(last=self.today - 1)
+
+    def columns(self):
+        return {"completed": False, "due_last": self.today - 1}
+
+    def indexed(self, pending):
+        return True
+
+    def index_ids(self, store):
+        return store.due_ids(last=self.today - 1)
+
+
+class PriorityFilter(Filter):
+    """Tasks with one of a few priorities"""
+
+    def __init__(self, term, priorities):
+        super().__init__(term)
+        self.priorities = set(priorities)
+
+    def matches(self, task):
+        return task.priority in self.priorities
+
+    def estimate(self, store):
+        return sum(store.count_where(priority=priority) for priority in self.priorities)
+
+    def columns(self):
+        if len(self.priorities) == 1:
+            return {"priority": next(iter(self.priorities))}
+        return None
+
+
+class CategoryFilter(Filter):
+    """Tasks in one of a few categories (None for tasks without one)"""
+
+    def __init__(self, term, categories):
+        super().__init__(term)
+        self.categories = set(categories)
+
+    def matches(self, task):
+        return (task.category or None) in self.categories
+
+    def estimate(self, store):
+        count = sum(store.count_in_category(category) for category in self.categories if category is not None)
+        if None in self.categories:
+            count += store.count() - sum(store.category_counts().values())
+        return count
+
+    def columns(self):
+        if len(self.categories) == 1 and None not in self.categories:
+            return {"category": next(iter(self.categories))}
+        return None
+
+    def indexed(self, pending):
+        return None not in self.categories
+
+    def index_ids(self, store):
+        if len(self.categories) == 1:
+            return store.ids_in_category(next(iter(self.categories)))
+        return set().union(*(store.ids_in_category(category) for category in self.categories))
+
+
+class TagFilter(Filter):
+    """Tasks with any of a few tags (None for tasks without tags)"""
+
+    def __init__(self, term, tags):
+        super().__init__(term)
+        self.tags = set(tags)
+
+    def matches(self, task):
+        if not task.tags:
+            return None in self.tags
+        return any(tag in self.tags for tag in task.tags)
+
+    def estimate(self, store):
+        count = sum(store.count_with_tag(tag) for tag in self.tags if tag is not None)
+        if None in self.tags:
+            # Tasks may have several tags, so this is only a rough guess
+            count += max(store.count() - sum(store.tag_counts().values()), 0)
+        return count
+
+    def indexed(self, pending):
+        return None not in self.tags
+
+    def index_ids(self, store):
+        if len(self.tags) == 1:
+            return store.ids_with_tag(next(iter(self.tags)))
+        return set().union(*(store.ids_with_tag(tag) for tag in self.tags))
+
+
+class DueFilter(Filter):
+    """Tasks due between two days (inclusive, None for open-ended), or without a due date"""
+
+    def __init__(self, term, first=None, last=None, none=False):
+        super().__init__(term)
+        self.first = first
+        self.last = last
+        self.none = none
+
+    def matches(self, task):
+        due = task.due_ordinal
+        if self.none:
+            return due is None
+        return (
+            due is not None
+            and (self.first is None or due >= self.first)
+            and (self.last is None or due <= self.last)
+        )
+
+    def estimate(self, store):
+        with_due = store.count_due() * _due_fraction(store)
+        if self.none:
+            return int(max(store.count() - with_due, 0))
+        return int(store.count_due(self.first, self.last) * _due_fraction(store))
+
+    def columns(self):
+        if self.none:
+            return None
+        return {"due_first": self.first, "due_last": self.last}
+
+    def indexed(self, pending):
+        # The due date index only holds pending tasks
+        return pending and not self.none
+
+    def index_ids(self, store):
+        return store.due_ids(self.first, self.last)
+
+
+class TextFilter(Filter):
+    """Tasks whose title (or notes) contain every word of some text"""
+
+    def __init__(self, term, text, field="title"):
+        super().__init__(term)
+        self.text = text
+        self.field = field
+        self.words = tokenize(text)
+
+    def matches(self, task):
+        haystack = (task.title if self.field == "title" else task_notes_text(task)).lower()
+        if not self.words:
+            # Nothing indexable (e.g. only punctuation), so a plain substring
+            return self.text.lower() in haystack
+        return all(word in haystack for word in self.words)
+
+    def estimate(self, store):
+        return max(int(store.count() * _TEXT_SELECTIVITY), 1)
+
+    def indexed(self, pending):
+        return bool(self.words)
+
+    def index_ids(self, store):
+        return store.search(" ".join(self.words), self.field)
+
+
+def _split_values(value):
+    """Split a comma-separated field value, with none standing for no value"""
+    values = [part.strip().lower() for part in value.split(",") if part.strip()]
+    if not values:
+        raise QueryError(f"missing value in '{value}'")
+    return [None if part == "none" else part for part in values]
+
+
+def _field_filter(term, field, op, value, today):
+    """Build the filter for a field:value (or due comparison) term"""
+    if field != "due" and op not in (":", "="):
+        raise QueryError(f"'{term}': only due dates can be compared with {op}")
+
+    if field == "priority":
+        priorities = _split_values(value)
+        for priority in priorities:
+            if priority not in ("high", "medium", "low"):
+                raise QueryError(f"invalid priority '{priority}': use high, medium or low")
+        return PriorityFilter(term, priorities)
+    if field == "category":
+        return CategoryFilter(term, _split_values(value))
+    if field == "tag":
+        return TagFilter(term, _split_values(value))
+    if field in ("title", "notes"):
+        return TextFilter(term, value, field)
+
+    if value.lower() == "none":
+        if op not in (":", "="):
+            raise QueryError(f"'{term}': use due:none for tasks without a due date")
+        return DueFilter(term, none=True)
+    day = parse_day(value, today)
+    if op in (":", "="):
+        return DueFilter(term, day, day)
+    if op == "<":
+        return DueFilter(term, last=day - 1)
+    if op == "<=":
+        return DueFilter(term, last=day)
+    if op == ">":
+        return DueFilter(term, first=day + 1)
+    return DueFilter(term, first=day)
+
+
+def parse_query(text, today=None):
+    """Parse a query into a Query; raises QueryError
+
+    Terms are separated by spaces and a task must match all of them:
+
+        priority:high       p:high,medium       (one of several values)
+        category:work       c:none              (none: no category)
+        tag:urgent          t:none              (none: no tags)
+        due<+3  due<=2025-12-31  due>today  due:tomorrow  due:none
+        completed (or done)  pending  overdue
+        report  "status report"  title:report  note:call
+        -tag:later  -completed                 (a leading - negates a term)
+
+    Other words, and anything in double quotes, are looked for in task
+    titles like the search command does. Due dates are YYYY-MM-DD, today,
+    tomorrow, yesterday or +N/-N days from today.
+    """
+    today = date.today().toordinal() if today is None else today
+    filters = []
+    end = 0
+
+    for match in _TERM.finditer(text):
+        if text[end:match.start()].strip():
+            raise QueryError(f"cannot read '{text[end:match.start()].strip()}' (unclosed quote?)")
+        end = match.end()
+
+        negated, field, op, value = match.groups()
+        term = match.group()
+        quoted = value.startswith('"')
+        if quoted:
+            value = _QUOTED_ESCAPE.sub(r"\1", value[1:-1])
+
+        if field is not None:
+            name = _FIELDS.get(field.lower())
+            if name is None:
+                raise QueryError(f"unknown field '{field}': use priority, category, tag, due, title or note")
+            query_filter = _field_filter(term, name, op, value, today)
+        elif not quoted and value.lower() in _STATUS_WORDS:
+            # -completed is just pending, which the planner can use
+            query_filter = StatusFilter(term, _STATUS_WORDS[value.lower()] != bool(negated))
+            negated = None
+        elif not quoted and value.lower() == "overdue":
+            query_filter = OverdueFilter(term, today)
+        else:
+            query_filter = TextFilter(term, value)
+
+        filters.append(Not(term, query_filter) if negated else query_filter)
+
+    if text[end:].strip():
+        raise QueryError(f"cannot read '{text[end:].strip()}' (unclosed quote?)")
+    return Query(filters)
+
+
+def _merge_columns(filters):
+    """Combine the select_ids() arguments of filters, or return None if they contradict each other"""
+    merged = {}
+    for query_filter in filters:
+        for name, value in query_filter.columns().items():
+            if value is None:
+                continue
+            if name == "due_first":
+                value = max(value, merged.get(name, value))
+            elif name == "due_last":
+                value = min(value, merged.get(name, value))
+            elif merged.get(name, value) != value:
+                return None
+            merged[name] = value
+    return merged
+
+
+class Query:
+    """Filters a task must all match, found through the cheapest route the store offers"""
+
+    def __init__(self, filters=()):
+        self.filters = list(filters)
+
+    def __str__(self):
+        return " ".join(map(str, self.filters))
+
+    def matches(self, task):
+        """Whether a task matches every filter"""
+        return all(query_filter.matches(task) for query_filter in self.filters)
+
+    def plan(self, store, order=None):
+        """Work out how to find the matching tasks; see QueryPlan"""
+        return QueryPlan(store, self.filters, order)
+
+    def run(self, store, order=None):
+        """Get the matching tasks in an order (by ID if None); see QueryPlan.run"""
+        return self.plan(store, order).run()
+
+
+class QueryPlan:
+    """How a query is answered, chosen by estimated cost
+
+    A store that is not loaded is streamed and every task checked. For a
+    loaded store (or SQLite), the candidates are:
+
+    - index: the IDs of the indexed filter expected to match the fewest
+      tasks (tag, category, due date for pending tasks, or title and note
+      text), intersected with the IDs of other indexed filters while
+      reading their IDs costs less than fetching and checking the tasks
+      they rule out;
+    - columns: one select_ids() scan covering every filter it can;
+    - walk: ordered_ids() in the order asked for, or stream() for ID
+      order, which need no sort.
+
+    Filters left over are checked task by task, those expected to match
+    the fewest tasks first. Estimates take filters as independent.
+    """
+
+    def __init__(self, store, filters, order=None):
+        self.store = store
+        self.order = order
+        self.route = None           # "stream", "index", "columns", "walk" or "none"
+        self.index_filters = []     # driving filter, then the ones intersected with it
+        self.columns = {}           # select_ids() arguments of the columns route
+        self.completed = None       # status the walk and stream routes read
+        self.checks = []            # filters checked task by task
+        self.sort = order is not None
+        self.expected = 0
+        self.cost = 0
+
+        positive = [query_filter for query_filter in filters if not isinstance(query_filter, Not)]
+        column_filters = [query_filter for query_filter in positive if query_filter.columns() is not None]
+        merged = _merge_columns(column_filters)
+        if merged is None:
+            self.route = "none"
+            return
+        self.completed = merged.get("completed")
+
+        if not store.loaded:
+            self._stream(filters)
+            return
+
+        total = store.count()
+        if not total:
+            self.route = "none"
+            return
+
+        estimates = {query_filter: query_filter.estimate(store) for query_filter in filters}
+        expected = total
+        for estimate in estimates.values():
+            expected *= estimate / total
+        self.expected = int(expected)
+
+        routes = [
+            self._index_route(positive, estimates, total),
+            self._columns_route(column_filters, merged, estimates, total),
+            self._walk_route(estimates, total)
+        ]
+        cost, route, used = min((route for route in routes if route is not None), key=lambda route: route[0])
+
+        self.cost = int(cost)
+        self.route = route
+        if route == "index":
+            self.index_filters = used
+        elif route == "columns":
+            self.columns = merged
+        self.sort = route in ("index", "columns")
+        self.checks = sorted(
+            (query_filter for query_filter in filters if query_filter not in used),
+            key=lambda query_filter: estimates[query_filter]
+        )
+
+    def _stream(self, filters):
+        """Plan a pass over every task streamed from the store"""
+        self.route = "stream"
+        # Streams come in the order tasks were added, which is ID order
+        self.sort = self.order is not None
+        self.checks = [
+            query_filter for query_filter in filters
+            if not isinstance(query_filter, StatusFilter)
+        ]
+
+    def _finish_cost(self, found, used, estimates, sort):
+        """Cost of fetching the tasks a route finds, checking what it leaves over and sorting them"""
+        cost = found * self.store.query_costs["fetch"]
+        if len(used) < len(estimates):
+            cost += found
+        if sort:
+            cost += self.expected * _SORT_COST
+        return cost
+
+    def _index_route(self, positive, estimates, total):
+        """Cost of the index route and the filters it covers, or None if no filter is indexed"""
+        id_cost = self.store.query_costs["id"]
+        pending = self.completed is False
+        indexed = sorted(
+            (query_filter for query_filter in positive if query_filter.indexed(pending)),
+            key=lambda query_filter: estimates[query_filter]
+        )
+        if not indexed:
+            return None
+
+        used = [indexed[0]]
+        found = estimates[indexed[0]]
+        cost = found * id_cost
+        for query_filter in indexed[1:]:
+            estimate = estimates[query_filter]
+            narrowed = found * estimate / total
+            # Read its IDs only if that costs less than the fetches and checks it saves
+            if estimate * id_cost >= (found - narrowed) * (self.store.query_costs["fetch"] + 1):
+                break
+            used.append(query_filter)
+            cost += estimate * id_cost
+            found = narrowed
+
+        return cost + self._finish_cost(found, used, estimates, True), "index", used
+
+    def _columns_route(self, column_filters, merged, estimates, total):
+        """Cost of the columns route and the filters it covers, or None if no filter has columns"""
+        if not merged:
+            return None
+
+        found = total
+        for query_filter in column_filters:
+            found *= estimates[query_filter] / total
+        cost = total * self.store.query_costs["scan"]
+        return cost + self._finish_cost(found, column_filters, estimates, True), "columns", column_filters
+
+    def _walk_route(self, estimates, total):
+        """Cost of reading every task (with the status asked for) already in order
+
+        That is walking ordered_ids() for a listing order, or streaming
+        the store when the order is by ID.
+        """
+        used = [query_filter for query_filter in estimates if isinstance(query_filter, StatusFilter)]
+        if used:
+            found = estimates[used[0]]
+        elif self.completed is not None:
+            found = self.store.count_where(completed=self.completed)
+        else:
+            found = total
+
+        cost = total * self.store.query_costs["walk"] + self._finish_cost(found, used, estimates, False)
+        return cost, "walk" if self.order is not None else "stream", used
+
+    def describe(self):
+        """Explain the plan, one step per line"""
+        if self.route == "none":
+            return ["nothing can match"]
+
+        if self.route == "stream":
+            steps = ["stream every task" if self.completed is None else f"stream {'completed' if self.completed else 'pending'} tasks"]
+        elif self.route == "walk":
+            status = "" if self.completed is None else f" ({'completed' if self.completed else 'pending'} only)"
+            steps = [f"walk the {self.order} order{status}"]
+        elif self.route == "columns":
+            arguments = ", ".join(
+                f"{name}={date.fromordinal(value) if name.startswith('due') else value}"
+                for name, value in self.columns.items()
+            )
+            steps = [f"scan the columns for {arguments}"]
+        else:
+            steps = [f"read the IDs matching {self.index_filters[0]} from its index"]
+            steps += [f"intersect with the IDs matching {query_filter}" for query_filter in self.index_filters[1:]]
+
+        if self.checks:
+            steps.append("check each task against " + ", ".join(map(str, self.checks)))
+        if self.sort:
+            steps.append(f"sort by {self.order or 'ID'}")
+        if self.route != "stream":
+            steps.append(f"expect ~{self.expected} task(s), estimated cost {self.cost}")
+        return steps
+
+    def run(self):
+        """Get the matching tasks, in the plan's order
+
+        Streamed tasks in ID order are yielded lazily; everything else
+        comes back as a list.
+        """
+        store = self.store
+        checks = self.checks
+
+        if self.route == "none":
+            return []
+        if self.route == "stream":
+            tasks = store.stream(self.completed)
+        elif self.route == "walk":
+            tasks = store.get_many(store.ordered_ids(self.order, self.completed))
+        elif self.route == "columns":
+            tasks = store.get_many(store.select_ids(**self.columns))
+        else:
+            driver, *others = self.index_filters
+            task_ids = driver.index_ids(store)
+            if others:
+                task_ids = set(task_ids)
+                for query_filter in others:
+                    task_ids.intersection_update(query_filter.index_ids(store))
+                    if not task_ids:
+                        break
+            tasks = store.get_many(task_ids)
+
+        if checks:
+            tasks = (task for task in tasks if all(query_filter.matches(task) for query_filter in checks))
+        if self.sort:
+            return sorted(tasks, key=order_key(self.order))
+        if self.route == "stream":
+            return tasks
+        return list(tasks)
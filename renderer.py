@@ -0,0 +1,131 @@
+import os
+import sys
+from datetime import date
+from functools import lru_cache
+from colorama import Fore, Style
+from indexes import due_ordinal
+
+# Categories get one of these colors, picked from their name
+CATEGORY_COLORS = (Fore.RED, Fore.GREEN, Fore.YELLOW, Fore.BLUE, Fore.MAGENTA, Fore.CYAN)
+
+PRIORITY_SYMBOLS = {"high": (Fore.RED, "🔴"), "medium": (Fore.YELLOW, "🟡"), "low": (Fore.GREEN, "🟢")}
+
+# Rows formatted before each write to the output
+WRITE_ROWS = 5000
+
+
+def use_color(stream=None):
+    """Whether to color output: only on a terminal, and not when NO_COLOR is set"""
+    if "NO_COLOR" in os.environ:
+        return False
+    isatty = getattr(stream or sys.stdout, "isatty", None)
+    return bool(isatty and isatty())
+
+
+@lru_cache(maxsize=None)
+def category_color(category):
+    """Color for a category, always the same one for the same name"""
+    if not category:
+        return Fore.WHITE
+    return CATEGORY_COLORS[sum(ord(c) for c in category) % len(CATEGORY_COLORS)]
+
+
+class TaskRenderer:
+    """Formats task lists the way display_tasks shows them, and writes them in large chunks
+
+    The parts of a row that only depend on a value shared by many tasks
+    (status mark, priority symbol and label, due date status, category,
+    note count) are built once per value and reused, and rows are joined
+    and written WRITE_ROWS at a time instead of one print() each. With
+    color off, the layout is the same without escape codes.
+    """
+
+    def __init__(self, color=None, today=None):
+        self.color = use_color() if color is None else color
+        self.today = date.today().toordinal() if today is None else today
+        self._reset = Style.RESET_ALL if self.color else ""
+        self._id_color = Fore.CYAN if self.color else ""
+        # Completed flag -> (status mark, title color)
+        self._status = {
+            True: (self.paint(Fore.GREEN, "✓"), Fore.GREEN if self.color else ""),
+            False: (self.paint(Fore.YELLOW, "✗"), Fore.YELLOW if self.color else "")
+        }
+        self._priorities = {}
+        self._due = {}
+        self._categories = {}
+        self._notes = {}
+
+    def paint(self, color, text):
+        """Wrap text in a color, if colors are on"""
+        return f"{color}{text}{Style.RESET_ALL}" if self.color else text
+
+    def _priority(self, priority):
+        """Priority symbol and label of a row"""
+        text = self._priorities.get(priority)
+        if text is None:
+            color, symbol = PRIORITY_SYMBOLS.get(priority, PRIORITY_SYMBOLS["low"])
+            text = f" {self.paint(color, symbol)} {self.paint(Fore.CYAN, f'[{priority.upper()}]')}"
+            self._priorities[priority] = text
+        return text
+
+    def _due_status(self, due_date):
+        """Due date part of a row (as get_due_date_status shows it)"""
+        text = self._due.get(due_date)
+        if text is None:
+            due = due_ordinal(due_date)
+            if due is None:
+                status = ""
+            elif due < self.today:
+                status = self.paint(Fore.RED, "⚠ OVERDUE")
+            elif due == self.today:
+                status = self.paint(Fore.RED, "📅 DUE TODAY")
+            elif due - self.today <= 3:
+                status = self.paint(Fore.YELLOW, "⏰ DUE SOON")
+            else:
+                status = self.paint(Fore.GREEN, f"📅 {due_date}")
+            text = self._due[due_date] = f" | {status}"
+        return text
+
+    def _category(self, category):
+        """Category part of a row"""
+        text = self._categories.get(category)
+        if text is None:
+            text = self._categories[category] = f" | {self.paint(category_color(category), f'📁 {category}')}"
+        return text
+
+    def _note_count(self, count):
+        """Note count part of a row"""
+        text = self._notes.get(count)
+        if text is None:
+            text = self._notes[count] = f" | 📝 {count} note{'s' if count != 1 else ''}"
+        return text
+
+    def row(self, task):
+        """Format one task as a display line"""
+        status, title_color = self._status[task.completed]
+        due_date = task.due_date
+        category = task.category
+        tags = task.tags
+        note_count = len(task.notes)
+        return "".join((
+            f"{self._id_color}{task.id}.{self._reset} [{status}] {title_color}{task.title}{self._reset}",
+            self._priority(task.priority),
+            self._due_status(due_date) if due_date else "",
+            self._category(category) if category else "",
+            f" | 🏷️ {', '.join(tags)}" if tags else "",
+            self._note_count(note_count) if note_count else ""
+        ))
+
+    def write(self, header, tasks, stream=None):
+        """Write a header, one row per task and a closing rule"""
+        stream = stream or sys.stdout
+        rule = self.paint(Fore.MAGENTA, "=" * 70)
+        lines = ["", rule, self.paint(Fore.MAGENTA, header), rule]
+        for task in tasks:
+            lines.append(self.row(task))
+            if len(lines) >= WRITE_ROWS:
+                stream.write("\n".join(lines) + "\n")
+                lines = []
+        lines += [rule, ""]
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
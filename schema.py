@@ -0,0 +1,54 @@
+SCHEMA_VERSION = 2
+
+# Fields every task has in the current schema, with their defaults
+TASK_DEFAULTS = {
+    "priority": "medium",
+    "completed": False,
+    "due_date": None,
+    "category": None,
+    "tags": []
+}
+
+
+def normalize_task(task):
+    """Fill in any fields a task from an older version is missing"""
+    for field, default in TASK_DEFAULTS.items():
+        if field not in task:
+            task[field] = list(default) if isinstance(default, list) else default
+    return task
+
+
+def _migrate_v1(data):
+    """Version 1: a bare list of tasks, some missing fields added later"""
+    for task in data:
+        normalize_task(task)
+    return {"schema_version": 2, "tasks": data}
+
+
+# Maps a schema version to the function that upgrades it to the next one
+MIGRATIONS = {
+    1: _migrate_v1
+}
+
+
+def get_schema_version(data):
+    """Get the schema version of loaded snapshot data"""
+    if isinstance(data, list):
+        return 1
+    return data.get("schema_version", 1)
+
+
+def migrate(data):
+    """Upgrade snapshot data to the current schema
+
+    Returns the upgraded data and whether any migration was needed.
+    """
+    version = get_schema_version(data)
+    migrated = False
+
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+        migrated = True
+
+    return data, migrated
@@ -0,0 +1,135 @@
+import re
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return _WORD.findall(text.lower())
+
+
+def _trigrams(term):
+    """Get the set of three-character substrings of a term"""
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+def task_title(task):
+    """Text of a task that title searches look at"""
+    return task.title
+
+
+def task_notes_text(task):
+    """Text of a task that note searches look at"""
+    return " ".join(note.text for note in task.notes)
+
+
+class TextIndex:
+    """Inverted index from word tokens to the IDs of tasks containing them
+
+    Each query term is matched against the indexed vocabulary rather than
+    against every task: terms of three or more characters are narrowed down
+    through a trigram index over the vocabulary, so prefixes and partial
+    words ("doc" in "documentation") still match. A multi-word query
+    returns the tasks that match every term.
+    """
+
+    def __init__(self, name, get_text):
+        self.name = name
+        self.get_text = get_text
+        self.postings = {}   # term -> set of task IDs
+        self.doc_terms = {}  # task ID -> terms indexed for it, None until needed
+        self.trigrams = {}   # trigram -> set of terms
+
+    def clear(self):
+        """Remove everything from the index"""
+        self.postings = {}
+        self.doc_terms = {}
+        self.trigrams = {}
+
+    def add(self, task):
+        """Index a task's text"""
+        task_id = task.id
+        terms = set(tokenize(self.get_text(task)))
+        if self.doc_terms is not None:
+            self.doc_terms[task_id] = tuple(terms)
+
+        for term in terms:
+            ids = self.postings.get(term)
+            if ids is None:
+                ids = self.postings[term] = set()
+                for trigram in _trigrams(term):
+                    self.trigrams.setdefault(trigram, set()).add(term)
+            ids.add(task_id)
+
+    def remove(self, task_id):
+        """Drop a task from the index"""
+        if self.doc_terms is None:
+            self._build_doc_terms()
+
+        for term in self.doc_terms.pop(task_id, ()):
+            ids = self.postings[term]
+            ids.discard(task_id)
+            if not ids:
+                del self.postings[term]
+                for trigram in _trigrams(term):
+                    terms = self.trigrams[trigram]
+                    terms.discard(term)
+                    if not terms:
+                        del self.trigrams[trigram]
+
+    def matching_terms(self, query_term):
+        """Get the indexed terms that contain query_term"""
+        if len(query_term) < 3:
+            return [term for term in self.postings if query_term in term]
+
+        candidates = None
+        for trigram in _trigrams(query_term):
+            terms = self.trigrams.get(trigram)
+            if not terms:
+                return []
+            candidates = set(terms) if candidates is None else candidates & terms
+
+        return [term for term in candidates if query_term in term]
+
+    def search(self, query):
+        """Get the IDs of tasks matching every term in the query"""
+        result = None
+
+        for query_term in set(tokenize(query)):
+            ids = set()
+            for term in self.matching_terms(query_term):
+                ids |= self.postings[term]
+
+            result = ids if result is None else result & ids
+            if not result:
+                return set()
+
+        return result if result is not None else set()
+
+    def get_state(self):
+        """Get the index contents in a JSON-serialisable form"""
+        return {term: sorted(ids) for term, ids in self.postings.items()}
+
+    def set_state(self, state):
+        """Restore the index contents saved by get_state"""
+        self.clear()
+
+        for term, ids in state.items():
+            self.postings[term] = set(ids)
+            for trigram in _trigrams(term):
+                self.trigrams.setdefault(trigram, set()).add(term)
+
+        # Inverting the postings is only needed once a task is removed
+        self.doc_terms = None
+
+    def _build_doc_terms(self):
+        """Rebuild the task ID -> terms map by inverting the postings"""
+        doc_terms = {}
+        for term, ids in self.postings.items():
+            for task_id in ids:
+                terms = doc_terms.get(task_id)
+                if terms is None:
+                    doc_terms[task_id] = [term]
+                else:
+                    terms.append(term)
+        self.doc_terms = doc_terms
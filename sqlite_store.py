@@ -0,0 +1,523 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+
+from backend import (
+    TaskBackend, mutate_copies,
+    DURABILITY_BATCH, DURABILITY_FULL, DURABILITY_NONE,
+    ORDER_PRIORITY, ORDER_DUE, ORDER_CREATED
+)
+from search_index import tokenize
+from task_model import Note, Task
+
+SQLITE_TASKS_FILE = "tasks.db"
+
+# IDs looked up per "IN (...)" query, well under SQLite's variable limit
+_CHUNK_SIZE = 500
+
+# Largest ID SQLite can store (its INTEGER is 64-bit)
+_MAX_ID = 2 ** 63 - 1
+
+# PRAGMA synchronous setting for each durability level. In WAL mode,
+# NORMAL only fsyncs at checkpoints, so commits in between share one fsync.
+_SYNCHRONOUS = {
+    DURABILITY_FULL: "FULL",
+    DURABILITY_BATCH: "NORMAL",
+    DURABILITY_NONE: "OFF"
+}
+
+# Day ordinal bounds used when a range is open on one side
+_MIN_DAY = 1
+_MAX_DAY = 2 ** 31 - 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT,
+    priority TEXT,
+    completed INTEGER NOT NULL,
+    created_at TEXT,
+    due_date TEXT,
+    due_ordinal INTEGER,
+    category TEXT,
+    updated_at TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed, due_ordinal);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority, completed);
+CREATE INDEX IF NOT EXISTS tasks_due ON tasks (due_ordinal);
+CREATE INDEX IF NOT EXISTS tasks_category ON tasks (category);
+CREATE INDEX IF NOT EXISTS tasks_priority_order ON tasks ((CASE priority WHEN 'high' THEN 1 WHEN 'low' THEN 3 ELSE 2 END));
+CREATE INDEX IF NOT EXISTS tasks_due_order ON tasks ((due_ordinal IS NULL), due_ordinal);
+CREATE INDEX IF NOT EXISTS tasks_created ON tasks (created_at);
+
+CREATE TABLE IF NOT EXISTS tags (
+    task_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (task_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag, task_id);
+
+CREATE TABLE IF NOT EXISTS notes (
+    task_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    id INTEGER,
+    text TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (task_id, position)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS task_text USING fts5 (title, notes, tokenize = 'trigram');
+"""
+
+# ORDER BY clause of each ordered_ids() order. Each matches an index, whose
+# entries end with the row ID, so rows come out in order without a sort.
+_ORDER_BY = {
+    ORDER_PRIORITY: "CASE priority WHEN 'high' THEN 1 WHEN 'low' THEN 3 ELSE 2 END, id",
+    ORDER_DUE: "due_ordinal IS NULL, due_ordinal, id",
+    ORDER_CREATED: "created_at, id"
+}
+
+# Tags and notes come back as JSON arrays. The child tables are WITHOUT
+# ROWID, so their rows for a task are visited in position order.
+_SELECT_TASKS = """
+SELECT id, title, priority, completed, created_at, due_date, category, updated_at, extra,
+    (SELECT json_group_array(tag) FROM tags WHERE task_id = tasks.id),
+    (SELECT json_group_array(json_array(notes.id, text, notes.created_at, notes.updated_at))
+     FROM notes WHERE task_id = tasks.id)
+FROM tasks
+"""
+
+
+def _task_from_row(row):
+    """Build a task from a row of _SELECT_TASKS"""
+    task_id, title, priority, completed, created_at, due_date, category, updated_at, extra, tags, notes = row
+    return Task(
+        task_id,
+        title,
+        priority,
+        bool(completed),
+        created_at,
+        due_date,
+        category,
+        json.loads(tags),
+        [Note(*note) for note in json.loads(notes)],
+        updated_at,
+        json.loads(extra) if extra else None
+    )
+
+
+def _task_row(task):
+    """Get the values of a task's row in the tasks table"""
+    return (
+        task.id,
+        task.title,
+        task.priority,
+        task.completed,
+        task.created_at,
+        task.due_date,
+        task.due_ordinal,
+        task.category,
+        task.updated_at,
+        json.dumps(task.extra) if task.extra else None
+    )
+
+
+def _where(completed=None, priority=None, category=None, due_first=None, due_last=None):
+    """Build the WHERE clause and parameters for the select_ids() filters"""
+    clauses = []
+    params = []
+
+    if completed is not None:
+        clauses.append("completed = ?")
+        params.append(int(completed))
+    if priority is not None:
+        clauses.append("priority = ?")
+        params.append(priority)
+    if category is not None:
+        clauses.append("category = ?")
+        params.append(category)
+    if due_first is not None or due_last is not None:
+        clauses.append("due_ordinal BETWEEN ? AND ?")
+        params += [_MIN_DAY if due_first is None else due_first, _MAX_DAY if due_last is None else due_last]
+
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class SQLiteStore(TaskBackend):
+    """Task list kept in a SQLite database
+
+    Tasks, their tags and their notes live in separate tables. The columns
+    commands filter on (completed, priority, due day, category, tag) are
+    indexed, and titles and note text are in an FTS5 table with the
+    trigram tokenizer, so every query runs in SQL without reading the
+    whole list. Each change, including a batch from the bulk operations,
+    is a single transaction.
+
+    Task IDs come from an AUTOINCREMENT key, so like TaskStore a deleted
+    task's ID is never handed out again. The database runs in WAL mode,
+    and the durability level picks how often it fsyncs (see _SYNCHRONOUS).
+    """
+
+    # Every query is answered by the database
+    loaded = True
+
+    # IDs come out of queries row by row, and fetching a task reads its
+    # row, tags and notes
+    query_costs = {"id": 1, "scan": 0.4, "walk": 1, "fetch": 25}
+
+    def __init__(self, path=SQLITE_TASKS_FILE, durability=DURABILITY_BATCH):
+        self.path = path
+        self.durability = durability
+        self._conn = None
+        self._in_batch = False
+        self._listeners = []
+        self._data_version = None   # PRAGMA data_version when open() last looked
+
+    @property
+    def conn(self):
+        """The database connection, opened and set up on first use"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute(f"PRAGMA synchronous = {_SYNCHRONOUS[self.durability]}")
+            self._conn.create_function("casefold", 1, str.lower, deterministic=True)
+            with self._conn:
+                self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        """Run a change in its own transaction, or as part of the running batch()
+
+        BEGIN IMMEDIATE takes the database's write lock up front, so what
+        a change reads cannot be changed by another process before it
+        commits.
+        """
+        if self._in_batch:
+            yield
+            return
+
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                yield
+        except BaseException:
+            # Listeners may have been told about changes that were rolled back
+            self._clear_listeners()
+            raise
+
+    @contextmanager
+    def batch(self):
+        """Make every change inside the block part of one transaction"""
+        if self._in_batch:
+            yield
+            return
+
+        with self._transaction():
+            self._in_batch = True
+            try:
+                yield
+            finally:
+                self._in_batch = False
+
+    def open(self):
+        """Connect to the database, creating it if needed, and notice other processes' changes
+
+        Their changes are not known one by one, so listeners are cleared
+        if there were any.
+        """
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._data_version is not None and version != self._data_version:
+            self._clear_listeners()
+        self._data_version = version
+
+    def add_listener(self, listener):
+        """Tell a listener about every change made through this store"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop telling a listener about changes"""
+        self._listeners.remove(listener)
+
+    def _clear_listeners(self):
+        """Tell every listener that the tasks may have changed in any way"""
+        for listener in self._listeners:
+            listener.clear()
+
+    def flush(self):
+        """Nothing to do: every change is committed by its own transaction"""
+
+    def close(self):
+        """Close the database connection, checkpointing the WAL"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def files(self):
+        """The database and its write-ahead log files"""
+        return [self.path, self.path + "-wal", self.path + "-shm"]
+
+    @property
+    def next_id(self):
+        """ID the next added task will get"""
+        row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+        return (row[0] if row else 0) + 1
+
+    def load(self):
+        """Read every task, in the order they were added"""
+        return list(self.stream())
+
+    def stream(self, completed=None):
+        """Yield tasks one row at a time, optionally only those with a given status"""
+        where, params = _where(completed)
+        for row in self.conn.execute(_SELECT_TASKS + where + " ORDER BY id", params):
+            yield _task_from_row(row)
+
+    def save(self, tasks, next_id=None):
+        """Replace the whole task list in one transaction"""
+        tasks = [task if isinstance(task, Task) else Task.from_dict(task) for task in tasks]
+        with self._transaction():
+            for table in ("tasks", "tags", "notes", "task_text"):
+                self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", map(_task_row, tasks))
+            self._write_details(tasks)
+            if next_id is not None:
+                self._reserve_ids(next_id - 1)
+        self._clear_listeners()
+
+    def _reserve_ids(self, last_id):
+        """Make sure new tasks get IDs above last_id"""
+        updated = self.conn.execute(
+            "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = 'tasks'", (last_id,)
+        ).rowcount
+        if not updated:
+            self.conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', ?)", (last_id,))
+
+    def _write_details(self, tasks):
+        """Insert the tags, notes and searchable text of tasks whose old rows are gone"""
+        self.conn.executemany(
+            "INSERT INTO tags VALUES (?, ?, ?)",
+            ((task.id, position, tag) for task in tasks for position, tag in enumerate(task.tags))
+        )
+        self.conn.executemany(
+            "INSERT INTO notes VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (task.id, position, note.id, note.text, note.created_at, note.updated_at)
+                for task in tasks for position, note in enumerate(task.notes)
+            )
+        )
+        self.conn.executemany(
+            "INSERT INTO task_text (rowid, title, notes) VALUES (?, ?, ?)",
+            ((task.id, task.title or "", " ".join(note.text or "" for note in task.notes)) for task in tasks)
+        )
+
+    def _delete_details(self, task_ids):
+        """Delete the tags, notes and searchable text of tasks"""
+        params = [(task_id,) for task_id in task_ids]
+        self.conn.executemany("DELETE FROM tags WHERE task_id = ?", params)
+        self.conn.executemany("DELETE FROM notes WHERE task_id = ?", params)
+        self.conn.executemany("DELETE FROM task_text WHERE rowid = ?", params)
+
+    def count(self):
+        """Number of tasks"""
+        return self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def get(self, task_id):
+        """Get a task by ID, or None if it does not exist"""
+        row = self.conn.execute(_SELECT_TASKS + " WHERE id = ?", (task_id,)).fetchone()
+        return None if row is None else _task_from_row(row)
+
+    def get_many(self, task_ids):
+        """Get the tasks with the given IDs, in the same order, skipping missing ones"""
+        task_ids = list(task_ids)
+        found = {}
+        for start in range(0, len(task_ids), _CHUNK_SIZE):
+            chunk = task_ids[start:start + _CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.conn.execute(_SELECT_TASKS + f" WHERE id IN ({placeholders})", chunk):
+                found[row[0]] = _task_from_row(row)
+        return [found[task_id] for task_id in task_ids if task_id in found]
+
+    def match_ids(self, task_ids):
+        """Get the IDs from a TaskIdSet that exist, with one range query per ID range"""
+        matched = []
+        for start, end in task_ids.ranges:
+            if start > _MAX_ID or end < 1:
+                continue
+            # IDs past what SQLite can hold cannot exist
+            rows = self.conn.execute(
+                "SELECT id FROM tasks WHERE id BETWEEN ? AND ? ORDER BY id", (max(start, 1), min(end, _MAX_ID))
+            )
+            matched += [row[0] for row in rows]
+        return matched
+
+    def add_task(self, fields):
+        """Add a new task from a dict of its fields and return it"""
+        task = Task.from_dict({"id": None, **fields})
+        with self._transaction():
+            task.id = self.conn.execute("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", _task_row(task)).lastrowid
+            self._write_details([task])
+            for listener in self._listeners:
+                listener.add(task)
+        return task
+
+    def update_task(self, task):
+        """Write the new state of a task that was changed in place"""
+        self.commit_batch([task])
+
+    def delete_task(self, task_id):
+        """Delete a task by ID and return it, or None if it does not exist"""
+        task = self.get(task_id)
+        if task is not None:
+            self.commit_batch(deleted_ids=[task_id])
+        return task
+
+    def commit_batch(self, updated=(), deleted_ids=()):
+        """Write many changed and deleted tasks in a single transaction"""
+        updated = list(updated)
+        deleted_ids = list(deleted_ids)
+        if not updated and not deleted_ids:
+            return
+
+        with self._transaction():
+            self._write_batch(updated, deleted_ids)
+
+    def modify(self, task_ids, mutate):
+        """Change tasks by ID, reading and writing them in one transaction
+
+        The transaction holds the database's write lock from before the
+        tasks are read, so there is never anything to retry.
+        """
+        with self._transaction():
+            changed, unchanged, deleted = mutate_copies(self.get_many(task_ids), mutate)
+            self._write_batch(changed, [task.id for task in deleted])
+        return changed, unchanged, deleted
+
+    def _write_batch(self, updated, deleted_ids):
+        """Write changed and deleted tasks inside the current transaction"""
+        self._delete_details([task.id for task in updated] + deleted_ids)
+        self.conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in deleted_ids])
+        # Only tasks that still exist are written back
+        self.conn.executemany(
+            "UPDATE tasks SET title = ?, priority = ?, completed = ?, created_at = ?, due_date = ?,"
+            " due_ordinal = ?, category = ?, updated_at = ?, extra = ? WHERE id = ?",
+            [_task_row(task)[1:] + (task.id,) for task in updated]
+        )
+        existing = set(self._existing_ids(task.id for task in updated))
+        written = [task for task in updated if task.id in existing]
+        self._write_details(written)
+
+        for listener in self._listeners:
+            for task_id in deleted_ids:
+                listener.remove(task_id)
+            for task in written:
+                listener.remove(task.id)
+                listener.add(task)
+
+    def _existing_ids(self, task_ids):
+        """Get the IDs from an iterable of IDs that exist"""
+        task_ids = list(task_ids)
+        matched = []
+        for start in range(0, len(task_ids), _CHUNK_SIZE):
+            chunk = task_ids[start:start + _CHUNK_SIZE]
+            placeholders = ", ".join("?" * len(chunk))
+            matched += [row[0] for row in self.conn.execute(f"SELECT id FROM tasks WHERE id IN ({placeholders})", chunk)]
+        return matched
+
+    def ordered_ids(self, order=ORDER_PRIORITY, completed=None):
+        """Iterate over task IDs in one of the ORDERS, read in order from its index"""
+        where, params = _where(completed=completed)
+        rows = self.conn.execute("SELECT id FROM tasks" + where + " ORDER BY " + _ORDER_BY[order], params)
+        return (row[0] for row in rows)
+
+    def search(self, query, field="title"):
+        """Get the IDs of tasks whose title (or notes) contain every query word
+
+        Words of three or more characters go through the FTS5 trigram
+        index; shorter ones, which it cannot look up, are checked on the
+        rows it returns.
+        """
+        column = "notes" if field == "notes" else "title"
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        long_terms = [term for term in terms if len(term) >= 3]
+        short_terms = [term for term in terms if len(term) < 3]
+
+        clauses = []
+        params = []
+        if long_terms:
+            clauses.append("task_text MATCH ?")
+            params.append(" AND ".join(f'{column} : "{term}"' for term in long_terms))
+        for term in short_terms:
+            clauses.append(f"instr(casefold({column}), ?) > 0")
+            params.append(term)
+
+        rows = self.conn.execute(f"SELECT rowid FROM task_text WHERE {' AND '.join(clauses)} ORDER BY rowid", params)
+        return [row[0] for row in rows]
+
+    def category_counts(self):
+        """Map each category to its number of tasks, sorted by category"""
+        rows = self.conn.execute(
+            "SELECT category, COUNT(*) FROM tasks WHERE category IS NOT NULL AND category != ''"
+            " GROUP BY category ORDER BY category"
+        )
+        return dict(rows.fetchall())
+
+    def tag_counts(self):
+        """Map each tag to its number of tasks, sorted by tag"""
+        rows = self.conn.execute("SELECT tag, COUNT(DISTINCT task_id) FROM tags GROUP BY tag ORDER BY tag")
+        return dict(rows.fetchall())
+
+    def ids_in_category(self, category):
+        """Get the IDs of the tasks in a category, sorted"""
+        rows = self.conn.execute("SELECT id FROM tasks WHERE category = ? ORDER BY id", (category,))
+        return [row[0] for row in rows]
+
+    def ids_with_tag(self, tag):
+        """Get the IDs of the tasks with a tag, sorted"""
+        rows = self.conn.execute("SELECT DISTINCT task_id FROM tags WHERE tag = ? ORDER BY task_id", (tag,))
+        return [row[0] for row in rows]
+
+    def count_in_category(self, category):
+        """Number of tasks in a category"""
+        return self.conn.execute("SELECT COUNT(*) FROM tasks WHERE category = ?", (category,)).fetchone()[0]
+
+    def count_with_tag(self, tag):
+        """Number of tasks with a tag"""
+        return self.conn.execute("SELECT COUNT(DISTINCT task_id) FROM tags WHERE tag = ?", (tag,)).fetchone()[0]
+
+    def due_ids(self, first=None, last=None):
+        """Get the IDs of pending tasks due between two days, soonest first"""
+        where, params = _where(completed=False, due_first=first or _MIN_DAY, due_last=last)
+        rows = self.conn.execute("SELECT id FROM tasks" + where + " ORDER BY due_ordinal, id", params)
+        return [row[0] for row in rows]
+
+    def count_due(self, first=None, last=None):
+        """Count the pending tasks due between two days"""
+        return self.count_where(completed=False, due_first=first or _MIN_DAY, due_last=last)
+
+    def select_ids(self, completed=None, priority=None, category=None, due_first=None, due_last=None):
+        """Get the IDs of tasks matching every given filter"""
+        where, params = _where(completed, priority, category, due_first, due_last)
+        return [row[0] for row in self.conn.execute("SELECT id FROM tasks" + where, params)]
+
+    def count_where(self, completed=None, priority=None, category=None, due_first=None, due_last=None):
+        """Count the tasks matching every given filter"""
+        where, params = _where(completed, priority, category, due_first, due_last)
+        return self.conn.execute("SELECT COUNT(*) FROM tasks" + where, params).fetchone()[0]
+
+    def notes_summary(self):
+        """Summary of notes across all tasks, as returned by get_notes_summary"""
+        total_notes, tasks_with_notes = self.conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT task_id) FROM notes"
+        ).fetchone()
+        return {
+            "total_notes": total_notes,
+            "tasks_with_notes": tasks_with_notes,
+            "average_notes": round(total_notes / tasks_with_notes, 1) if tasks_with_notes > 0 else 0
+        }
@@ -0,0 +1,994 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from backend import (
+    TaskBackend, mutate_copies,
+    DURABILITY_BATCH, DURABILITY_FULL, DURABILITY_LEVELS, DURABILITY_NONE,
+    ORDER_PRIORITY, ORDER_DUE, ORDER_CREATED
+)
+from search_index import TextIndex, task_title, task_notes_text
+from schema import SCHEMA_VERSION, migrate
+from indexes import (
+    FacetIndex,
+    DueDateIndex,
+    OrderIndex,
+    StatsIndex,
+    task_category,
+    task_tags,
+    priority_order_key,
+    due_order_key,
+    created_order_key
+)
+from binary_format import BinarySnapshot, encode_snapshot
+from columns import ColumnIndex
+from json_stream import iter_json_array
+from sqlite_store import SQLITE_TASKS_FILE, SQLiteStore
+from task_model import Task
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, one process at a time
+    fcntl = None
+
+TASKS_FILE = "tasks.json"
+BINARY_TASKS_FILE = "tasks.bin"
+
+# File used by get_store() for each storage format
+FORMAT_FILES = {
+    "json": TASKS_FILE,
+    "binary": BINARY_TASKS_FILE,
+    "sqlite": SQLITE_TASKS_FILE
+}
+
+# Storage format used by get_store(), one of FORMAT_FILES. Can be
+# overridden with the TASKS_FORMAT variable.
+STORAGE_FORMAT = os.environ.get("TASKS_FORMAT", "json")
+
+# Number of log records after which the log is folded into a new snapshot
+COMPACT_THRESHOLD = 500
+
+# How committed changes reach the disk, one of DURABILITY_LEVELS. Can be
+# overridden with the TASKS_DURABILITY variable.
+DURABILITY = os.environ.get("TASKS_DURABILITY", DURABILITY_BATCH)
+if DURABILITY not in DURABILITY_LEVELS:
+    DURABILITY = DURABILITY_BATCH
+
+# Seconds a batched change waits for others to share its fsync
+COMMIT_WINDOW = 0.05
+
+# Times modify() retries without a lock after another process changed its tasks
+COMMIT_RETRIES = 5
+
+
+def _fingerprint(path):
+    """Identify a snapshot file so a log can tell whether it belongs to it"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _fsync_dir(path):
+    """Make renames into path's directory durable"""
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _record_weight(record):
+    """Number of task changes a log record stands for"""
+    return len(record["records"]) if record["op"] == "batch" else 1
+
+
+def _to_json(value):
+    """Serialise Task objects for json.dumps"""
+    if isinstance(value, Task):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _as_task(task):
+    """Get a Task from a task or its JSON form"""
+    return task if isinstance(task, Task) else Task.from_dict(task)
+
+
+def _header_line(fingerprint, next_id, version):
+    """Encode the first line of a log file"""
+    return (json.dumps({"snapshot": fingerprint, "next_id": next_id, "version": version}) + "\n").encode("utf-8")
+
+
+def _encode_json_snapshot(tasks):
+    """Encode a JSON snapshot, one task per line
+
+    json.dumps() with indent runs the pure-Python encoder; dumping each
+    task on one line uses the C encoder, which is several times faster,
+    and still gives a file that is easy to read and diff.
+    """
+    lines = ",\n    ".join(json.dumps(task.to_dict()) for task in tasks)
+    return f'{{\n  "schema_version": {SCHEMA_VERSION},\n  "tasks": [\n    {lines}\n  ]\n}}\n'.encode("utf-8")
+
+
+def _read_header(path):
+    """Read the first line of a log file, or None if there is no log"""
+    try:
+        with open(path, 'rb') as f:
+            return f.readline()
+    except FileNotFoundError:
+        return None
+
+
+def _iter_binary(snapshot):
+    """Yield the tasks of an open BinarySnapshot, closing it at the end"""
+    with snapshot:
+        yield from snapshot
+
+
+def _iter_json(f):
+    """Yield the tasks of an open JSON snapshot file, closing it at the end"""
+    with f:
+        for data in iter_json_array(f, "tasks"):
+            yield Task.from_dict(data)
+
+
+class FileLock:
+    """Advisory lock on a file, shared between readers or held by one writer
+
+    Uses fcntl.flock, so it only coordinates processes that take it too,
+    and does nothing where fcntl is missing. Each acquire opens the file
+    again, so a thread must not take it while already holding it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @contextmanager
+    def __call__(self, exclusive=False):
+        if fcntl is None:
+            yield
+            return
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            # Closing the file releases the lock
+            os.close(fd)
+
+
+class TaskStore(TaskBackend):
+    """Task list persisted as a JSON snapshot plus an append-only log.
+
+    Each mutation appends one record to the log instead of rewriting the
+    whole snapshot. Loading replays the log on top of the snapshot, and once
+    the log grows past COMPACT_THRESHOLD records it is folded into a fresh
+    snapshot on a background thread.
+
+    The snapshot is JSON, or a binary file (see binary_format) when the
+    path ends in ".bin".
+
+    Tasks are held as compact Task objects (see task_model), converted to
+    dicts only when written out, in an ID-keyed dict so lookups and deletes
+    are O(1). IDs are handed out from a counter that only ever grows, which means a
+    deleted task's ID is never reused and other tasks are never renumbered.
+
+    Secondary indexes (see self.indexes) are kept up to date on every
+    change and saved next to each snapshot, so they only have to be rebuilt
+    from scratch when that file is missing or belongs to another snapshot.
+
+    Several processes can share a store. Readers hold a shared lock on a
+    ".lock" file next to it and writers an exclusive one (see FileLock),
+    only while they touch the files. Before each change a writer first
+    applies the records other processes appended to the log since it
+    last looked, so no change is lost and IDs stay unique. The log header
+    holds a version that every record counts up, which modify() uses to
+    notice that tasks changed between reading and writing them.
+
+    Every record is appended to the log as soon as it is committed. With
+    the "full" durability level it is also fsynced right away; with
+    "batch", records committed within COMMIT_WINDOW seconds of each other
+    share one fsync, done by a timer thread or by flush(); with "none",
+    nothing is fsynced. Snapshots are always written to a temporary file
+    and renamed over the old one.
+    """
+
+    def __init__(self, path=TASKS_FILE, durability=DURABILITY):
+        self.path = path
+        self.durability = durability
+        self.binary = os.path.splitext(path)[1] == ".bin"
+        self.log_path = os.path.splitext(path)[0] + ".log"
+        self.index_path = os.path.splitext(path)[0] + ".idx"
+        self.index = {}
+        self.title_index = TextIndex("title", task_title)
+        self.notes_index = TextIndex("notes", task_notes_text)
+        self.category_index = FacetIndex("category", task_category)
+        self.tag_index = FacetIndex("tags", task_tags)
+        self.due_index = DueDateIndex("due")
+        self.stats = StatsIndex("stats")
+        self.columns = ColumnIndex("columns")
+        self.orders = {
+            ORDER_PRIORITY: OrderIndex("order_priority", priority_order_key),
+            ORDER_DUE: OrderIndex("order_due", due_order_key),
+            ORDER_CREATED: OrderIndex("order_created", created_order_key)
+        }
+        self.indexes = [
+            self.title_index,
+            self.notes_index,
+            self.category_index,
+            self.tag_index,
+            self.due_index,
+            self.stats,
+            self.columns,
+            *self.orders.values()
+        ]
+        self.listeners = []         # told about every change (see add_listener)
+        self.next_id = 1
+        self.version = 0            # log records committed to the store so far
+        self._log_header = None     # first line of the log as last read, None if no log
+        self._log_size = 0          # bytes of the log applied in memory
+        self._log_records = 0
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(os.path.splitext(path)[0] + ".lock")
+        self._unsynced = False      # log records written but not fsynced yet
+        self._batch = None          # records held back by batch(), None outside one
+        self._flush_timer = None
+        self._compactor = None
+        self.loaded = False
+
+    def load(self):
+        """Read the snapshot and replay the log on top of it
+
+        A snapshot written with an older schema is migrated once and written
+        back in the current format, so every task read from the store has
+        all the current fields.
+        """
+        self.wait_for_compaction()
+        with self._lock, self._file_lock():
+            migrated = self._load()
+
+        if migrated:
+            self.compact(background=False)
+        return self.tasks
+
+    def _load(self):
+        """Read the store from disk, holding the locks; returns whether it was migrated"""
+        self._recover_log()
+
+        self.next_id = 1
+        migrated = False
+        if self.binary:
+            tasks = []
+            if os.path.exists(self.path):
+                with BinarySnapshot(self.path) as snapshot:
+                    tasks = list(snapshot)
+        else:
+            data = {"schema_version": SCHEMA_VERSION, "tasks": []}
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+            data, migrated = migrate(data)
+            tasks = [Task.from_dict(task) for task in data["tasks"]]
+
+        self._set_tasks(tasks, None if migrated else self._read_index_state())
+
+        self._log_records = 0
+        for record in self._read_log():
+            self._apply(record)
+            self._log_records += _record_weight(record)
+
+        self.loaded = True
+        return migrated
+
+    def _catch_up(self):
+        """Apply the records other processes appended to the log, holding the locks
+
+        If another process compacted the store, the log was replaced and
+        the whole store is read again.
+        """
+        if not self.loaded:
+            self._load()
+            return
+
+        header = _read_header(self.log_path)
+        if header != self._log_header:
+            self._load()
+            return
+        if header is None or os.path.getsize(self.log_path) == self._log_size:
+            return
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_size)
+            for line in f:
+                # Writers hold the exclusive lock, so only a crash leaves a torn line
+                if not line.endswith(b"\n"):
+                    break
+                record = json.loads(line)
+                self._apply(record)
+                self._log_size += len(line)
+                self._log_records += _record_weight(record)
+                self.version += 1
+
+    def refresh(self):
+        """Bring a loaded store up to date with changes made by other processes"""
+        if self._batch is not None:
+            # Nobody else can have written while batch() holds the lock
+            return
+        self.wait_for_compaction()
+        with self._lock, self._file_lock():
+            self._catch_up()
+
+    @contextmanager
+    def _writing(self):
+        """Hold the store for a change, up to date with other processes' changes"""
+        if self._batch is not None:
+            yield
+            return
+        self.wait_for_compaction()
+        with self._lock, self._file_lock(exclusive=True):
+            self._catch_up()
+            yield
+
+    @contextmanager
+    def batch(self):
+        """Hold the store for writing while many changes are made, then write them together
+
+        Changes made inside are applied in memory right away, but their
+        log records are kept back. At the end they are appended as one
+        record, or, if there are COMPACT_THRESHOLD or more, the store is
+        written out as a new snapshot instead. Whatever was applied is
+        written even if the block raises.
+        """
+        if self._batch is not None:
+            yield
+            return
+
+        with self._writing():
+            self._batch = []
+            try:
+                yield
+            finally:
+                records, self._batch = self._batch, None
+                if len(records) >= COMPACT_THRESHOLD:
+                    self.version += 1
+                    self._write_snapshot(self._capture(), locked=True)
+                elif records:
+                    # Already applied as they were made
+                    self._commit({"op": "batch", "records": records}, applied=True)
+        self._maybe_compact()
+
+    def open(self):
+        """Load the store, or catch up with other processes' changes if it already is"""
+        if self.loaded:
+            self.refresh()
+        else:
+            self.load()
+
+    def close(self):
+        """Fsync written log records and wait for a background compaction"""
+        self.flush()
+        self.wait_for_compaction()
+
+    def files(self):
+        """The snapshot, its log and its saved indexes"""
+        return [self.path, self.log_path, self.index_path]
+
+    def stream(self, completed=None):
+        """Yield every task (or those with a given status) without loading the store
+
+        Read-only commands use this instead of load(). The snapshot is
+        parsed incrementally and the log (at most COMPACT_THRESHOLD records
+        since the last compaction) is overlaid on it, so only one task from
+        the snapshot is in memory at a time and no index is built. If the
+        store is already loaded, its tasks are iterated instead.
+        """
+        tasks = self.iter_tasks() if self.loaded else self._stream_snapshot()
+        if completed is not None:
+            tasks = (task for task in tasks if task.completed == completed)
+        return tasks
+
+    def _stream_snapshot(self):
+        """Yield the tasks in the snapshot with the log overlaid"""
+        self.wait_for_compaction()
+        with self._lock, self._file_lock():
+            self._recover_log()
+
+            # Latest state of every task the log touches; None if deleted
+            overlay = {}
+            added = set()
+            for record in self._read_log():
+                self._overlay(overlay, added, record)
+
+            # Opened under the lock; a compaction renames a new snapshot
+            # into place, so the one opened here stays readable after it
+            tasks = self._iter_snapshot()
+
+        for task in tasks:
+            if task.id in overlay:
+                data = overlay.pop(task.id)
+                if data is None:
+                    continue
+                task = Task.from_dict(data)
+            yield task
+
+        # Tasks added since the snapshot, in the order they were added
+        for task_id, data in overlay.items():
+            if task_id in added and data is not None:
+                yield Task.from_dict(data)
+
+    def _iter_snapshot(self):
+        """Open the snapshot file and get an iterator over its tasks, read one at a time"""
+        if not os.path.exists(self.path):
+            return iter(())
+
+        if self.binary:
+            return _iter_binary(BinarySnapshot(self.path))
+        return _iter_json(open(self.path, 'r'))
+
+    def _overlay(self, overlay, added, record):
+        """Fold one log record into the overlay used by stream()"""
+        op = record["op"]
+
+        if op in ("add", "update"):
+            task_id = record["task"]["id"]
+            if op == "add":
+                added.add(task_id)
+            overlay[task_id] = record["task"]
+        elif op == "delete":
+            overlay[record["id"]] = None
+        elif op == "batch":
+            for sub_record in record["records"]:
+                self._overlay(overlay, added, sub_record)
+
+    @property
+    def tasks(self):
+        """All tasks, in the order they were added"""
+        return list(self.index.values())
+
+    def iter_tasks(self):
+        """Iterate over all tasks, in the order they were added, without copying the list"""
+        return iter(self.index.values())
+
+    def count(self):
+        """Number of tasks"""
+        return len(self.index)
+
+    def get(self, task_id):
+        """Get a task by ID, or None if it does not exist"""
+        return self.index.get(task_id)
+
+    def get_many(self, task_ids):
+        """Get the tasks with the given IDs, in the same order, skipping missing ones"""
+        return [self.index[task_id] for task_id in task_ids if task_id in self.index]
+
+    def match_ids(self, task_ids):
+        """Get the IDs from a TaskIdSet that exist, sorted"""
+        return task_ids.intersection(self.index)
+
+    def _set_tasks(self, tasks, index_state=None):
+        """Replace the in-memory task list and rebuild the indexes"""
+        tasks = [_as_task(task) for task in tasks]
+        self.index = {task.id: task for task in tasks}
+        if self.index:
+            self.next_id = max(self.next_id, max(self.index) + 1)
+
+        for index in self.indexes:
+            if index_state and index.name in index_state:
+                index.set_state(index_state[index.name])
+            else:
+                index.clear()
+                for task in tasks:
+                    index.add(task)
+
+        for listener in self.listeners:
+            listener.clear()
+
+    def _index_task(self, task):
+        """Add a task to every secondary index, and tell the listeners"""
+        for index in self.indexes:
+            index.add(task)
+        for listener in self.listeners:
+            listener.add(task)
+
+    def _unindex_task(self, task_id):
+        """Remove a task from every secondary index, and tell the listeners"""
+        for index in self.indexes:
+            index.remove(task_id)
+        for listener in self.listeners:
+            listener.remove(task_id)
+
+    def add_listener(self, listener):
+        """Tell a listener about every change applied in memory, including caught-up ones"""
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """Stop telling a listener about changes"""
+        self.listeners.remove(listener)
+
+    def ordered_ids(self, order=ORDER_PRIORITY, completed=None):
+        """Iterate over task IDs in one of the ORDERS, from its OrderIndex
+
+        The order is built the first time it is asked for, and from then on
+        kept up to date and saved with the other indexes.
+        """
+        index = self.orders[order]
+        if not index.built:
+            index.build(self.index.values())
+
+        task_ids = index.ids()
+        if completed is not None:
+            task_ids = (task_id for task_id in task_ids if self.index[task_id].completed == completed)
+        return task_ids
+
+    def search(self, query, field="title"):
+        """Get the IDs of tasks whose title (or notes) match every query term"""
+        index = self.notes_index if field == "notes" else self.title_index
+        return index.search(query)
+
+    def category_counts(self):
+        """Map each category to its number of tasks, sorted by category"""
+        return self.category_index.counts()
+
+    def tag_counts(self):
+        """Map each tag to its number of tasks, sorted by tag"""
+        return self.tag_index.counts()
+
+    def ids_in_category(self, category):
+        """Get the IDs of the tasks in a category"""
+        return self.category_index.ids(category)
+
+    def ids_with_tag(self, tag):
+        """Get the IDs of the tasks with a tag"""
+        return self.tag_index.ids(tag)
+
+    def count_in_category(self, category):
+        """Number of tasks in a category"""
+        return self.category_index.count(category)
+
+    def count_with_tag(self, tag):
+        """Number of tasks with a tag"""
+        return self.tag_index.count(tag)
+
+    def due_ids(self, first=None, last=None):
+        """Get the IDs of pending tasks due between two days, soonest first"""
+        return self.due_index.ids_between(first, last)
+
+    def count_due(self, first=None, last=None):
+        """Count the pending tasks due between two days"""
+        return self.due_index.count_between(first, last)
+
+    def select_ids(self, completed=None, priority=None, category=None, due_first=None, due_last=None):
+        """Get the IDs of tasks matching every given filter, from the column index"""
+        return self.columns.select(completed, priority, category, due_first, due_last)
+
+    def count_where(self, completed=None, priority=None, category=None, due_first=None, due_last=None):
+        """Count the tasks matching every given filter"""
+        if category is None and due_first is None and due_last is None:
+            # Status and priority alone are answered from the running totals
+            return self.stats.count(completed, priority)
+        return self.columns.count(completed, priority, category, due_first, due_last)
+
+    def notes_summary(self):
+        """Summary of notes across all tasks, as returned by get_notes_summary"""
+        return self.stats.notes_summary()
+
+    def save(self, tasks, next_id=None):
+        """Replace the whole task list and write it as a new snapshot"""
+        with self._writing():
+            if next_id is not None:
+                self.next_id = max(self.next_id, next_id)
+            self._set_tasks(tasks)
+            # Every task may have changed, which modify() has to notice
+            self.version += 1
+            self._write_snapshot(self._capture(), locked=True)
+            if self._batch:
+                # Already part of the snapshot
+                self._batch = []
+
+    def add_task(self, task):
+        """Add a new task from a dict of its fields, under the next free ID, and return it"""
+        with self._writing():
+            task = Task.from_dict({"id": self.next_id, **task})
+            self._commit({"op": "add", "task": task})
+        self._maybe_compact()
+        return task
+
+    def update_task(self, task):
+        """Record the new state of a task that was changed in place"""
+        with self._writing():
+            self._commit({"op": "update", "task": task})
+        self._maybe_compact()
+
+    def delete_task(self, task_id):
+        """Delete a task by ID and return it, or None if it does not exist"""
+        with self._writing():
+            task = self.index.get(task_id)
+            if task is not None:
+                self._commit({"op": "delete", "id": task_id})
+        self._maybe_compact()
+        return task
+
+    def commit_batch(self, updated=(), deleted_ids=()):
+        """Record many changed and deleted tasks with a single log append"""
+        with self._writing():
+            self._commit_batch(updated, deleted_ids)
+        self._maybe_compact()
+
+    def modify(self, task_ids, mutate):
+        """Change tasks by ID, reading them again if other processes change them meanwhile
+
+        The tasks are read and mutated without holding the file lock. Then,
+        under the exclusive lock and caught up with the log, the change is
+        committed if the version is still the one the tasks were read at,
+        or if none of those tasks is among what changed since. After
+        COMMIT_RETRIES conflicts, the last try holds the exclusive lock
+        from reading to committing, so a busy task cannot starve it.
+        """
+        for attempt in range(COMMIT_RETRIES):
+            self.refresh()
+            version = self.version
+            tasks = self.get_many(task_ids)
+            changed, unchanged, deleted = mutate_copies(tasks, mutate)
+            if not changed and not deleted:
+                return changed, unchanged, deleted
+
+            with self._writing():
+                if self.version != version and any(self.index.get(task.id) is not task for task in tasks):
+                    continue
+                self._commit_batch(changed, [task.id for task in deleted])
+            self._maybe_compact()
+            return changed, unchanged, deleted
+
+        with self._writing():
+            changed, unchanged, deleted = mutate_copies(self.get_many(task_ids), mutate)
+            self._commit_batch(changed, [task.id for task in deleted])
+        self._maybe_compact()
+        return changed, unchanged, deleted
+
+    def _commit_batch(self, updated, deleted_ids):
+        """Commit updates and deletes as one log record; the caller holds the store for writing"""
+        records = [{"op": "update", "task": task} for task in updated]
+        records += [{"op": "delete", "id": task_id} for task_id in deleted_ids if task_id in self.index]
+        if records:
+            self._commit({"op": "batch", "records": records})
+
+    def _commit(self, record, applied=False):
+        """Apply a record in memory, unless applied, and append it to the log; the caller holds the store for writing"""
+        if self._batch is not None:
+            self._apply(record)
+            self._batch += record["records"] if record["op"] == "batch" else [record]
+            return
+
+        line = (json.dumps(record, default=_to_json) + "\n").encode("utf-8")
+        if not applied:
+            self._apply(record)
+
+        if self._log_header is None:
+            # No log yet, or a stale one: start a log for the current snapshot
+            self._log_header = _header_line(_fingerprint(self.path), self.next_id, self.version)
+            with open(self.log_path, 'wb') as f:
+                f.write(self._log_header)
+            self._log_size = len(self._log_header)
+
+        with open(self.log_path, 'ab') as f:
+            f.write(line)
+            if self.durability == DURABILITY_FULL:
+                f.flush()
+                os.fsync(f.fileno())
+
+        self._log_size += len(line)
+        self._log_records += _record_weight(record)
+        self.version += 1
+
+        if self.durability == DURABILITY_BATCH:
+            self._unsynced = True
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(COMMIT_WINDOW, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _maybe_compact(self):
+        """Start a compaction once the log has grown past COMPACT_THRESHOLD records"""
+        if self._batch is None and self._log_records >= COMPACT_THRESHOLD:
+            self.compact()
+
+    def _apply(self, record):
+        """Apply a single log record to the in-memory task list"""
+        op = record["op"]
+
+        if op == "add":
+            task = _as_task(record["task"])
+            self.index[task.id] = task
+            self.next_id = max(self.next_id, task.id + 1)
+            self._index_task(task)
+        elif op == "update":
+            task = _as_task(record["task"])
+            if task.id in self.index:
+                self._unindex_task(task.id)
+                self.index[task.id] = task
+                self._index_task(task)
+        elif op == "delete":
+            if self.index.pop(record["id"], None) is not None:
+                self._unindex_task(record["id"])
+        elif op == "batch":
+            for sub_record in record["records"]:
+                self._apply(sub_record)
+
+    def flush(self):
+        """Fsync the log records written since the last fsync"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._unsynced:
+                return
+            self._unsynced = False
+
+            try:
+                fd = os.open(self.log_path, os.O_RDWR)
+            except FileNotFoundError:
+                return
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _read_log(self):
+        """Yield the log records that belong to the current snapshot, counting the version up"""
+        self._log_header = None
+        self._log_size = 0
+        self.version = 0
+        if not os.path.exists(self.log_path):
+            return
+
+        with open(self.log_path, 'rb') as f:
+            header = f.readline()
+            try:
+                header_data = json.loads(header)
+                snapshot = header_data["snapshot"]
+            except (ValueError, KeyError):
+                return
+
+            # A log written against another snapshot is stale
+            if snapshot != _fingerprint(self.path):
+                return
+
+            self.next_id = max(self.next_id, header_data.get("next_id", 1))
+            self._log_header = header
+            self.version = header_data.get("version", 0)
+
+            valid_size = len(header)
+            for line in f:
+                # A missing newline means the last append was torn by a crash
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                valid_size += len(line)
+                self.version += 1
+                yield record
+
+        # Drop any torn tail so new records start on a clean line
+        if os.path.getsize(self.log_path) != valid_size:
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(valid_size)
+        self._log_size = valid_size
+
+    def _read_index_state(self):
+        """Read the saved secondary indexes if they match the snapshot"""
+        if not os.path.exists(self.index_path):
+            return None
+
+        try:
+            with open(self.index_path, 'r') as f:
+                saved = json.load(f)
+        except ValueError:
+            return None
+
+        if saved.get("snapshot") != _fingerprint(self.path):
+            return None
+        return saved.get("indexes")
+
+    def _recover_log(self):
+        """Finish a compaction that was interrupted between its two renames"""
+        tmp_log = self.log_path + ".tmp"
+        if not os.path.exists(tmp_log):
+            return
+
+        try:
+            with open(tmp_log, 'rb') as f:
+                snapshot = json.loads(f.readline())["snapshot"]
+        except (ValueError, KeyError):
+            snapshot = None
+
+        # Readers share the lock, so another one may have done this already
+        try:
+            if snapshot is not None and snapshot == _fingerprint(self.path):
+                os.replace(tmp_log, self.log_path)
+            else:
+                os.remove(tmp_log)
+        except FileNotFoundError:
+            pass
+
+    def compact(self, background=True):
+        """Fold the log into a fresh snapshot"""
+        if self._batch is not None:
+            # The batch is written out when it ends
+            return
+
+        with self._writing():
+            snapshot = self._capture()
+            if not background:
+                self._write_snapshot(snapshot, locked=True)
+                return
+
+        self._compactor = threading.Thread(target=self._write_snapshot, args=(snapshot,))
+        self._compactor.start()
+
+    def wait_for_compaction(self):
+        """Block until a running background compaction has finished"""
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def _capture(self):
+        """Encode the snapshot and saved indexes as of now, with where the log stands"""
+        if self.binary:
+            data = encode_snapshot(self.iter_tasks(), SCHEMA_VERSION)
+        else:
+            data = _encode_json_snapshot(self.iter_tasks())
+        index_data = json.dumps({index.name: index.get_state() for index in self.indexes})
+        return data, index_data, self._log_header, self._log_size, self.next_id, self.version
+
+    def _write_snapshot(self, snapshot, locked=False):
+        """Write a snapshot and restart the log from the records after the captured offset
+
+        The renames happen under the exclusive lock, which the caller
+        already holds if locked is True. Otherwise, if another process
+        replaced the log since the capture, it compacted the store itself
+        and this snapshot is dropped.
+        """
+        data, index_data, log_header, offset, next_id, version = snapshot
+        durable = self.durability != DURABILITY_NONE
+        # Other processes may be compacting too, and these are written unlocked
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+
+        # Renaming keeps inode, size and mtime, so the fingerprint holds
+        fingerprint = _fingerprint(tmp_path)
+
+        tmp_index = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_index, 'w') as f:
+            f.write(f'{{"snapshot": {json.dumps(fingerprint)}, "indexes": {index_data}}}')
+
+        with nullcontext() if locked else self._hold_exclusive():
+            if not locked and _read_header(self.log_path) != log_header:
+                os.remove(tmp_path)
+                os.remove(tmp_index)
+                return
+
+            # Records appended while the snapshot was being written
+            tail = b""
+            if offset:
+                with open(self.log_path, 'rb') as f:
+                    f.seek(offset)
+                    tail = f.read()
+
+            header = _header_line(fingerprint, next_id, version)
+            tmp_log = self.log_path + ".tmp"
+            with open(tmp_log, 'wb') as f:
+                f.write(header + tail)
+                if durable:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            os.replace(tmp_path, self.path)
+            os.replace(tmp_log, self.log_path)
+            os.replace(tmp_index, self.index_path)
+            if durable:
+                _fsync_dir(self.path)
+
+            # Of the tail, only what this store had read before is applied in memory
+            self._log_size = len(header) + (self._log_size - offset)
+            self._log_header = header
+            self._log_records = tail.count(b"\n")
+
+    @contextmanager
+    def _hold_exclusive(self):
+        """Hold both locks for writing, without catching up with the log"""
+        with self._lock, self._file_lock(exclusive=True):
+            yield
+
+
+def open_store(path):
+    """Create the store for a path: SQLite for ".db" files, otherwise a TaskStore"""
+    if os.path.splitext(path)[1] == ".db":
+        return SQLiteStore(path, DURABILITY)
+    return TaskStore(path, DURABILITY)
+
+
+def _has_data(store, ignore=()):
+    """Check whether any of a store's files exist, leaving out the ignored paths"""
+    return any(os.path.exists(path) for path in store.files() if path not in ignore)
+
+
+def convert_store(source_path, dest_path):
+    """Copy all tasks of the store at source_path into a store at dest_path
+
+    The backend and format of each side follow the extension (".db" for
+    SQLite, ".bin" for a binary snapshot, otherwise JSON), and the
+    conversion is lossless, IDs and the next free ID included. When both
+    have the same name apart from the extension, they are the same store
+    in two formats, so the old one's files are removed (except a log the
+    two share). Returns the number of tasks.
+    """
+    source = open_store(source_path)
+    if not _has_data(source):
+        raise FileNotFoundError(f"No task store at '{source_path}'")
+
+    tasks = source.load()
+    next_id = source.next_id
+    source.close()
+
+    dest = open_store(dest_path)
+    dest.save(tasks, next_id)
+    dest.close()
+
+    if os.path.splitext(source_path)[0] == os.path.splitext(dest_path)[0]:
+        for path in source.files():
+            if path not in dest.files() and os.path.exists(path):
+                os.remove(path)
+    return len(tasks)
+
+
+def _convert_from_other_format(path):
+    """After switching formats, bring the tasks over from the old format's store"""
+    if os.path.exists(path):
+        return
+
+    dest = open_store(path)
+    others = [other_path for other_path in FORMAT_FILES.values() if other_path != path]
+    # The JSON and binary stores share a log, which belongs to whichever
+    # snapshot exists; a store with only the log left over is tried last
+    others.sort(key=lambda other_path: not os.path.exists(other_path))
+    for other_path in others:
+        # A log shared with the new snapshot is read by it directly
+        if _has_data(open_store(other_path), ignore=dest.files()):
+            convert_store(other_path, path)
+            return
+
+
+_store = None
+
+
+def get_store():
+    """Get the shared task store for the configured STORAGE_FORMAT
+
+    If the store has no file yet but one in another format exists (after
+    switching TASKS_FORMAT), its tasks are converted first.
+    """
+    global _store
+    path = FORMAT_FILES.get(STORAGE_FORMAT, TASKS_FILE)
+    if _store is None or _store.path != path:
+        _convert_from_other_format(path)
+        _store = open_store(path)
+    return _store
+
+
+@atexit.register
+def flush_store():
+    """Write out the shared store's queued changes; runs at exit"""
+    if _store is not None:
+        _store.flush()
@@ -0,0 +1,314 @@
+import sys
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from schema import TASK_DEFAULTS
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Priority strings are stored as small integer codes, shared by all tasks
+_PRIORITIES = ["high", "medium", "low"]
+_PRIORITY_CODES = {priority: code for code, priority in enumerate(_PRIORITIES)}
+
+_COMPLETED = 1
+
+# Stands for an updated_at given as null, to tell it apart from a missing one
+_NULL = object()
+
+# One shared copy of each due day and tag combination; both repeat a lot
+_SHARED = {}
+
+
+def priority_code(priority):
+    """Get the code for a priority string, registering unknown ones"""
+    code = _PRIORITY_CODES.get(priority)
+    if code is None:
+        code = _PRIORITY_CODES[priority] = len(_PRIORITIES)
+        _PRIORITIES.append(priority)
+    return code
+
+
+def _encode_date(value):
+    """Store a YYYY-MM-DD date as a day ordinal, or keep it as given"""
+    if isinstance(value, str) and len(value) == 10:
+        try:
+            day = date.fromisoformat(value)
+        except ValueError:
+            return value
+        if day.isoformat() == value:
+            return _share(day.toordinal())
+    return value
+
+
+@lru_cache(maxsize=4096)
+def _decode_date(value):
+    """Inverse of _encode_date"""
+    return date.fromordinal(value).isoformat() if isinstance(value, int) else value
+
+
+def _encode_timestamp(value):
+    """Store an ISO timestamp as float seconds, or keep it as given"""
+    if isinstance(value, str):
+        try:
+            moment = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if moment.tzinfo is None:
+            seconds = (moment - _EPOCH).total_seconds()
+            # Only if it converts back to exactly the same text
+            if _decode_timestamp(seconds) == value:
+                return seconds
+    return value
+
+
+def _decode_timestamp(value):
+    """Inverse of _encode_timestamp"""
+    return (_EPOCH + timedelta(seconds=value)).isoformat() if isinstance(value, float) else value
+
+
+def _share(value):
+    """Get the shared copy of an immutable value"""
+    return _SHARED.setdefault(value, value)
+
+
+def _intern(value):
+    """Share one copy of repeated strings such as categories and tags"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Note:
+    """A note attached to a task"""
+
+    __slots__ = ("id", "text", "_created_at", "_updated_at")
+
+    def __init__(self, id, text, created_at=None, updated_at=None):
+        self.id = id
+        self.text = text
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @property
+    def created_at(self):
+        return _decode_timestamp(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = _encode_timestamp(value)
+
+    @property
+    def updated_at(self):
+        return _decode_timestamp(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = _encode_timestamp(value)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a note from its JSON form"""
+        return cls(data.get("id", 0), data.get("text", ""), data.get("created_at"), data.get("updated_at"))
+
+    def to_dict(self):
+        """Get the JSON form of the note"""
+        data = {"text": self.text, "created_at": self.created_at, "id": self.id}
+        if self._updated_at is not None:
+            data["updated_at"] = self.updated_at
+        return data
+
+
+class Task:
+    """A single task
+
+    Uses __slots__ instead of a per-task dict, and packs the fields that
+    repeat across many tasks: completed and priority share one small int,
+    due dates and timestamps are stored as numbers, and categories, tags
+    and due days are shared between tasks instead of copied. to_dict() and from_dict() convert to and
+    from the JSON form losslessly; fields this class does not know about
+    are kept in `extra`.
+    """
+
+    __slots__ = (
+        "id", "title", "_flags", "_created_at", "_due", "_category",
+        "_tags", "_notes", "_updated_at", "extra"
+    )
+
+    def __init__(self, id, title, priority="medium", completed=False, created_at=None,
+                 due_date=None, category=None, tags=(), notes=None, updated_at=None, extra=None):
+        self.id = id
+        self.title = title
+        self._flags = 0
+        self.priority = priority
+        self.completed = completed
+        self.created_at = created_at
+        self.due_date = due_date
+        self.category = category
+        self.tags = tags
+        self.notes = notes
+        self.updated_at = updated_at
+        self.extra = extra
+
+    @property
+    def completed(self):
+        return bool(self._flags & _COMPLETED)
+
+    @completed.setter
+    def completed(self, value):
+        self._flags = (self._flags | _COMPLETED) if value else (self._flags & ~_COMPLETED)
+
+    @property
+    def priority(self):
+        return _PRIORITIES[self._flags >> 1]
+
+    @priority.setter
+    def priority(self, value):
+        self._flags = (priority_code(value) << 1) | (self._flags & _COMPLETED)
+
+    @property
+    def priority_code(self):
+        """The priority as its small integer code (see priority_code())"""
+        return self._flags >> 1
+
+    @property
+    def due_date(self):
+        return _decode_date(self._due)
+
+    @due_date.setter
+    def due_date(self, value):
+        self._due = _encode_date(value)
+
+    @property
+    def due_ordinal(self):
+        """The due date as a day ordinal, or None if unset or not a valid date"""
+        return self._due if isinstance(self._due, int) else None
+
+    @property
+    def created_at(self):
+        return _decode_timestamp(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = _encode_timestamp(value)
+
+    @property
+    def created_seconds(self):
+        """created_at as float seconds since 1970, or None if not stored that way"""
+        return self._created_at if isinstance(self._created_at, float) else None
+
+    @property
+    def updated_at(self):
+        return None if self._updated_at is _NULL else _decode_timestamp(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = _encode_timestamp(value)
+
+    @property
+    def category(self):
+        return self._category
+
+    @category.setter
+    def category(self, value):
+        self._category = _intern(value)
+
+    @property
+    def tags(self):
+        return self._tags
+
+    @tags.setter
+    def tags(self, value):
+        self._tags = _share(tuple(_intern(tag) for tag in value)) if value else ()
+
+    @property
+    def notes(self):
+        return self._notes if self._notes is not None else []
+
+    @notes.setter
+    def notes(self, value):
+        self._notes = list(value) if value else None
+
+    @classmethod
+    def from_packed(cls, id, title, completed, priority, due_ordinal, created_seconds, category, tags):
+        """Build a task from field values already in packed form
+
+        Used by binary snapshots, which store due dates as ordinals and
+        creation times as float seconds, to skip parsing them again.
+        tags must be a tuple.
+        """
+        task = cls.__new__(cls)
+        task.id = id
+        task.title = title
+        task._flags = (priority_code(priority) << 1) | (_COMPLETED if completed else 0)
+        task._due = None if due_ordinal is None else _share(due_ordinal)
+        task._created_at = created_seconds
+        task._category = _intern(category)
+        task._tags = _share(tags) if tags else ()
+        task._notes = None
+        task._updated_at = None
+        task.extra = None
+        return task
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a task from its JSON form, filling in missing fields"""
+        data = dict(data)
+        fields = {name: data.pop(name, default) for name, default in TASK_DEFAULTS.items()}
+        optional = {name: data.pop(name) for name in ("notes", "updated_at") if name in data}
+        task = cls(
+            data.pop("id"),
+            data.pop("title", ""),
+            created_at=data.pop("created_at", None),
+            extra=data or None,
+            **fields
+        )
+        task.set_optional_fields(optional)
+        return task
+
+    def to_dict(self):
+        """Get the JSON form of the task"""
+        data = {
+            "id": self.id,
+            "title": self.title,
+            "priority": self.priority,
+            "completed": self.completed,
+            "created_at": self.created_at,
+            "due_date": self.due_date,
+            "category": self.category,
+            "tags": list(self.tags)
+        }
+        data.update(self.optional_fields())
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def optional_fields(self):
+        """Get the JSON form of notes and updated_at, for those the task has
+
+        A field is kept when its source record had it, even as an empty
+        list or null, so that to_dict(from_dict(data)) == data.
+        """
+        data = {}
+        if self._notes is not None:
+            data["notes"] = [note.to_dict() for note in self._notes]
+        if self._updated_at is not None:
+            data["updated_at"] = self.updated_at
+        return data
+
+    def set_optional_fields(self, data):
+        """Inverse of optional_fields(); fields missing from data are left unset"""
+        notes = data.get("notes")
+        self._notes = None if notes is None else [Note.from_dict(note) for note in notes]
+        if data.get("updated_at", _NULL) is None:
+            self._updated_at = _NULL
+        else:
+            self._updated_at = _encode_timestamp(data.get("updated_at"))
+
+    def copy(self):
+        """Get an independent copy of the task, to change without touching the original"""
+        task = Task.__new__(Task)
+        for name in Task.__slots__:
+            setattr(task, name, getattr(self, name))
+        if self._notes is not None:
+            task._notes = [Note(note.id, note.text, note.created_at, note.updated_at) for note in self._notes]
+        if self.extra:
+            task.extra = dict(self.extra)
+        return task
@@ -0,0 +1,375 @@
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from colorama import Fore, Style, init
+from bulk_operations import TaskIdSet, apply_bulk, complete_mutation, delete_mutation
+from search_index import tokenize
+from storage import get_store
+from task_model import Task
+
+PRIORITIES = ("high", "medium", "low")
+
+# Longest request line the server accepts
+MAX_REQUEST = 1 << 20
+
+# How long a client waits to connect before using the files itself
+CONNECT_TIMEOUT = 1.0
+
+
+class RequestError(Exception):
+    """A request the task service cannot carry out as given"""
+
+
+class ServerLostError(Exception):
+    """The connection to the task server broke in the middle of a request"""
+
+
+def socket_path(store_path):
+    """Socket of the server for a store: tasks.sock next to tasks.json, tasks.bin or tasks.db"""
+    return os.path.splitext(store_path)[0] + ".sock"
+
+
+def _to_json(value):
+    """Serialise Task objects in results for json.dumps"""
+    if isinstance(value, Task):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _check_fields(fields):
+    """Check and normalise task fields the way the menu does; raises RequestError"""
+    if "title" in fields:
+        title = str(fields["title"]).strip()
+        if not title:
+            raise RequestError("task title cannot be empty")
+        if len(title) > 100:
+            raise RequestError("task title is too long (max 100 characters)")
+        fields["title"] = title
+
+    if "priority" in fields and fields["priority"] not in PRIORITIES:
+        raise RequestError(f"invalid priority '{fields['priority']}': use high, medium or low")
+
+    if fields.get("due_date") is not None:
+        try:
+            datetime.strptime(fields["due_date"], "%Y-%m-%d")
+        except (TypeError, ValueError):
+            raise RequestError(f"invalid due date '{fields['due_date']}': use YYYY-MM-DD")
+
+    if fields.get("category") is not None:
+        fields["category"] = str(fields["category"]).strip().lower()[:20] or None
+
+    if "tags" in fields:
+        tags = [str(tag).strip().lower()[:15] for tag in fields["tags"] or ()]
+        fields["tags"] = list(dict.fromkeys(tag for tag in tags if tag))[:5]
+    return fields
+
+
+def _id_set(ids):
+    """Get a TaskIdSet from one, or from its list of [start, end] ranges"""
+    if isinstance(ids, TaskIdSet):
+        return ids
+    try:
+        return TaskIdSet((int(start), int(end)) for start, end in ids)
+    except (TypeError, ValueError):
+        raise RequestError("task IDs must be a list of [start, end] ranges")
+
+
+class TaskService:
+    """The operations the task server offers, run directly on a store
+
+    The server runs them for its clients, and the CLI runs them itself
+    when no server is up, so a command gives the same result either way.
+    Results hold Task objects, which the server sends as their JSON form.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def add_task(self, title, priority="medium", due_date=None, category=None, tags=()):
+        """Add a task and return it"""
+        fields = _check_fields({
+            "title": title,
+            "priority": priority,
+            "due_date": due_date,
+            "category": category,
+            "tags": tags
+        })
+        return self.store.add_task({"completed": False, "created_at": datetime.now().isoformat(), **fields})
+
+    def complete_task(self, ids):
+        """Mark tasks as complete; returns which were completed, already completed or not found"""
+        self.store.open()
+        result = apply_bulk(None, _id_set(ids), [complete_mutation()], self.store)
+        return {
+            "completed": [task.id for task in result["changed"]],
+            "already_completed": [task.id for task in result["unchanged"]],
+            "not_found": str(result["not_found"])
+        }
+
+    def edit_task(self, task_id, **changes):
+        """Change fields of a task (title, priority, due_date, category, tags) and return it"""
+        unknown = set(changes) - {"title", "priority", "due_date", "category", "tags"}
+        if unknown:
+            raise RequestError(f"cannot edit {', '.join(sorted(unknown))}")
+        if not changes:
+            raise RequestError("nothing to change")
+        _check_fields(changes)
+
+        def apply_changes(task):
+            for field, value in changes.items():
+                setattr(task, field, value)
+            task.updated_at = datetime.now().isoformat()
+            return True
+
+        self.store.open()
+        changed, _, _ = self.store.modify([task_id], apply_changes)
+        if not changed:
+            raise RequestError(f"task {task_id} not found")
+        return changed[0]
+
+    def delete_task(self, ids):
+        """Delete tasks; returns the deleted tasks and the IDs that were not found"""
+        self.store.open()
+        result = apply_bulk(None, _id_set(ids), [delete_mutation()], self.store)
+        return {"deleted": result["deleted"], "not_found": str(result["not_found"])}
+
+    def search(self, query, field="title"):
+        """Get the tasks whose title (or notes) contain every word of the query"""
+        if field not in ("title", "notes"):
+            raise RequestError(f"cannot search '{field}': use title or notes")
+        if not tokenize(query):
+            raise RequestError("search term must contain letters or digits")
+        self.store.open()
+        return self.store.get_many(self.store.search(query, field))
+
+    def statistics(self):
+        """Counts behind the statistics dashboard"""
+        store = self.store
+        store.open()
+        today = date.today().toordinal()
+        total = store.count()
+        completed = store.count_where(completed=True)
+        return {
+            "total": total,
+            "completed": completed,
+            "pending": total - completed,
+            "completion_rate": store.completion_rate(),
+            "pending_high": store.count_where(completed=False, priority="high"),
+            "pending_medium": store.count_where(completed=False, priority="medium"),
+            "pending_low": store.count_where(completed=False, priority="low"),
+            "overdue": store.count_due(last=today - 1),
+            "due_today": store.count_due(today, today),
+            "due_soon": store.count_due(today + 1, today + 3),
+            **store.notes_summary()
+        }
+
+
+# TaskService methods clients may call
+METHODS = ("add_task", "complete_task", "edit_task", "delete_task", "search", "statistics")
+
+
+class TaskServer:
+    """Serves a TaskService over a Unix socket, one JSON object per line each way
+
+    A request is {"method": ..., "params": {...}} (plus an optional "id",
+    which is echoed back), and the answer is {"result": ...} or
+    {"error": "..."}. Task IDs in params are [start, end] ranges, as in
+    TaskIdSet.ranges.
+
+    Clients are served concurrently by asyncio, and a connection can send
+    any number of requests. The store is loaded once and kept in memory;
+    the requests themselves run one at a time on a worker thread, so the
+    store needs no more locking than it has, and the event loop keeps
+    accepting and reading clients while one waits for another process's
+    file lock. Changes made directly to the files by other processes are
+    caught up with before each request, as in a menu session.
+    """
+
+    def __init__(self, store, path):
+        self.service = TaskService(store)
+        self.path = path
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _call(self, request):
+        """Run one decoded request and build its answer"""
+        if not isinstance(request, dict) or request.get("method") not in METHODS:
+            return {"error": "unknown method"}
+
+        method = getattr(self.service, request["method"])
+        params = request.get("params") or {}
+        try:
+            inspect.signature(method).bind(**params)
+        except TypeError:
+            return {"error": f"invalid parameters for {request['method']}"}
+
+        try:
+            return {"result": method(**params)}
+        except RequestError as e:
+            return {"error": str(e)}
+
+    async def _answer(self, line):
+        """Decode a request line, run it on the worker thread and encode the answer"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"error": "request is not valid JSON"}
+
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(self._executor, self._call, request)
+        except Exception as e:
+            response = {"error": f"internal error: {e}"}
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def _serve_client(self, reader, writer):
+        """Answer one client's requests until it disconnects"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._answer(line)
+                writer.write((json.dumps(response, default=_to_json) + "\n").encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            # Client gone, or a request line over MAX_REQUEST
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """Serve until SIGINT or SIGTERM, then remove the socket"""
+        loop = asyncio.get_running_loop()
+        stop = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: stop.done() or stop.set_result(None))
+
+        await loop.run_in_executor(self._executor, self.service.store.open)
+        server = await asyncio.start_unix_server(self._serve_client, self.path, limit=MAX_REQUEST)
+        print(f"{Fore.GREEN}✓ Serving {self.service.store.count()} task(s) on '{self.path}'{Style.RESET_ALL}")
+
+        try:
+            async with server:
+                await stop
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            await loop.run_in_executor(self._executor, self.service.store.close)
+            self._executor.shutdown()
+
+
+class TaskClient:
+    """Calls a running task server; has the same methods as TaskService"""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    @classmethod
+    def connect(cls, path):
+        """Connect to the server on a socket, or return None if none is running there"""
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+            sock.settimeout(None)
+        except OSError:
+            sock.close()
+            return None
+        return cls(sock)
+
+    def close(self):
+        """Close the connection"""
+        try:
+            self._file.close()
+        except OSError:
+            # A request the server was gone for is still buffered; drop it
+            pass
+        self._sock.close()
+
+    def call(self, method, **params):
+        """Send a request and return its result
+
+        Raises RequestError if the server refused it, and ServerLostError
+        if the connection broke.
+        """
+        try:
+            self._file.write((json.dumps({"method": method, "params": params}) + "\n").encode("utf-8"))
+            self._file.flush()
+            line = self._file.readline()
+        except OSError as e:
+            raise ServerLostError(str(e)) from e
+        if not line:
+            raise ServerLostError("the task server closed the connection")
+
+        response = json.loads(line)
+        if "error" in response:
+            raise RequestError(response["error"])
+        return response["result"]
+
+    def add_task(self, **fields):
+        """Add a task and return it"""
+        return Task.from_dict(self.call("add_task", **fields))
+
+    def complete_task(self, ids):
+        """Mark tasks as complete; returns which were completed, already completed or not found"""
+        return self.call("complete_task", ids=_id_set(ids).ranges)
+
+    def edit_task(self, task_id, **changes):
+        """Change fields of a task and return it"""
+        return Task.from_dict(self.call("edit_task", task_id=task_id, **changes))
+
+    def delete_task(self, ids):
+        """Delete tasks; returns the deleted tasks and the IDs that were not found"""
+        result = self.call("delete_task", ids=_id_set(ids).ranges)
+        result["deleted"] = [Task.from_dict(task) for task in result["deleted"]]
+        return result
+
+    def search(self, query, field="title"):
+        """Get the tasks whose title (or notes) contain every word of the query"""
+        return [Task.from_dict(task) for task in self.call("search", query=query, field=field)]
+
+    def statistics(self):
+        """Counts behind the statistics dashboard"""
+        return self.call("statistics")
+
+
+def main(argv):
+    """Run the task server in the foreground"""
+    init(autoreset=True)
+    store = get_store()
+    parser = argparse.ArgumentParser(description="Serve the task store to task manager commands over a Unix socket")
+    parser.add_argument("--socket", default=socket_path(store.path), help="socket path (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if not hasattr(socket, "AF_UNIX"):
+        print(f"{Fore.RED}✗ Unix sockets are not supported on this system.{Style.RESET_ALL}")
+        return 1
+
+    client = TaskClient.connect(args.socket)
+    if client is not None:
+        client.close()
+        print(f"{Fore.RED}✗ A task server is already running on '{args.socket}'.{Style.RESET_ALL}")
+        return 1
+    if os.path.exists(args.socket):
+        # Left behind by a server that did not shut down cleanly
+        os.remove(args.socket)
+
+    asyncio.run(TaskServer(store, args.socket).serve())
+    print(f"{Fore.CYAN}Task server stopped.{Style.RESET_ALL}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
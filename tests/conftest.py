@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top of the repository, next to task_manager.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import open_store  # noqa: E402
+
+
+@pytest.fixture(params=["tasks.json", "tasks.bin", "tasks.db"])
+def store(request, tmp_path):
+    """An empty, opened store in each storage format"""
+    store = open_store(str(tmp_path / request.param))
+    store.open()
+    yield store
+    store.close()
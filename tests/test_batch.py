@@ -0,0 +1,68 @@
+import shlex
+
+import pytest
+
+from cli import run_batch, split_line
+from storage import open_store
+
+
+def titles(store):
+    return [task.title for task in store.stream()]
+
+
+def test_failing_lines_are_counted_and_the_rest_run(store, capsys):
+    lines = [
+        'add "one" -p high',
+        "# a comment",
+        "",
+        "edit abc",
+        'add "two" -h',
+        "list --help",
+        "frobnicate 1",
+        "batch other.txt",
+        'add "unclosed',
+        "complete 1",
+        'add "three" -d soon',
+        'add "four"',
+    ]
+
+    assert run_batch(store, lines) == 7
+    assert titles(store) == ["one", "four"]
+    assert store.get(1).completed
+
+    out = capsys.readouterr().out
+    assert "Line 4:" in out and "Line 5:" in out and "Line 11:" in out
+    assert "Ran 10 command(s), 7 failed." in out
+
+
+def test_batch_is_written_once_and_read_back(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    store = open_store(path)
+    store.open()
+    run_batch(store, [f'add "task {i}" -t a,b' for i in range(20)] + ["delete 3-5"])
+    store.close()
+
+    reloaded = open_store(path)
+    reloaded.open()
+    assert reloaded.count() == 17
+    assert reloaded.count_where() == 17
+    assert reloaded.count_with_tag("a") == 17
+
+
+def test_failed_batch_counts_match_memory(store):
+    run_batch(store, ['add "one" -t a', "edit 9 --title x", 'add "two" -t a'])
+
+    assert store.count() == 2
+    assert store.count_where() == 2
+    assert store.count_with_tag("a") == 2
+
+
+@pytest.mark.parametrize("line", [
+    'add "Write report" -p high',
+    "add 'single quoted' -t a,b",
+    r'add "escaped \" quote"',
+    "add plain words",
+    r"add back\ slash",
+])
+def test_split_line_matches_shlex(line):
+    assert split_line(line) == shlex.split(line)
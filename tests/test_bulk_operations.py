@@ -0,0 +1,73 @@
+import bulk_operations
+from bulk_operations import TaskIdSet, apply_bulk, bulk_add_tag, complete_mutation, parse_task_ids
+from storage import TaskStore
+
+HUGE = 99999999999999999999
+
+
+def test_ranges_are_merged():
+    ids = TaskIdSet([(5, 9), (1, 3), (4, 4), (20, 20)])
+
+    assert ids.ranges == [(1, 9), (20, 20)]
+    assert len(ids) == 10
+    assert 9 in ids and 10 not in ids and 20 in ids
+
+
+def test_width_is_not_limited_to_sys_maxsize():
+    ids = parse_task_ids(f"1-{HUGE}")
+
+    assert ids.width() == HUGE
+    assert HUGE in ids
+
+
+def test_intersection_walks_the_smaller_side():
+    assert TaskIdSet([(1, HUGE)]).intersection({3: "c", 1: "a", 7: "g"}) == [1, 3, 7]
+    assert TaskIdSet([(2, 3)]).intersection(set(range(100))) == [2, 3]
+
+
+def test_difference_of_a_huge_range():
+    assert str(TaskIdSet([(1, HUGE)]).difference([1, 2, 5])) == f"3-4, 6-{HUGE}"
+
+
+def test_huge_ranges_on_every_store(store):
+    store.add_task({"title": "one"})
+    store.add_task({"title": "two"})
+
+    assert store.match_ids(parse_task_ids(f"0-{HUGE}")) == [1, 2]
+    assert store.match_ids(parse_task_ids(f"{HUGE}-{HUGE + 5}")) == []
+
+    result = apply_bulk(None, parse_task_ids(f"2-{HUGE}"), [complete_mutation()], store)
+    assert [task.id for task in result["changed"]] == [2]
+    assert str(result["not_found"]) == f"3-{HUGE}"
+
+
+def test_full_tasks_are_reported_once_after_a_retry(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "tasks.json")
+    first, second = TaskStore(path), TaskStore(path)
+    first.open()
+    first.add_task({"title": "full", "tags": ["a", "b", "c", "d", "e"]})
+    first.add_task({"title": "open"})
+    second.open()
+
+    calls = []
+    tag_mutation = bulk_operations.tag_mutation
+
+    def racing_tag_mutation(tag):
+        mutate = tag_mutation(tag)
+
+        def wrapper(task):
+            # Another process changes task 2 while the first attempt runs
+            if not calls:
+                second.modify([2], complete_mutation())
+            calls.append(task.id)
+            return mutate(task)
+        return wrapper
+
+    monkeypatch.setattr(bulk_operations, "tag_mutation", racing_tag_mutation)
+    bulk_add_tag(None, parse_task_ids("1-2"), "new", first)
+
+    assert calls.count(1) == 2
+    output = capsys.readouterr().out
+    assert output.count("Task 1 already has 5 tags") == 1
+    assert "Added tag 'new' to 1 task(s)" in output
+    assert first.get(2).tags == ("new",) and first.get(2).completed
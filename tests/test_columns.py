@@ -0,0 +1,135 @@
+import random
+from datetime import date
+
+import pytest
+
+import columns
+from columns import ColumnIndex
+from task_model import Task
+
+CATEGORIES = [None, "Work", "Home"]
+PRIORITIES = ["high", "medium", "low"]
+
+
+@pytest.fixture(params=["numpy", "no numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(columns, "np", None)
+    return request.param
+
+
+def random_tasks(count, seed=0):
+    rng = random.Random(seed)
+    start = date(2025, 10, 1).toordinal()
+    return [
+        Task(
+            task_id,
+            f"Task {task_id}",
+            priority=rng.choice(PRIORITIES),
+            completed=rng.random() < 0.4,
+            due_date=rng.choice([None, date.fromordinal(start + rng.randrange(30)).isoformat()]),
+            category=rng.choice(CATEGORIES)
+        )
+        for task_id in range(1, count + 1)
+    ]
+
+
+def expected(tasks, completed=None, priority=None, category=None, due_first=None, due_last=None):
+    return sorted(
+        task.id for task in tasks
+        if (completed is None or task.completed == completed)
+        and (priority is None or task.priority == priority)
+        and (category is None or task.category == category)
+        and (due_first is None or (task.due_ordinal or 0) >= max(due_first, 1))
+        and (due_last is None or (task.due_ordinal is not None and task.due_ordinal <= due_last))
+    )
+
+
+FILTERS = [
+    {},
+    {"completed": True},
+    {"completed": False, "priority": "high"},
+    {"category": "Work"},
+    {"category": "Garden"},
+    {"priority": "low", "category": "Home"},
+    {"due_first": date(2025, 10, 10).toordinal()},
+    {"due_last": date(2025, 10, 10).toordinal()},
+    {"due_first": date(2025, 10, 5).toordinal(), "due_last": date(2025, 10, 20).toordinal(), "completed": False}
+]
+
+
+def check(index, tasks):
+    assert index.total() == len(tasks)
+    for filters in FILTERS:
+        assert sorted(index.select(**filters)) == expected(tasks, **filters)
+        assert index.count(**filters) == len(expected(tasks, **filters))
+
+
+def test_select_matches_every_filter(backend):
+    tasks = random_tasks(300)
+    index = ColumnIndex()
+    for task in tasks:
+        index.add(task)
+
+    check(index, tasks)
+    done = sum(task.completed for task in tasks)
+    assert index.completion_rate() == round(done / len(tasks) * 100, 1)
+
+
+def test_removed_rows_are_left_out(backend):
+    tasks = random_tasks(100)
+    index = ColumnIndex()
+    for task in tasks:
+        index.add(task)
+
+    for task in tasks[::3]:
+        index.remove(task.id)
+    index.remove(999)
+
+    check(index, [task for task in tasks if task.id % 3 != 1])
+    assert index.deleted == len(tasks[::3])
+
+
+def test_compaction_keeps_live_rows(backend, monkeypatch):
+    monkeypatch.setattr(columns, "_COMPACT_MIN_DELETED", 4)
+    tasks = random_tasks(20)
+    index = ColumnIndex()
+    for task in tasks:
+        index.add(task)
+
+    for task in tasks[:10]:
+        index.remove(task.id)
+    assert index.deleted == 10 and len(index.ids) == 20
+
+    # Deleted rows now outnumber live ones
+    index.remove(tasks[10].id)
+    assert index.deleted == 0 and len(index.ids) == 9
+
+    # Removing after compaction needs the row map rebuilt
+    index.remove(tasks[11].id)
+    check(index, tasks[12:])
+
+
+def test_state_round_trips(backend):
+    tasks = random_tasks(50)
+    index = ColumnIndex()
+    for task in tasks:
+        index.add(task)
+    index.remove(5)
+
+    restored = ColumnIndex()
+    restored.set_state(index.get_state())
+    live = [task for task in tasks if task.id != 5]
+    check(restored, live)
+
+    restored.remove(6)
+    check(restored, [task for task in live if task.id != 6])
+
+
+def test_empty_index(backend):
+    index = ColumnIndex()
+
+    assert index.select() == [] and index.count(completed=True) == 0
+    assert index.completion_rate() == 0
@@ -0,0 +1,135 @@
+import multiprocessing
+
+import pytest
+
+import storage
+from storage import TaskStore, open_store
+
+pytestmark = pytest.mark.skipif(storage.fcntl is None, reason="needs fcntl file locks")
+
+
+def bump(task):
+    """Mutation that counts up the number in a task's title"""
+    task.title = str(int(task.title) + 1)
+    return True
+
+
+def worker(path, rounds):
+    store = open_store(path)
+    store.open()
+    for i in range(rounds):
+        store.modify([1], bump)
+        store.add_task({"title": f"added {i}"})
+    store.close()
+
+
+@pytest.mark.parametrize("name", ["tasks.json", "tasks.bin", "tasks.db"])
+def test_processes_never_lose_each_others_changes(tmp_path, name):
+    path = str(tmp_path / name)
+    store = open_store(path)
+    store.open()
+    store.add_task({"title": "0"})
+    store.close()
+
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=worker, args=(path, 25)) for _ in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+        assert process.exitcode == 0
+
+    store = open_store(path)
+    store.open()
+    assert store.get(1).title == "100"
+    ids = [task.id for task in store.stream()]
+    assert len(ids) == 101 and len(set(ids)) == 101
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """Two TaskStores on the same files, standing in for two processes"""
+    path = str(tmp_path / "tasks.json")
+    first, second = TaskStore(path), TaskStore(path)
+    first.open()
+    first.add_task({"title": "0"})
+    first.add_task({"title": "0"})
+    second.open()
+    return first, second
+
+
+def test_modify_retries_after_a_change_to_its_task(stores):
+    first, second = stores
+    calls = []
+
+    def mutate(task):
+        if not calls:
+            second.modify([1], bump)
+        calls.append(task.id)
+        return bump(task)
+
+    first.modify([1], mutate)
+
+    assert len(calls) == 2
+    assert first.get(1).title == "2"
+    second.open()
+    assert second.get(1).title == "2"
+
+
+def test_modify_does_not_retry_for_other_tasks(stores):
+    first, second = stores
+    calls = []
+
+    def mutate(task):
+        if not calls:
+            second.modify([2], bump)
+        calls.append(task.id)
+        return bump(task)
+
+    first.modify([1], mutate)
+
+    assert len(calls) == 1
+    assert [first.get(1).title, first.get(2).title] == ["1", "1"]
+
+
+def test_modify_takes_the_lock_after_too_many_conflicts(stores):
+    first, second = stores
+    calls = []
+
+    def mutate(task):
+        # Only the lock-free tries can be interfered with
+        if len(calls) < storage.COMMIT_RETRIES:
+            second.modify([1], bump)
+        calls.append(task.id)
+        return bump(task)
+
+    first.modify([1], mutate)
+
+    assert len(calls) == storage.COMMIT_RETRIES + 1
+    assert first.get(1).title == str(storage.COMMIT_RETRIES + 1)
+
+
+def test_modify_does_not_bring_back_a_deleted_task(stores):
+    first, second = stores
+
+    def mutate(task):
+        second.delete_task(1)
+        return bump(task)
+
+    changed, unchanged, deleted = first.modify([1], mutate)
+
+    assert not changed and not unchanged and not deleted
+    assert first.get(1) is None
+    reloaded = TaskStore(first.path)
+    reloaded.open()
+    assert [task.id for task in reloaded.stream()] == [2]
+
+
+def test_adds_from_two_stores_get_distinct_ids(stores):
+    first, second = stores
+    assert first.add_task({"title": "a"}).id == 3
+    assert second.add_task({"title": "b"}).id == 4
+    assert first.add_task({"title": "c"}).id == 5
+
+    second.open()
+    assert [task.title for task in second.stream()] == ["0", "0", "a", "b", "c"]
@@ -0,0 +1,135 @@
+import os
+
+import pytest
+
+import convert_tasks
+import storage
+from storage import convert_store, open_store
+from task_notes import add_note_to_task
+
+FORMATS = ["tasks.json", "tasks.bin", "tasks.db"]
+PAIRS = [(source, dest) for source in FORMATS for dest in FORMATS if source != dest]
+
+
+def make_store(path):
+    """A store with every kind of field, and a deleted task at the end"""
+    store = open_store(path)
+    store.open()
+    store.add_task({"title": "Write report", "priority": "high", "due_date": "2025-03-01",
+                    "category": "work", "tags": ["q4", "docs"], "source": "import"})
+    store.add_task({"title": "Réunion d'équipe", "priority": "low"})
+    store.add_task({"title": "Gone"})
+    store.modify([1], lambda task: bool(add_note_to_task(task, "first\nsecond line")))
+    task = store.get(2).copy()
+    task.completed = True
+    store.update_task(task)
+    store.delete_task(3)
+    store.close()
+    return store
+
+
+def contents(path):
+    store = open_store(path)
+    store.open()
+    tasks = [task.to_dict() for task in store.stream()]
+    store.close()
+    return tasks
+
+
+@pytest.mark.parametrize("source_name, dest_name", PAIRS)
+def test_conversion_is_lossless(tmp_path, source_name, dest_name):
+    source_path = str(tmp_path / "source" / source_name)
+    dest_path = str(tmp_path / "dest" / dest_name)
+    os.makedirs(os.path.dirname(source_path))
+    os.makedirs(os.path.dirname(dest_path))
+    make_store(source_path)
+    expected = contents(source_path)
+
+    assert convert_store(source_path, dest_path) == 2
+    assert contents(dest_path) == expected
+    assert expected[0]["source"] == "import"
+
+    # The deleted task's ID stays retired in the new format
+    dest = open_store(dest_path)
+    dest.open()
+    assert dest.add_task({"title": "New"}).id == 4
+    assert dest.count_with_tag("q4") == 1
+    assert dest.count_where(completed=True) == 1
+    dest.close()
+
+
+def test_round_trip_through_every_format(tmp_path):
+    make_store(str(tmp_path / "a.json"))
+    expected = contents(str(tmp_path / "a.json"))
+
+    convert_store(str(tmp_path / "a.json"), str(tmp_path / "b.bin"))
+    convert_store(str(tmp_path / "b.bin"), str(tmp_path / "c.db"))
+    convert_store(str(tmp_path / "c.db"), str(tmp_path / "d.json"))
+
+    assert contents(str(tmp_path / "d.json")) == expected
+
+
+def test_converting_in_place_removes_the_old_files(tmp_path):
+    old = make_store(str(tmp_path / "tasks.json"))
+
+    convert_store(str(tmp_path / "tasks.json"), str(tmp_path / "tasks.db"))
+
+    assert not any(os.path.exists(path) for path in old.files())
+    assert len(contents(str(tmp_path / "tasks.db"))) == 2
+
+
+def test_missing_source_is_an_error(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        convert_store(str(tmp_path / "tasks.json"), str(tmp_path / "tasks.db"))
+
+
+@pytest.mark.parametrize("storage_format", ["binary", "sqlite"])
+def test_switching_formats_converts_the_tasks(tmp_path, monkeypatch, storage_format):
+    monkeypatch.chdir(tmp_path)
+    make_store("tasks.json")
+    expected = contents("tasks.json")
+
+    monkeypatch.setattr(storage, "STORAGE_FORMAT", storage_format)
+    monkeypatch.setattr(storage, "_store", None)
+    store = storage.get_store()
+    store.open()
+
+    assert [task.to_dict() for task in store.stream()] == expected
+    assert not os.path.exists("tasks.json")
+    store.close()
+
+
+def test_convert_tasks_command(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    make_store("tasks.json")
+    expected = contents("tasks.json")
+
+    assert convert_tasks.main(["to-binary"]) == 0
+    assert contents("tasks.bin") == expected
+    assert convert_tasks.main(["to-sqlite", "tasks.bin", "copy.db"]) == 0
+    assert contents("copy.db") == expected
+    assert convert_tasks.main(["to-yaml"]) == 2
+
+
+def test_switching_twice_keeps_changes_in_the_shared_log(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = make_store("tasks.json")
+    store.open()
+    store.compact(background=False)
+    store.close()
+
+    for storage_format in ("binary", "sqlite"):
+        monkeypatch.setattr(storage, "STORAGE_FORMAT", storage_format)
+        monkeypatch.setattr(storage, "_store", None)
+        store = storage.get_store()
+        store.open()
+        store.add_task({"title": f"Added as {storage_format}"})
+        store.close()
+
+    store = open_store("tasks.db")
+    store.open()
+    assert [task.title for task in store.stream()] == [
+        "Write report", "Réunion d'équipe", "Added as binary", "Added as sqlite"
+    ]
+    store.close()
+    assert not os.path.exists("tasks.bin") and not os.path.exists("tasks.log")
@@ -0,0 +1,70 @@
+from cli import parse_tags
+from indexes import FacetIndex
+from task_model import Task
+
+
+def make_task(task_id, **fields):
+    return Task.from_dict({"id": task_id, "title": f"Task {task_id}", **fields})
+
+
+def test_facet_index_files_repeated_values_once():
+    index = FacetIndex("tags", lambda task: task.tags)
+    index.add(make_task(1, tags=["a", "a", "b"]))
+
+    assert index.count("a") == 1
+    index.remove(1)
+    assert index.values() == []
+
+
+def test_facet_index_keeps_other_tasks_on_remove():
+    index = FacetIndex("tags", lambda task: task.tags)
+    index.add(make_task(1, tags=["a", "b"]))
+    index.add(make_task(2, tags=["b"]))
+    index.remove(1)
+
+    assert index.values() == ["b"]
+    assert index.ids("b") == {2}
+
+
+def test_parse_tags_drops_repeats():
+    assert parse_tags("a, A,b,a") == ["a", "b"]
+
+
+def test_indexes_follow_updates(store):
+    task = store.add_task({"title": "Write docs", "category": "work", "tags": ["a", "b"]})
+    store.add_task({"title": "Read docs", "tags": ["b"]})
+
+    changed = store.get(task.id).copy()
+    changed.category = "home"
+    changed.tags = ["c"]
+    store.update_task(changed)
+
+    assert not store.ids_with_tag("a")
+    assert set(store.ids_with_tag("b")) == {2}
+    assert set(store.ids_with_tag("c")) == {1}
+    assert store.count_in_category("work") == 0
+    assert store.count_in_category("home") == 1
+
+
+def test_indexes_follow_deletes(store):
+    store.add_task({"title": "Write docs", "category": "work", "tags": ["a"]})
+    store.delete_task(1)
+
+    assert store.count_with_tag("a") == 0
+    assert store.count_in_category("work") == 0
+    assert not list(store.search("docs"))
+
+
+def test_repeated_tags_survive_update_and_delete(store):
+    # Task files written before tags were deduplicated can still hold repeats
+    store.add_task({"title": "Write docs", "tags": ["a", "a"]})
+    assert store.count_with_tag("a") == 1
+
+    changed = store.get(1).copy()
+    changed.tags = ["b"]
+    store.update_task(changed)
+    assert store.count_with_tag("a") == 0
+    assert store.count_with_tag("b") == 1
+
+    store.delete_task(1)
+    assert store.count_with_tag("b") == 0
@@ -0,0 +1,84 @@
+import io
+import json
+
+import pytest
+
+from json_stream import iter_json_array
+from storage import TaskStore
+
+ITEMS = [
+    {"id": 1, "title": "Plain"},
+    {"id": 22, "title": "Escapes \" \\ \n and unicode ✓", "tags": ["a", "b"]},
+    {"id": 333, "title": "Nested", "notes": [{"text": "[not] {an} array", "id": 1}]},
+    12345678901234567890,
+    -1.5e-3,
+    True,
+    None,
+    "text"
+]
+
+
+def stream(text, key=None, chunk_size=1):
+    return list(iter_json_array(io.StringIO(text), key, chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_items_match_json_loads(chunk_size, indent):
+    document = {"schema_version": 2, "meta": {"tasks": [0]}, "tasks": ITEMS, "after": [1, 2]}
+    text = json.dumps(document, indent=indent, ensure_ascii=False)
+
+    assert stream(text, "tasks", chunk_size) == ITEMS
+    assert stream(json.dumps(ITEMS, indent=indent), chunk_size=chunk_size) == ITEMS
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("[]", []),
+    ("  [ ]  ", []),
+    ("{}", []),
+    ('{"schema_version": 2}', []),
+    ('{"tasks": []}', []),
+    ('{"other": [1], "tasks": [1, 2]}', [1, 2]),
+    ('{"tasks": {"id": 1}}', [])
+])
+def test_edge_cases(text, expected):
+    assert stream(text, "tasks") == expected
+
+
+@pytest.mark.parametrize("text", ["[1 2]", "[1,", '{"a" 1}', '{"a": 1 "tasks": []}', "", "5"])
+def test_malformed_documents_raise(text):
+    with pytest.raises(ValueError):
+        stream(text, "tasks")
+
+
+def test_items_are_read_one_at_a_time():
+    f = io.StringIO(json.dumps({"tasks": [{"id": i, "title": "x" * 100} for i in range(100)]}))
+    items = iter_json_array(f, "tasks", chunk_size=256)
+
+    assert next(items)["id"] == 0
+    assert f.tell() < 1024
+
+
+@pytest.fixture(params=["tasks.json", "tasks.bin"])
+def path(request, tmp_path):
+    return str(tmp_path / request.param)
+
+
+def test_store_streams_snapshot_with_log_on_top(path):
+    store = TaskStore(path)
+    store.open()
+    for i in range(5):
+        store.add_task({"title": f"Task {i}"})
+    store.compact(background=False)
+    store.delete_task(2)
+    task = store.get(4).copy()
+    task.completed = True
+    store.update_task(task)
+    store.add_task({"title": "After"})
+    expected = [task.to_dict() for task in store.iter_tasks()]
+    store.close()
+
+    reader = TaskStore(path)
+    assert [task.to_dict() for task in reader.stream()] == expected
+    assert [task.id for task in reader.stream(completed=True)] == [4]
+    assert not reader.loaded
@@ -0,0 +1,63 @@
+from storage import open_store
+from task_notes import add_note_to_task, delete_note, edit_note
+
+
+def store_with_note(path):
+    store = open_store(path)
+    store.open()
+    task = store.add_task({"title": "Write docs"})
+    store.modify([task.id], lambda task: bool(add_note_to_task(task, "first")))
+    return store
+
+
+def test_edit_note_reports_missing_note(tmp_path):
+    store = store_with_note(str(tmp_path / "tasks.json"))
+    task = store.get(1).copy()
+
+    assert edit_note(task, 1, "edited") is True
+    assert task.notes[0].text == "edited"
+    assert edit_note(task, 7, "edited") is False
+
+
+def test_delete_note_returns_deleted_note(tmp_path):
+    store = store_with_note(str(tmp_path / "tasks.json"))
+    task = store.get(1).copy()
+
+    assert delete_note(task, 7) is None
+    assert delete_note(task, 1).text == "first"
+    assert task.notes == []
+
+
+def test_missing_note_commits_nothing(store):
+    store.add_task({"title": "Write docs"})
+    store.modify([1], lambda task: bool(add_note_to_task(task, "first")))
+    before = store.get(1).to_dict()
+
+    changed, unchanged, _ = store.modify([1], lambda task: edit_note(task, 7, "edited"))
+    assert not changed and [task.id for task in unchanged] == [1]
+    changed, unchanged, _ = store.modify([1], lambda task: delete_note(task, 7) is not None)
+    assert not changed and [task.id for task in unchanged] == [1]
+    assert store.get(1).to_dict() == before
+
+
+def test_note_edit_is_retried_over_a_concurrent_change(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    store = store_with_note(path)
+    other = open_store(path)
+    other.open()
+
+    calls = []
+
+    def mutate(task):
+        if not calls:
+            # Another process changes the task between read and commit
+            other.modify([1], lambda task: bool(add_note_to_task(task, "second")))
+        calls.append(task.id)
+        return edit_note(task, 1, "edited")
+
+    store.modify([1], mutate)
+
+    assert len(calls) == 2
+    assert [note.text for note in store.get(1).notes] == ["edited", "second"]
+    other.open()
+    assert [note.text for note in other.get(1).notes] == ["edited", "second"]
@@ -0,0 +1,87 @@
+import os
+import random
+import re
+import subprocess
+import sys
+
+import pytest
+
+import task_manager
+from pagination import first_page, next_page, page_at, previous_page
+from task_manager import page_tasks, task_list_order
+from task_model import Task
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_tasks(count, seed=0):
+    rng = random.Random(seed)
+    tasks = [Task(task_id, f"Task {task_id}", priority=rng.choice(["high", "medium", "low"]))
+             for task_id in range(1, count + 1)]
+    rng.shuffle(tasks)
+    return tasks
+
+
+@pytest.mark.parametrize("count, page_size", [(0, 5), (1, 5), (23, 5), (25, 5), (10, 50)])
+def test_pages_match_sorted_slices(count, page_size):
+    tasks = make_tasks(count)
+    ordered = sorted(tasks, key=task_list_order)
+
+    assert first_page(tasks, page_size, task_list_order) == ordered[:page_size]
+    for offset in range(count):
+        assert page_at(tasks, offset, page_size, task_list_order) == ordered[offset:offset + page_size]
+
+    # Walk forward to the end and back again with cursors
+    pages = []
+    page = first_page(tasks, page_size, task_list_order)
+    while page:
+        pages.append(page)
+        page = next_page(tasks, page_size, task_list_order, after=task_list_order(page[-1]))
+    assert [task for page in pages for task in page] == ordered
+
+    for previous, current in zip(pages, pages[1:]):
+        assert previous_page(tasks, page_size, task_list_order, before=task_list_order(current[0])) == previous
+
+
+def test_paging_past_either_end_is_empty():
+    tasks = make_tasks(12)
+    ordered = sorted(tasks, key=task_list_order)
+
+    assert next_page(tasks, 5, task_list_order, after=task_list_order(ordered[-1])) == []
+    assert previous_page(tasks, 5, task_list_order, before=task_list_order(ordered[0])) == []
+    assert page_at(tasks, 12, 5, task_list_order) == []
+    assert page_at(tasks, 40, 5, task_list_order) == []
+
+
+def test_previous_page_near_the_start_is_short():
+    tasks = make_tasks(12)
+    ordered = sorted(tasks, key=task_list_order)
+
+    assert previous_page(tasks, 5, task_list_order, before=task_list_order(ordered[3])) == ordered[:3]
+
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_page_tasks_stays_on_the_last_page(ordered, monkeypatch, capsys):
+    tasks = make_tasks(12)
+    if ordered:
+        tasks.sort(key=task_list_order)
+    answers = iter(["n", "n", "n", "p", "11", "p", "1", "p", ""])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    monkeypatch.setattr(task_manager, "PAGE_SIZE", 5)
+
+    page_tasks(tasks, "ALL TASKS", ordered)
+
+    output = capsys.readouterr().out
+    shown = re.findall(r"showing (\d+-\d+)", output)
+    assert shown == ["1-5", "6-10", "11-12", "6-10", "11-12", "6-10", "1-5"]
+    assert output.count("Invalid choice") == 2
+
+
+@pytest.mark.parametrize("value, page_size", [("20", 20), ("0", 1), ("-3", 1), ("lots", 50), ("", 50)])
+def test_page_size_setting(value, page_size):
+    env = dict(os.environ, TASKS_PAGE_SIZE=value)
+    result = subprocess.run(
+        [sys.executable, "-c", "import task_manager; print(task_manager.PAGE_SIZE)"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == str(page_size)
@@ -0,0 +1,133 @@
+from datetime import date, timedelta
+
+import pytest
+
+from backend import ORDER_DUE, ORDER_PRIORITY
+from query import CategoryFilter, TagFilter, order_key, parse_query
+from storage import TaskStore, open_store
+
+TODAY = date(2025, 6, 1)
+
+
+def fill(store, count=2000):
+    """Tasks spread evenly over the priorities, categories and status, with a few rare tags"""
+    with store.batch():
+        for i in range(count):
+            tags = []
+            if i % 100 == 0:
+                tags.append("rare")
+            if i % 40 == 0:
+                tags.append("a")
+            if i % 40 in (0, 20):
+                tags.append("b")
+            store.add_task({
+                "title": f"report {i}" if i % 50 == 0 else f"task {i}",
+                "priority": ("high", "medium", "low")[i % 3],
+                "category": ("work", "home", "school")[i % 3 - 1],
+                "completed": i % 2 == 0,
+                "due_date": (TODAY + timedelta(days=i % 30 - 10)).isoformat() if i % 4 else None,
+                "tags": tags
+            })
+
+
+@pytest.fixture(scope="module")
+def loaded(tmp_path_factory):
+    store = TaskStore(str(tmp_path_factory.mktemp("query") / "tasks.json"))
+    store.open()
+    fill(store)
+    return store
+
+
+def plan(store, text, order=None):
+    return parse_query(text, TODAY.toordinal()).plan(store, order)
+
+
+def brute_force(store, text, order=None):
+    query = parse_query(text, TODAY.toordinal())
+    return sorted((task for task in store.stream() if query.matches(task)), key=order_key(order))
+
+
+@pytest.mark.parametrize("text, order, route", [
+    ("tag:rare", None, "index"),
+    ("tag:rare pending", ORDER_PRIORITY, "index"),
+    ("report", None, "index"),
+    ("p:high", None, "columns"),
+    ("", None, "stream"),
+    ("", ORDER_DUE, "walk"),
+    ("pending", ORDER_PRIORITY, "walk"),
+    ("p:high p:low", None, "none"),
+    ("completed pending", ORDER_PRIORITY, "none"),
+])
+def test_route_choice(loaded, text, order, route):
+    query_plan = plan(loaded, text, order)
+
+    assert query_plan.route == route
+    assert [task.id for task in query_plan.run()] == [task.id for task in brute_force(loaded, text, order)]
+
+
+def test_rarest_indexed_filter_drives_the_index_route(loaded):
+    query_plan = plan(loaded, "c:work tag:rare")
+
+    assert isinstance(query_plan.index_filters[0], TagFilter)
+    # Reading the category's IDs costs more than checking the few tasks found
+    assert [type(query_filter) for query_filter in query_plan.checks] == [CategoryFilter]
+
+
+def test_rare_indexes_are_intersected(loaded):
+    query_plan = plan(loaded, "tag:a tag:b")
+
+    assert query_plan.route == "index"
+    assert len(query_plan.index_filters) == 2
+    assert not query_plan.checks
+    assert [task.id for task in query_plan.run()] == [task.id for task in brute_force(loaded, "tag:a tag:b")]
+
+
+def test_negated_terms_are_checked_task_by_task(loaded):
+    query_plan = plan(loaded, "tag:rare -c:home")
+
+    assert query_plan.route == "index"
+    assert [str(query_filter) for query_filter in query_plan.checks] == ["-c:home"]
+
+
+def test_store_that_is_not_loaded_is_streamed(loaded):
+    unloaded = TaskStore(loaded.path)
+
+    query_plan = plan(unloaded, "tag:rare pending")
+    assert query_plan.route == "stream"
+    assert [task.id for task in query_plan.run()] == [task.id for task in brute_force(loaded, "tag:rare pending")]
+
+
+def test_empty_store_matches_nothing(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.json"))
+    store.open()
+
+    assert plan(store, "tag:rare").route == "none"
+    assert plan(store, "tag:rare").run() == []
+
+
+def test_explain_names_the_route(loaded):
+    steps = plan(loaded, "tag:rare pending", ORDER_PRIORITY).describe()
+
+    assert steps[0] == "read the IDs matching tag:rare from its index"
+    assert steps[-2:-1] == ["sort by priority"]
+
+
+@pytest.fixture(scope="module")
+def sqlite(tmp_path_factory):
+    store = open_store(str(tmp_path_factory.mktemp("query") / "tasks.db"))
+    store.open()
+    fill(store)
+    return store
+
+
+@pytest.mark.parametrize("text", [
+    "tag:rare", "p:high c:work", "pending", "overdue", "due<+3 p:low", "due:none completed",
+    "report -tag:rare", "c:none", "t:a,b -completed", "p:high p:low",
+])
+@pytest.mark.parametrize("order", [None, ORDER_PRIORITY, ORDER_DUE])
+def test_sqlite_plans_match_a_full_check(sqlite, text, order):
+    query_plan = plan(sqlite, text, order)
+
+    assert [task.id for task in query_plan.run()] == [task.id for task in brute_force(sqlite, text, order)]
+    if text == "tag:rare":
+        assert query_plan.route == "index"
@@ -0,0 +1,117 @@
+import io
+from datetime import date
+
+import pytest
+from colorama import Fore, Style
+
+import renderer
+from renderer import TaskRenderer, use_color
+from task_model import Note, Task
+
+TODAY = date(2025, 10, 15)
+
+
+class RecordingStream(io.StringIO):
+    """A text stream that remembers each write() call"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, text):
+        self.writes.append(text)
+        return super().write(text)
+
+
+def make_tasks(count):
+    return [
+        Task(
+            task_id,
+            f"Task {task_id}",
+            priority=("high", "medium", "low")[task_id % 3],
+            completed=task_id % 2 == 0,
+            due_date=date.fromordinal(TODAY.toordinal() + task_id % 7 - 2).isoformat(),
+            category=("Work", None)[task_id % 2],
+            tags=("a", "b")[:task_id % 3],
+            notes=[Note(1, "note")] * (task_id % 3)
+        )
+        for task_id in range(1, count + 1)
+    ]
+
+
+def test_rows_without_color():
+    render = TaskRenderer(color=False, today=TODAY.toordinal())
+
+    assert render.row(Task(1, "Plain")) == "1. [✗] Plain 🟡 [MEDIUM]"
+    assert render.row(Task(
+        2, "Full", priority="high", completed=True, due_date="2025-10-14", category="Work",
+        tags=("a", "b"), notes=[Note(1, "x"), Note(2, "y")]
+    )) == "2. [✓] Full 🔴 [HIGH] | ⚠ OVERDUE | 📁 Work | 🏷️ a, b | 📝 2 notes"
+
+
+@pytest.mark.parametrize("due_date, status", [
+    ("2025-10-14", "⚠ OVERDUE"),
+    ("2025-10-15", "📅 DUE TODAY"),
+    ("2025-10-18", "⏰ DUE SOON"),
+    ("2025-10-19", "📅 2025-10-19"),
+    ("someday", "")
+])
+def test_due_status(due_date, status):
+    render = TaskRenderer(color=False, today=TODAY.toordinal())
+
+    assert render.row(Task(1, "T", due_date=due_date)) == f"1. [✗] T 🟡 [MEDIUM] | {status}"
+
+
+def test_colored_row():
+    render = TaskRenderer(color=True, today=TODAY.toordinal())
+    row = render.row(Task(3, "Done", priority="low", completed=True, category="Home"))
+
+    assert row.startswith(f"{Fore.CYAN}3.{Style.RESET_ALL} [{Fore.GREEN}✓{Style.RESET_ALL}] {Fore.GREEN}Done")
+    assert f"{renderer.category_color('Home')}📁 Home{Style.RESET_ALL}" in row
+
+
+def test_cached_parts_match_fresh_ones():
+    tasks = make_tasks(50)
+    shared = TaskRenderer(color=True, today=TODAY.toordinal())
+
+    for task in tasks:
+        assert shared.row(task) == TaskRenderer(color=True, today=TODAY.toordinal()).row(task)
+
+
+def test_rows_are_written_in_chunks(monkeypatch):
+    tasks = make_tasks(25)
+    render = TaskRenderer(color=False, today=TODAY.toordinal())
+    unbuffered = RecordingStream()
+    render.write("ALL TASKS", tasks, unbuffered)
+
+    monkeypatch.setattr(renderer, "WRITE_ROWS", 10)
+    chunked = RecordingStream()
+    render.write("ALL TASKS", tasks, chunked)
+
+    assert len(unbuffered.writes) == 1 and len(chunked.writes) == 3
+    assert chunked.getvalue() == unbuffered.getvalue()
+
+    lines = unbuffered.getvalue().split("\n")
+    assert lines[:4] == ["", "=" * 70, "ALL TASKS", "=" * 70]
+    assert lines[4:-3] == [render.row(task) for task in tasks]
+    assert lines[-3:] == ["=" * 70, "", ""]
+
+
+def test_empty_list_writes_header_and_rule():
+    stream = RecordingStream()
+    TaskRenderer(color=False).write("NONE", [], stream)
+
+    assert stream.getvalue() == "\n".join(["", "=" * 70, "NONE", "=" * 70, "=" * 70, ""]) + "\n"
+
+
+def test_use_color(monkeypatch):
+    class Terminal(io.StringIO):
+        def isatty(self):
+            return True
+
+    monkeypatch.delenv("NO_COLOR", raising=False)
+    assert use_color(Terminal()) is True
+    assert use_color(io.StringIO()) is False
+
+    monkeypatch.setenv("NO_COLOR", "")
+    assert use_color(Terminal()) is False
@@ -0,0 +1,67 @@
+import argparse
+import socket
+import threading
+
+import pytest
+
+from cli import add_commands, run_command
+from storage import open_store
+from task_server import ServerLostError, TaskClient, socket_path
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+def parse(words):
+    parser = argparse.ArgumentParser()
+    add_commands(parser)
+    return parser.parse_args(words)
+
+
+@pytest.fixture
+def hanging_up_server(tmp_path):
+    """A socket next to tasks.json whose server hangs up on every client"""
+    path = str(tmp_path / "tasks.json")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path(path))
+    server.listen()
+
+    def serve():
+        while True:
+            try:
+                client, _ = server.accept()
+            except OSError:
+                return
+            client.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield path
+    server.close()
+
+
+def test_client_reports_lost_server(hanging_up_server):
+    client = TaskClient.connect(socket_path(hanging_up_server))
+    with pytest.raises(ServerLostError):
+        client.search("report")
+    client.close()
+
+
+def test_lost_server_fails_the_command(hanging_up_server, capsys):
+    store = open_store(hanging_up_server)
+
+    assert run_command(store, parse(["search", "report"])) == 1
+    assert "Lost the task server" in capsys.readouterr().out
+
+
+def test_closed_output_is_not_a_lost_server(tmp_path, monkeypatch):
+    store = open_store(str(tmp_path / "tasks.json"))
+    store.open()
+    store.add_task({"title": "Write report"})
+
+    def broken_pipe(*args, **kwargs):
+        raise BrokenPipeError
+    monkeypatch.setattr("cli.print_tasks", broken_pipe)
+
+    with open(tmp_path / "out.txt", "w") as out:
+        monkeypatch.setattr("sys.stdout", out)
+        assert run_command(store, parse(["list"])) == 1
+    assert "Lost the task server" not in (tmp_path / "out.txt").read_text()
@@ -0,0 +1,161 @@
+import json
+import os
+
+import pytest
+
+import storage
+from storage import TaskStore
+from task_notes import add_note_to_task
+
+
+@pytest.fixture(params=["tasks.json", "tasks.bin"])
+def path(request, tmp_path):
+    """Path of an empty TaskStore, with a JSON or a binary snapshot"""
+    return str(tmp_path / request.param)
+
+
+def reopen(path):
+    store = TaskStore(path)
+    store.open()
+    return store
+
+
+def snapshot(store):
+    return {task.id: task.to_dict() for task in store.stream()}
+
+
+def log_lines(store):
+    with open(store.log_path, 'rb') as f:
+        return f.read().splitlines()
+
+
+def fill(store):
+    """Add, change and delete a few tasks, leaving tasks 1 and 3"""
+    store.add_task({"title": "Write report", "priority": "high", "tags": ["q4"]})
+    store.add_task({"title": "Fix bug", "category": "work"})
+    store.add_task({"title": "Team meeting", "due_date": "2025-01-10"})
+    store.modify([1], lambda task: bool(add_note_to_task(task, "draft sent")))
+    store.delete_task(2)
+
+    task = store.get(3).copy()
+    task.completed = True
+    store.update_task(task)
+
+
+def test_log_is_replayed_on_load(path):
+    store = reopen(path)
+    fill(store)
+    store.close()
+
+    # Nothing was compacted: every change is a log record
+    assert not os.path.exists(path)
+    assert len(log_lines(store)) == 1 + 6
+
+    reloaded = reopen(path)
+    assert snapshot(reloaded) == snapshot(store)
+    assert reloaded.get(3).completed
+    assert [note.text for note in reloaded.get(1).notes] == ["draft sent"]
+
+
+def test_deleted_ids_are_not_reused_after_replay(path):
+    store = reopen(path)
+    fill(store)
+    store.delete_task(3)
+    store.close()
+
+    assert reopen(path).add_task({"title": "New"}).id == 4
+
+
+def test_torn_last_record_is_dropped(path):
+    store = reopen(path)
+    fill(store)
+    store.close()
+    with open(store.log_path, 'ab') as f:
+        f.write(b'{"op": "add", "task": {"id": 9')
+
+    reloaded = reopen(path)
+    assert snapshot(reloaded) == snapshot(store)
+    # New records start on a clean line
+    reloaded.add_task({"title": "After the crash"})
+    assert reopen(path).get(4).title == "After the crash"
+
+
+def test_compaction_folds_the_log_into_the_snapshot(path):
+    store = reopen(path)
+    fill(store)
+    store.compact(background=False)
+    store.close()
+
+    assert os.path.exists(path)
+    assert len(log_lines(store)) == 1
+    reloaded = reopen(path)
+    assert snapshot(reloaded) == snapshot(store)
+    assert reloaded.count_with_tag("q4") == 1
+    assert reloaded.count_where(completed=True) == 1
+    assert reloaded.add_task({"title": "New"}).id == 4
+
+
+def test_changes_after_compaction_are_logged_on_top(path):
+    store = reopen(path)
+    fill(store)
+    store.compact(background=False)
+    store.add_task({"title": "After"})
+    store.delete_task(1)
+    store.close()
+
+    assert len(log_lines(store)) == 3
+    assert snapshot(reopen(path)) == snapshot(store)
+
+
+def test_log_compacts_itself_past_the_threshold(path, monkeypatch):
+    monkeypatch.setattr(storage, "COMPACT_THRESHOLD", 10)
+    store = reopen(path)
+    for i in range(25):
+        store.add_task({"title": f"Task {i}"})
+    store.wait_for_compaction()
+    store.close()
+
+    assert len(log_lines(store)) < 10
+    assert [task.title for task in reopen(path).stream()] == [f"Task {i}" for i in range(25)]
+
+
+def test_records_appended_during_compaction_are_kept(path):
+    store = reopen(path)
+    fill(store)
+    other = reopen(path)
+
+    with store._writing():
+        captured = store._capture()
+    # Another process appends while the snapshot is being written
+    other.add_task({"title": "Appended meanwhile"})
+    store._write_snapshot(captured)
+
+    assert reopen(path).get(4).title == "Appended meanwhile"
+    store.open()
+    assert store.get(4).title == "Appended meanwhile"
+
+
+def test_stale_log_is_ignored(path):
+    store = reopen(path)
+    fill(store)
+    store.compact(background=False)
+    with open(store.log_path, 'wb') as f:
+        f.write(json.dumps({"snapshot": "other", "next_id": 1, "version": 0}).encode() + b"\n")
+        f.write(json.dumps({"op": "delete", "id": 1}).encode() + b"\n")
+
+    assert snapshot(reopen(path)) == snapshot(store)
+
+
+def test_interrupted_compaction_is_finished_on_load(path):
+    store = reopen(path)
+    fill(store)
+    store.compact(background=False)
+    store.add_task({"title": "Logged"})
+    store.close()
+
+    # Crash between renaming the snapshot and renaming the new log
+    os.replace(store.log_path, store.log_path + ".tmp")
+
+    reloaded = reopen(path)
+    assert reloaded.get(4).title == "Logged"
+    assert not os.path.exists(store.log_path + ".tmp")
@@ -0,0 +1,60 @@
+import multiprocessing
+
+import pytest
+
+import storage
+import task_manager
+from storage import open_store
+
+pytestmark = pytest.mark.skipif(storage.fcntl is None, reason="needs fcntl file locks")
+
+
+def add_task(path, title):
+    store = open_store(path)
+    store.open()
+    store.add_task({"title": title, "tags": ["shared"]})
+    store.close()
+
+
+def add_from_another_process(path, title):
+    process = multiprocessing.get_context("fork").Process(target=add_task, args=(path, title))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def menu_store(request, tmp_path, monkeypatch):
+    """The task manager's store, loaded as after a change made in the menu"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage, "STORAGE_FORMAT", request.param)
+    monkeypatch.setattr(storage, "_store", None)
+    monkeypatch.setattr(task_manager, "PAGE_SIZE", 1000)
+    store = storage.get_store()
+    store.open()
+    store.add_task({"title": "Mine", "tags": ["shared"]})
+    yield store
+    store.close()
+
+
+def test_listing_shows_other_processes_tasks(menu_store, capsys):
+    add_from_another_process(menu_store.path, "Theirs")
+
+    task_manager.list_tasks()
+    output = capsys.readouterr().out
+    assert "Mine" in output and "Theirs" in output
+
+    task_manager.list_query(task_manager.Query([task_manager.TagFilter("tag:shared", ("shared",))]))
+    assert "Theirs" in capsys.readouterr().out
+
+
+def test_search_and_export_see_other_processes_tasks(menu_store, monkeypatch, capsys):
+    add_from_another_process(menu_store.path, "Theirs")
+
+    monkeypatch.setattr("builtins.input", lambda prompt="": "theirs")
+    task_manager.search_tasks()
+    assert "Theirs" in capsys.readouterr().out
+
+    monkeypatch.setattr("builtins.input", lambda prompt="": "1")
+    task_manager.export_menu()
+    assert "Total tasks exported: 2" in capsys.readouterr().out
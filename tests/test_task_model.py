@@ -0,0 +1,47 @@
+import pytest
+
+from binary_format import BinarySnapshot, encode_snapshot
+from storage import open_store
+from task_model import Task
+
+RECORDS = [
+    {"id": 1, "title": "Plain", "priority": "medium", "completed": False, "created_at": None,
+     "due_date": None, "category": None, "tags": []},
+    {"id": 2, "title": "Notes emptied", "priority": "high", "completed": True,
+     "created_at": "2025-10-01T09:30:00", "due_date": "2025-10-31", "category": "Work",
+     "tags": ["a"], "notes": [], "updated_at": None},
+    {"id": 3, "title": "Edited", "priority": "low", "completed": False, "created_at": None,
+     "due_date": "soon", "category": None, "tags": [],
+     "notes": [{"text": "first", "created_at": "2025-10-02T10:00:00", "id": 1}],
+     "updated_at": "2025-10-03T11:00:00.123456", "owner": "sam"}
+]
+
+
+@pytest.mark.parametrize("record", RECORDS)
+def test_to_dict_round_trips(record):
+    task = Task.from_dict(record)
+    assert task.to_dict() == record
+    assert task.copy().to_dict() == record
+
+
+def test_binary_snapshot_round_trips(tmp_path):
+    path = tmp_path / "tasks.bin"
+    path.write_bytes(encode_snapshot([Task.from_dict(record) for record in RECORDS], 2))
+
+    with BinarySnapshot(str(path)) as snapshot:
+        assert [task.to_dict() for task in snapshot] == RECORDS
+
+
+@pytest.mark.parametrize("name", ["tasks.json", "tasks.bin"])
+def test_store_keeps_empty_notes_and_null_updated_at(tmp_path, name):
+    store = open_store(str(tmp_path / name))
+    store.open()
+    store.add_task({"title": "Notes emptied", "notes": [], "updated_at": None})
+    store.compact(background=False)
+    store.close()
+
+    store = open_store(str(tmp_path / name))
+    store.open()
+    task = store.get(1).to_dict()
+    store.close()
+    assert task["notes"] == [] and task["updated_at"] is None
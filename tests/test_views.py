@@ -0,0 +1,132 @@
+import multiprocessing
+from datetime import date
+
+import pytest
+
+import storage
+import views
+from storage import open_store
+from views import drop_view_cache, get_view_cache
+
+TODAY = date(2025, 10, 15)
+
+
+@pytest.fixture(autouse=True)
+def caches(monkeypatch):
+    """Keep each test's view caches to itself"""
+    monkeypatch.setattr(views, "_caches", {})
+
+
+@pytest.fixture
+def today(monkeypatch):
+    """Pin the date views see; set today.value to move it"""
+    class FakeDate(date):
+        value = TODAY
+
+        @classmethod
+        def today(cls):
+            return cls.value
+
+    monkeypatch.setattr(views, "date", FakeDate)
+    return FakeDate
+
+
+def count_builds(monkeypatch, cache):
+    builds = []
+    build = cache._build
+
+    def counting_build(day):
+        builds.append(day)
+        return build(day)
+
+    monkeypatch.setattr(cache, "_build", counting_build)
+    return builds
+
+
+def titles(cache):
+    return [task.title for task in cache.tasks()]
+
+
+def test_changes_reach_the_cache_without_a_rebuild(store, monkeypatch, today):
+    store.add_task({"title": "Report", "priority": "low", "tags": ["work"]})
+    store.add_task({"title": "Groceries", "tags": ["home"]})
+    cache = get_view_cache(store, "work", "tag:work")
+    builds = count_builds(monkeypatch, cache)
+
+    assert titles(cache) == ["Report"]
+    store.add_task({"title": "Slides", "priority": "high", "tags": ["work"]})
+    task = store.get(2).copy()
+    task.tags = ("home", "work")
+    store.update_task(task)
+    store.delete_task(1)
+
+    assert titles(cache) == ["Slides", "Groceries"]
+    assert cache.count() == 2
+    assert len(builds) == 1
+
+
+def test_task_leaving_the_view_is_taken_out(store, today):
+    store.add_task({"title": "Report", "category": "work"})
+    cache = get_view_cache(store, "work", "category:work")
+    assert titles(cache) == ["Report"]
+
+    task = store.get(1).copy()
+    task.category = "home"
+    store.update_task(task)
+
+    assert titles(cache) == [] and cache.count() == 0
+
+
+def add_task(path, fields):
+    store = open_store(path)
+    store.open()
+    store.add_task(fields)
+    store.close()
+
+
+@pytest.mark.skipif(storage.fcntl is None, reason="needs fcntl file locks")
+def test_cache_sees_changes_from_another_process(store, monkeypatch, today):
+    store.add_task({"title": "Mine", "tags": ["shared"]})
+    cache = get_view_cache(store, "shared", "tag:shared")
+    builds = count_builds(monkeypatch, cache)
+    assert titles(cache) == ["Mine"]
+
+    process = multiprocessing.get_context("fork").Process(
+        target=add_task, args=(store.path, {"title": "Theirs", "priority": "high", "tags": ["shared"]})
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    assert titles(cache) == ["Theirs", "Mine"]
+    # A TaskStore replays the other process's log records into the cache;
+    # SQLite only knows something changed, so the cache starts over
+    assert len(builds) == (2 if store.path.endswith(".db") else 1)
+
+
+def test_relative_terms_are_worked_out_again_on_a_new_day(store, monkeypatch, today):
+    store.add_task({"title": "Due today", "due_date": TODAY.isoformat()})
+    cache = get_view_cache(store, "overdue", "overdue")
+    builds = count_builds(monkeypatch, cache)
+
+    assert titles(cache) == []
+    assert titles(cache) == [] and len(builds) == 1
+
+    today.value = date.fromordinal(TODAY.toordinal() + 1)
+    assert titles(cache) == ["Due today"]
+    assert len(builds) == 2
+
+
+def test_cache_is_shared_until_the_view_changes(store, today):
+    cache = get_view_cache(store, "work", "tag:work")
+    assert get_view_cache(store, "work", "tag:work") is cache
+    assert titles(cache) == []
+
+    changed = get_view_cache(store, "work", "tag:work pending")
+    assert changed is not cache
+    assert titles(changed) == []
+    drop_view_cache("work")
+
+    # Dropped caches are no longer told about changes
+    store.add_task({"title": "Report", "tags": ["work"]})
+    assert cache.members == {} and changed.members == {}
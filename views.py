@@ -0,0 +1,122 @@
+import json
+import os
+from bisect import bisect_left, insort
+from datetime import date
+
+from backend import ORDER_PRIORITY
+from query import order_key, parse_query
+
+VIEWS_FILE = "task_views.json"
+
+# Listing order of view results, as in the task lists
+_LIST_KEY = order_key(ORDER_PRIORITY)
+
+# Result caches of the views opened so far, by view name
+_caches = {}
+
+
+def load_views():
+    """Load the saved views, a map from view name to query"""
+    if not os.path.exists(VIEWS_FILE):
+        return {}
+
+    try:
+        with open(VIEWS_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_views(views):
+    """Save the views to file"""
+    with open(VIEWS_FILE, 'w') as f:
+        json.dump(views, f, indent=2)
+
+
+class ViewCache:
+    """The tasks matching a saved view, kept up to date as tasks change
+
+    The cache is a store listener (see TaskBackend.add_listener): every
+    added, changed or deleted task is checked against the view's query
+    alone and put in or taken out of the results, which are kept sorted
+    in listing order. Opening the view again is then a lookup of those
+    IDs instead of another query over the store.
+
+    The results are worked out again when the store says it cannot tell
+    what changed, and on a new day, since terms like overdue and due<+3
+    are relative to today.
+    """
+
+    def __init__(self, store, text):
+        self.store = store
+        self.text = text
+        self.query = None
+        self.day = None
+        self.keys = None      # sorted listing keys of the matching tasks, None until built
+        self.members = {}     # task ID -> its listing key
+
+    def clear(self):
+        """Forget the results, so the next tasks() works them out again"""
+        self.keys = None
+        self.members = {}
+
+    def add(self, task):
+        """Put a new or changed task in the results if it matches"""
+        if self.keys is None:
+            return
+        if task.id in self.members:
+            self.remove(task.id)
+        if self.query.matches(task):
+            key = _LIST_KEY(task)
+            insort(self.keys, key)
+            self.members[task.id] = key
+
+    def remove(self, task_id):
+        """Take a task out of the results"""
+        key = self.members.pop(task_id, None)
+        if key is not None:
+            del self.keys[bisect_left(self.keys, key)]
+
+    def _build(self, today):
+        """Run the view's query and keep its results; raises QueryError"""
+        self.query = parse_query(self.text, today)
+        tasks = self.query.run(self.store, ORDER_PRIORITY)
+        self.members = {task.id: _LIST_KEY(task) for task in tasks}
+        self.keys = sorted(self.members.values())
+        self.day = today
+        return tasks
+
+    def tasks(self):
+        """Get the matching tasks in listing order; raises QueryError"""
+        self.store.open()
+        today = date.today().toordinal()
+        if self.keys is None or self.day != today:
+            return self._build(today)
+        return self.store.get_many(task_id for _, task_id in self.keys)
+
+    def count(self):
+        """Number of matching tasks; raises QueryError"""
+        self.store.open()
+        today = date.today().toordinal()
+        if self.keys is None or self.day != today:
+            self._build(today)
+        return len(self.keys)
+
+
+def get_view_cache(store, name, text):
+    """Get the result cache of a view on a store, registering a new one if needed"""
+    cache = _caches.get(name)
+    if cache is not None and cache.store is store and cache.text == text:
+        return cache
+
+    drop_view_cache(name)
+    cache = _caches[name] = ViewCache(store, text)
+    store.add_listener(cache)
+    return cache
+
+
+def drop_view_cache(name):
+    """Stop keeping a view's results, e.g. once it is deleted or changed"""
+    cache = _caches.pop(name, None)
+    if cache is not None:
+        cache.store.remove_listener(cache)